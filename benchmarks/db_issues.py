@@ -0,0 +1,98 @@
+"""
+Measures throughput of crash to issue mappings on the configured
+database engine. Run it with the same environment as the service:
+
+    DB_ENGINE=sqlite python3 benchmarks/db_issues.py
+    DB_ENGINE=arangodb python3 benchmarks/db_issues.py
+
+Issue caches are disabled unless CACHE_ISSUES_MAX_SIZE and
+CACHE_ISSUE_RECORDS_MAX_SIZE are set, so lookups measure the engine itself.
+
+Warning: all collections of the database are truncated.
+"""
+
+from argparse import ArgumentParser
+import asyncio
+import os
+import random
+import resource
+import time
+
+from jira_reporter.app.settings import load_app_settings
+from jira_reporter.app.database import db_init
+from jira_reporter.app.database.orm import ORMIssue
+
+
+def make_issue(i: int) -> ORMIssue:
+    return ORMIssue(
+        crash_id=f"crash-{i}",
+        issue_id=i,
+        config_id="benchmark",
+        created_at="2022-01-01T00:00:00Z",
+        description_head="Crash found. Duplicates: ",
+        description_tail=".\n",
+    )
+
+
+async def run_concurrently(count: int, concurrency: int, func):
+
+    queue = iter(range(count))
+
+    async def worker():
+        for i in queue:
+            await func(i)
+
+    started = time.perf_counter()
+    await asyncio.gather(*[worker() for _ in range(concurrency)])
+    return count / (time.perf_counter() - started)
+
+
+async def main():
+
+    parser = ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("-n", "--count", type=int, default=10000)
+    parser.add_argument("-c", "--concurrency", type=int, default=100)
+    args = parser.parse_args()
+
+    os.environ.setdefault("CACHE_ISSUES_MAX_SIZE", "0")
+    os.environ.setdefault("CACHE_ISSUE_RECORDS_MAX_SIZE", "0")
+    settings = load_app_settings()
+
+    started = time.perf_counter()
+    db = await db_init(settings)
+    print(f"Engine: {settings.database.engine}")
+    print(f"Startup: {time.perf_counter() - started:.3f} s")
+
+    try:
+        await db.truncate_all_collections()
+
+        async def insert(i: int):
+            await db.issues.insert(make_issue(i))
+
+        async def lookup(i: int):
+            await db.issues.get_issue(f"crash-{random.randrange(args.count)}")
+
+        async def lookup_missing(i: int):
+            await db.issues.get_issue(f"missing-{i}")
+
+        rate = await run_concurrently(args.count, args.concurrency, insert)
+        await db.issues.flush()
+        print(f"Insert: {rate:.0f} ops/s")
+
+        rate = await run_concurrently(args.count, args.concurrency, lookup)
+        print(f"Lookup: {rate:.0f} ops/s")
+
+        rate = await run_concurrently(args.count, args.concurrency, lookup_missing)
+        print(f"Lookup (missing): {rate:.0f} ops/s")
+
+        max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        print(f"Max RSS: {max_rss / 1024:.1f} MiB")
+
+        await db.truncate_all_collections()
+
+    finally:
+        await db.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,104 @@
+"""
+Measures import time of the service with `python -X importtime`
+and fails, if it exceeds the budget. Run it with the same environment
+as the service, as settings are loaded on import:
+
+    python3 benchmarks/import_time.py
+    python3 benchmarks/import_time.py --budget 2 --module jira_reporter.app.server
+
+By default modules imported by the server are measured, except message
+queue ones, which import mqtransport and boto as a whole.
+"""
+
+from argparse import ArgumentParser
+from typing import Dict, List, Tuple
+import statistics
+import subprocess
+import sys
+
+DEFAULT_MODULES = [
+    "aiohttp.web",
+    "prometheus_client",
+    "jira_reporter.app.database",
+    "jira_reporter.app.jira_api",
+    "jira_reporter.app.issue_batcher",
+    "jira_reporter.app.parked_duplicates",
+    "jira_reporter.app.lane_scheduler",
+    "jira_reporter.app.startup",
+]
+
+DEFAULT_BUDGET = 0.8
+""" Seconds. Measured 0.39-0.45 s (median of 5 runs) with Python 3.11 on x86_64 """
+
+
+def measure(modules: List[str]) -> Tuple[float, Dict[str, Tuple[int, int]]]:
+
+    """
+    Imports modules in a fresh interpreter. Returns total import
+    time in seconds and (self, cumulative) time in us of every module
+    """
+
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {', '.join(modules)}"],
+        stderr=subprocess.PIPE,
+        universal_newlines=True,
+    )
+
+    if proc.returncode != 0:
+        sys.exit(f"Failed to import {modules}:\n{proc.stderr}")
+
+    modules = {}
+    total_us = 0
+
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+
+        self_us, cumulative_us, name = line[len("import time:") :].split("|")
+        if not self_us.strip().isdigit():
+            continue  # header
+
+        # Nested imports are indented
+        if not name[1:].startswith(" "):
+            total_us += int(cumulative_us)
+
+        modules[name.strip()] = (int(self_us), int(cumulative_us))
+
+    return total_us / 1e6, modules
+
+
+def print_slowest(modules: Dict[str, Tuple[int, int]], count: int):
+
+    slowest: List[Tuple[str, Tuple[int, int]]] = sorted(
+        modules.items(), key=lambda item: item[1][0], reverse=True
+    )
+
+    print("\nSlowest modules (self time):")
+    for name, (self_us, cumulative_us) in slowest[:count]:
+        print(f"  {self_us / 1000:8.1f} ms {cumulative_us / 1000:8.1f} ms  {name}")
+
+
+def main():
+
+    parser = ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("-m", "--module", action="append", dest="modules")
+    parser.add_argument("-b", "--budget", type=float, default=DEFAULT_BUDGET)
+    parser.add_argument("-r", "--repeat", type=int, default=5)
+    parser.add_argument("-t", "--top", type=int, default=15)
+    args = parser.parse_args()
+    modules = args.modules or DEFAULT_MODULES
+
+    # The first run warms up bytecode and file system caches
+    measure(modules)
+    runs = [measure(modules) for _ in range(args.repeat)]
+    total = statistics.median(total for total, _ in runs)
+
+    print_slowest(runs[-1][1], args.top)
+    print(f"\nImport time of {len(modules)} modules: {total:.3f} s (budget {args.budget:.3f} s)")
+
+    if total > args.budget:
+        sys.exit("Import time budget exceeded")
+
+
+if __name__ == "__main__":
+    main()
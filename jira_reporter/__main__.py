@@ -1,7 +1,5 @@
 from contextlib import suppress
 import logging
-from logging.config import dictConfig
-import yaml
 
 from .app.server import run
 from .app.settings import load_app_settings
@@ -13,7 +11,10 @@ with suppress(ModuleNotFoundError):
 
 if __name__ == "__main__":
 
-    # Configure logging
+    # Configure logging. Formatters (coloredlogs) are imported by config
+    from logging.config import dictConfig
+    import yaml
+
     with open("logging.yaml") as f:
         dictConfig(yaml.safe_load(f))
 
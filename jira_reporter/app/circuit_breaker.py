@@ -0,0 +1,125 @@
+from __future__ import annotations
+from typing import TYPE_CHECKING
+
+from contextlib import suppress
+from enum import IntEnum
+import logging
+import time
+
+from .metrics import JIRA_BREAKER_REJECTED, JIRA_BREAKER_STATE
+
+if TYPE_CHECKING:
+    from .settings import JiraSettings
+
+
+class BreakerState(IntEnum):
+    closed = 0
+    open = 1
+    half_open = 2
+
+
+class CircuitBreaker:
+
+    """Circuit breaker of a single integration (closed, open or half-open)"""
+
+    _name: str
+    _state: BreakerState
+    _failures: int
+    _successes: int
+    _probes: int
+    _opened_at: float
+    _last_used: float
+
+    _failure_threshold: int
+    _open_timeout: float
+    _half_open_probes: int
+
+    def __init__(self, name: str, settings: JiraSettings):
+        self._name = name
+        self._failures = 0
+        self._successes = 0
+        self._probes = 0
+        self._opened_at = 0.0
+        self._last_used = time.monotonic()
+        self._failure_threshold = settings.breaker_failure_threshold
+        self._open_timeout = settings.breaker_open_timeout
+        self._half_open_probes = settings.breaker_half_open_probes
+        self._logger = logging.getLogger("breaker")
+        self._set_state(BreakerState.closed)
+
+    @property
+    def state(self):
+        if self._state == BreakerState.open:
+            if time.monotonic() - self._opened_at >= self._open_timeout:
+                self._set_state(BreakerState.half_open)
+
+        return self._state
+
+    def _set_state(self, state: BreakerState):
+
+        if getattr(self, "_state", None) != state:
+            self._logger.info("Breaker '%s' is %s", self._name, state.name)
+
+        self._state = state
+        self._failures = 0
+        self._successes = 0
+        self._probes = 0
+
+        if state == BreakerState.open:
+            self._opened_at = time.monotonic()
+
+        JIRA_BREAKER_STATE.labels(self._name).set(state.value)
+
+    def is_idle(self, now: float, idle_timeout: float):
+
+        # Forgetting open breaker would resume requests to failing Jira
+        if self.state == BreakerState.open or self._probes > 0:
+            return False
+
+        return now - self._last_used > idle_timeout
+
+    def remove_metrics(self):
+        JIRA_BREAKER_STATE.remove(self._name)
+        with suppress(KeyError):
+            JIRA_BREAKER_REJECTED.remove(self._name)
+
+    def allow_request(self) -> bool:
+
+        self._last_used = time.monotonic()
+        state = self.state
+        if state == BreakerState.closed:
+            return True
+
+        if state == BreakerState.half_open:
+            if self._probes < self._half_open_probes:
+                self._probes += 1
+                return True
+
+        return False
+
+    def on_success(self):
+
+        if self._state == BreakerState.half_open:
+            self._successes += 1
+            self._probes = max(self._probes - 1, 0)
+            if self._successes >= self._half_open_probes:
+                self._set_state(BreakerState.closed)
+        else:
+            self._failures = 0
+
+    def on_failure(self):
+
+        if self._state == BreakerState.half_open:
+            self._set_state(BreakerState.open)
+
+        elif self._state == BreakerState.closed:
+            self._failures += 1
+            if self._failures >= self._failure_threshold:
+                self._set_state(BreakerState.open)
+
+    def on_cancel(self):
+        if self._state == BreakerState.half_open:
+            self._probes = max(self._probes - 1, 0)
+
+    def close(self):
+        self._set_state(BreakerState.closed)
@@ -0,0 +1,202 @@
+from __future__ import annotations
+from typing import TYPE_CHECKING, Deque, Optional
+
+from collections import deque
+from contextlib import asynccontextmanager, suppress
+import asyncio
+import logging
+import time
+
+from .metrics import JIRA_CONCURRENCY_LIMIT, JIRA_IN_FLIGHT, JIRA_QUEUED, JIRA_QUEUE_DELAY, JIRA_REJECTED
+
+if TYPE_CHECKING:
+    from .settings import JiraSettings
+
+
+class LimiterSlot:
+
+    """Permission to send a single request"""
+
+    in_flight: int
+    overloaded: bool
+
+    def __init__(self, in_flight: int):
+        self.in_flight = in_flight
+        self.overloaded = False
+
+
+class AdaptiveLimiter:
+
+    """Limits concurrent requests to a Jira host and tunes the limit by AIMD"""
+
+    # Weight of a single sample in long-term average latency
+    LATENCY_SMOOTHING = 0.05
+
+    _host: str
+    _limit: float
+    _in_flight: int
+    _waiters: Deque[asyncio.Future]
+    _latency: Optional[float]
+    _decreased_at: float
+    _last_used: float
+
+    def __init__(self, host: str, settings: JiraSettings):
+        self._host = host
+        self._min_limit = settings.concurrency_min_limit
+        self._max_limit = settings.concurrency_max_limit
+        self._backoff_ratio = settings.concurrency_backoff_ratio
+        self._latency_tolerance = settings.concurrency_latency_tolerance
+        self._max_queue = settings.concurrency_max_queue
+        self._limit = float(settings.concurrency_initial_limit)
+        self._in_flight = 0
+        self._waiters = deque()
+        self._latency = None
+        self._decreased_at = 0.0
+        self._last_used = time.monotonic()
+        self._logger = logging.getLogger("limiter")
+
+        self._limit_gauge = JIRA_CONCURRENCY_LIMIT.labels(host)
+        self._in_flight_gauge = JIRA_IN_FLIGHT.labels(host)
+        self._queued_gauge = JIRA_QUEUED.labels(host)
+        self._queue_delay = JIRA_QUEUE_DELAY.labels(host)
+        self._rejected = JIRA_REJECTED.labels(host)
+        self._update_metrics()
+
+    @property
+    def limit(self) -> int:
+        return max(int(self._limit), self._min_limit)
+
+    @property
+    def in_flight(self) -> int:
+        return self._in_flight
+
+    @property
+    def queued(self) -> int:
+        return len(self._waiters)
+
+    def is_idle(self, now: float, idle_timeout: float):
+        if self._in_flight or self._waiters:
+            return False
+        return now - self._last_used > idle_timeout
+
+    def remove_metrics(self):
+        JIRA_CONCURRENCY_LIMIT.remove(self._host)
+        JIRA_IN_FLIGHT.remove(self._host)
+        JIRA_QUEUED.remove(self._host)
+        JIRA_QUEUE_DELAY.remove(self._host)
+        JIRA_REJECTED.remove(self._host)
+
+    def _update_metrics(self):
+        self._limit_gauge.set(self.limit)
+        self._in_flight_gauge.set(self._in_flight)
+        self._queued_gauge.set(len(self._waiters))
+
+    def _wake_waiters(self):
+
+        while self._waiters and self._in_flight < self.limit:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                self._in_flight += 1
+                waiter.set_result(None)
+
+        self._update_metrics()
+
+    async def _acquire(self):
+
+        if self._in_flight < self.limit and not self._waiters:
+            self._in_flight += 1
+            self._update_metrics()
+            return
+
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        self._update_metrics()
+
+        try:
+            await waiter
+        except asyncio.CancelledError:
+            if waiter.done() and not waiter.cancelled():
+                # Slot was handed over just before cancellation
+                self._release()
+            else:
+                with suppress(ValueError):
+                    self._waiters.remove(waiter)
+                self._update_metrics()
+            raise
+
+    def _release(self):
+        self._in_flight -= 1
+        self._last_used = time.monotonic()
+        self._wake_waiters()
+
+    def check_capacity(self) -> bool:
+
+        """
+        Checks that not too many requests are queued. Used to stop
+        taking new work, instead of queueing more and more requests
+        """
+
+        if len(self._waiters) < self._max_queue:
+            return True
+
+        self._rejected.inc()
+        return False
+
+    @asynccontextmanager
+    async def acquire(self):
+
+        queued_at = time.monotonic()
+        await self._acquire()
+
+        sent_at = time.monotonic()
+        self._queue_delay.observe(sent_at - queued_at)
+        slot = LimiterSlot(self._in_flight)
+
+        try:
+            yield slot
+
+        except asyncio.CancelledError:
+            # Says nothing about the load of Jira
+            self._release()
+            raise
+
+        except BaseException:
+            self._on_complete(slot, time.monotonic() - sent_at)
+            self._release()
+            raise
+
+        else:
+            self._on_complete(slot, time.monotonic() - sent_at)
+            self._release()
+
+    def _on_complete(self, slot: LimiterSlot, latency: float):
+
+        if slot.overloaded:
+            self._decrease("request failed")
+            return
+
+        if self._latency is None:
+            self._latency = latency
+            return
+
+        if latency > self._latency * self._latency_tolerance:
+            self._decrease(f"latency {latency:.2f}s, average {self._latency:.2f}s")
+
+        # Grows only if the limit was actually reached
+        elif slot.in_flight >= self.limit:
+            self._limit = min(self._limit + 1 / self._limit, float(self._max_limit))
+
+        self._latency += (latency - self._latency) * self.LATENCY_SMOOTHING
+
+    def _decrease(self, reason: str):
+
+        # Requests sent before the previous decrease have already
+        # seen the overload, so they must not decrease the limit again
+        now = time.monotonic()
+        if now - self._decreased_at < (self._latency or 1.0):
+            return
+
+        self._decreased_at = now
+        self._limit = max(self._limit * self._backoff_ratio, float(self._min_limit))
+        self._logger.debug("Limit of '%s' decreased to %d: %s", self._host, self.limit, reason)
+        self._update_metrics()
@@ -1,12 +1,13 @@
 from __future__ import annotations
-from typing import TYPE_CHECKING, Dict, Optional, Tuple
+from typing import TYPE_CHECKING, AsyncIterator, Dict, List, Optional, Tuple
 
 from abc import abstractmethod, ABCMeta
 from ..util import testing_only
 
 if TYPE_CHECKING:
     from ..settings import AppSettings
-    from .orm import ORMJiraConfig
+    from .orm import ORMJiraConfig, ORMIssue, ORMParkedDuplicate
+    from .errors import DatabaseError
 
 
 class IConfigs(metaclass=ABCMeta):
@@ -14,6 +15,15 @@ class IConfigs(metaclass=ABCMeta):
     async def get(self, config_id: str) -> Optional[ORMJiraConfig]:
         pass
 
+    @abstractmethod
+    async def get_many(self, config_ids: List[str]) -> Dict[str, ORMJiraConfig]:
+        """Returns found configs by their ids. Missing ones are skipped"""
+        pass
+
+    @abstractmethod
+    async def list_all(self) -> List[ORMJiraConfig]:
+        pass
+
     @abstractmethod
     async def insert(self, config: ORMJiraConfig) -> None:
         pass
@@ -26,15 +36,88 @@ class IConfigs(metaclass=ABCMeta):
     async def delete(self, config_id: str) -> None:
         pass
 
+    def invalidate(self, config_id: Optional[str] = None) -> None:
+        """Drops cached config (all configs if id is not set), if cached"""
+
 class IIssues(metaclass=ABCMeta):
     @abstractmethod
     async def get_issue(self, crash_id: str) -> Optional[int]:
+        """Returns issue id by crash id. Pending issues are not returned"""
+        pass
+
+    @abstractmethod
+    async def get_issues(self, crash_ids: List[str]) -> Dict[str, int]:
+        """Returns issue ids by crash ids. Missing and pending ones are skipped"""
+        pass
+
+    @abstractmethod
+    async def get(self, crash_id: str) -> Optional[ORMIssue]:
+        pass
+
+    @abstractmethod
+    def list_crash_ids(self) -> AsyncIterator[str]:
+        pass
+
+    @abstractmethod
+    async def find_by_issue_id(self, issue_id: int, config_id: Optional[str] = None) -> List[ORMIssue]:
+        """Returns crashes mapped to jira issue. Pending claims are skipped. Descriptions are not loaded"""
+        pass
+
+    @abstractmethod
+    async def list_by_config(self, config_id: str, offset: int = 0, limit: int = 100) -> List[ORMIssue]:
+        """
+        Returns issues of integration, oldest first. Pending claims and
+        issues without creation time are skipped. Descriptions are not loaded
+        """
+        pass
+
+    @abstractmethod
+    async def count_by_config(self, config_id: str) -> int:
+        """Counts issues returned by list_by_config"""
+        pass
+
+    @abstractmethod
+    async def list_created_before(self, created_before: str, limit: int = 100) -> List[ORMIssue]:
+        """
+        Returns issues created before the given time, oldest first.
+        Pending claims are skipped. Descriptions are not loaded
+        """
+        pass
+
+    @abstractmethod
+    async def insert(self, issue: ORMIssue) -> None:
         pass
 
     @abstractmethod
-    async def insert(self, crash_id: str, issue_id: int) -> None:
+    async def update(self, issue: ORMIssue) -> bool:
+        """Saves issue by compare-and-set. Returns False on conflict"""
         pass
 
+    @abstractmethod
+    async def delete(self, issue: ORMIssue) -> bool:
+        """
+        Deletes issue if it was not modified since it has been read.
+        Returns False on conflict or if issue does not exist
+        """
+        pass
+
+    @abstractmethod
+    async def insert_many(self, issues: List[ORMIssue]) -> List[Optional[DatabaseError]]:
+        """Inserts issues at once. Returns error (or None) for each issue"""
+        pass
+
+    async def flush(self) -> None:
+        """Writes buffered changes to database, if buffered"""
+
+    @abstractmethod
+    async def update_duplicate_count(self, issue: ORMIssue) -> bool:
+        """Saves duplicate count and description by compare-and-set. Returns False on conflict"""
+        pass
+
+    def cached_duplicate_count(self, crash_id: str) -> Optional[int]:
+        """Returns duplicate count known to be written, if cached"""
+        return None
+
 class IUnsentMessages(metaclass=ABCMeta):
 
     """
@@ -43,10 +126,39 @@ class IUnsentMessages(metaclass=ABCMeta):
 
     @abstractmethod
     async def save_unsent_messages(self, messages: Dict[str, list]):
+        """Replaces saved messages with the given ones"""
         pass
 
     @abstractmethod
-    async def load_unsent_messages(self) -> Dict[str, list]:
+    def load_unsent_messages(self) -> AsyncIterator[Dict[str, list]]:
+        """Yields saved messages in chunks, preserving order within each queue"""
+        pass
+
+class IParkedDuplicates(metaclass=ABCMeta):
+
+    """
+    Used for spilling duplicate counts of crashes,
+    whose issues are not created yet, to database.
+    """
+
+    @abstractmethod
+    async def save_many(self, parked: List[ORMParkedDuplicate]) -> None:
+        """Saves counts. The highest count is kept, if crash is already parked"""
+        pass
+
+    @abstractmethod
+    async def pop(self, crash_id: str) -> Optional[ORMParkedDuplicate]:
+        """Removes and returns parked count of crash"""
+        pass
+
+    @abstractmethod
+    async def pop_expired(self, parked_before: str, limit: int = 100) -> List[ORMParkedDuplicate]:
+        """Removes and returns counts parked before the given time (oldest first)"""
+        pass
+
+    @abstractmethod
+    def list_crash_ids(self) -> AsyncIterator[str]:
+        """Returns crash ids of all parked counts"""
         pass
 
 class IDatabase(metaclass=ABCMeta):
@@ -77,6 +189,11 @@ class IDatabase(metaclass=ABCMeta):
     def unsent_mq(self) -> IUnsentMessages:
         pass
 
+    @property
+    @abstractmethod
+    def parked_duplicates(self) -> IParkedDuplicates:
+        pass
+
     @abstractmethod
     @testing_only
     async def truncate_all_collections(self) -> None:
@@ -8,14 +8,17 @@ from .initializer import ArangoDBInitializer
 from .interfaces.configs import DBConfigs
 from .interfaces.issues import DBIssues
 from .interfaces.unsent_mq import DBUnsentMessages
+from .interfaces.parked_duplicates import DBParkedDuplicates
 from ..abstract import IDatabase
+from ..cache import CachedConfigs, CachedIssues
+from ..write_behind import WriteBehindIssues
 
 
 if TYPE_CHECKING:
     from aioarangodb.database import StandardDatabase
     from aioarangodb.client import ArangoClient
     from jira_reporter.app.settings import AppSettings, CollectionSettings
-    from ..abstract import IConfigs, IIssues, IUnsentMessages
+    from ..abstract import IConfigs, IIssues, IParkedDuplicates, IUnsentMessages
 
 
 class ArangoDB(IDatabase):
@@ -23,6 +26,8 @@ class ArangoDB(IDatabase):
     _db_configs: IConfigs
     _db_issues: IIssues
     _db_unsent_mq: IUnsentMessages
+    _db_parked_duplicates: IParkedDuplicates
+    _write_behind: Optional[WriteBehindIssues]
 
     _logger: logging.Logger
     _collections: CollectionSettings
@@ -42,6 +47,10 @@ class ArangoDB(IDatabase):
     def issues(self) -> IIssues:
         return self._db_issues
 
+    @property
+    def parked_duplicates(self) -> IParkedDuplicates:
+        return self._db_parked_duplicates
+
     async def _init(self, settings: AppSettings):
 
         self._client = None
@@ -55,14 +64,33 @@ class ArangoDB(IDatabase):
         client = db_initializer.client
         collections = db_initializer.collections
 
-        self._db_configs = DBConfigs(self, collections)
-        self._db_issues = DBIssues(self, collections)
-        self._db_unsent_mq = DBUnsentMessages(self, collections)
+        coalesce_reads = settings.database.coalesce_reads
+        self._db_configs = CachedConfigs(
+            DBConfigs(self, collections, coalesce_reads), settings.cache
+        )
+        db_issues: IIssues = DBIssues(self, collections, coalesce_reads)
+        self._write_behind = None
+
+        if settings.database.write_behind:
+            db_issues = WriteBehindIssues(db_issues, settings.database)
+            self._write_behind = db_issues
+
+        self._db_issues = CachedIssues(db_issues, settings.cache)
+        self._db_unsent_mq = DBUnsentMessages(
+            self,
+            collections,
+            settings.message_queue.instance_id,
+            settings.database.unsent_messages_batch_size,
+        )
+        self._db_parked_duplicates = DBParkedDuplicates(self, collections)
 
         self._is_closed = False
         self._collections = collections
         self._client = client
 
+        await self._db_configs.warm_up()
+        await self._db_issues.warm_up()
+
     @staticmethod
     async def create(settings):
         _self = ArangoDB()
@@ -80,6 +108,9 @@ class ArangoDB(IDatabase):
         
         assert not self._is_closed, "Database connection has been already closed"
 
+        if self._write_behind:
+            await self._write_behind.close()
+
         if self._client:
             await self._client.close()
             self._client = None
@@ -0,0 +1,117 @@
+from __future__ import annotations
+from typing import TYPE_CHECKING, Optional
+
+import time
+
+import aiohttp
+from aioarangodb.http import HTTPClient
+from aioarangodb.response import Response
+
+from jira_reporter.app.metrics import (
+    DB_POOL_IN_USE,
+    DB_POOL_SIZE,
+    DB_POOL_WAITS,
+    DB_REQUEST_DURATION,
+)
+
+if TYPE_CHECKING:
+    from jira_reporter.app.settings import DatabaseSettings
+
+
+# Endpoints followed by collection name
+COLLECTION_ENDPOINTS = {"document", "collection", "index"}
+
+
+def request_target(url: str, params: Optional[dict]) -> str:
+
+    """Returns collection name of request or endpoint, if it has none"""
+
+    _, _, path = url.partition("/_api/")
+    parts = path.split("/", 2)
+    endpoint = parts[0]
+
+    if endpoint in COLLECTION_ENDPOINTS:
+        if len(parts) > 1 and parts[1]:
+            return parts[1]
+        if params and "collection" in params:
+            return params["collection"]
+
+    return f"_{endpoint}"
+
+
+class ArangoHTTPClient(HTTPClient):
+
+    """
+    HTTP client with bounded connection pool and timeouts.
+    Reports pool usage and request latency to Prometheus.
+    """
+
+    def __init__(self, settings: DatabaseSettings):
+        self._settings = settings
+        self._in_use = 0
+
+    def create_session(self, host: str):
+
+        settings = self._settings
+        DB_POOL_SIZE.set(settings.pool_size)
+
+        connector = aiohttp.TCPConnector(
+            limit=settings.pool_size,
+            keepalive_timeout=settings.keepalive_timeout,
+            force_close=settings.keepalive_timeout <= 0,
+        )
+
+        timeout = aiohttp.ClientTimeout(
+            connect=settings.connect_timeout,
+            sock_read=settings.read_timeout,
+        )
+
+        return aiohttp.ClientSession(connector=connector, timeout=timeout)
+
+    async def send_request(
+        self,
+        session: aiohttp.ClientSession,
+        method: str,
+        url: str,
+        params=None,
+        data=None,
+        headers=None,
+        auth=None,
+    ):
+        if auth is not None:
+            auth = aiohttp.BasicAuth(auth[0], auth[1])
+
+        # Request waits for a free connection
+        if self._in_use >= self._settings.pool_size:
+            DB_POOL_WAITS.inc()
+
+        self._in_use += 1
+        DB_POOL_IN_USE.set(self._in_use)
+        started = time.monotonic()
+
+        try:
+            async with session.request(
+                method,
+                url,
+                params=params,
+                data=data,
+                headers=headers,
+                auth=auth,
+            ) as response:
+                raw_body = await response.text()
+
+        finally:
+            self._in_use -= 1
+            DB_POOL_IN_USE.set(self._in_use)
+            DB_REQUEST_DURATION.labels(request_target(url, params), method).observe(
+                time.monotonic() - started
+            )
+
+        return Response(
+            method=method,
+            url=url,
+            headers=response.headers,
+            status_code=response.status,
+            status_text=response.reason,
+            raw_body=raw_body,
+        )
@@ -2,7 +2,11 @@ from jira_reporter.app.settings import AppSettings, CollectionSettings
 from aioarangodb.database import StandardDatabase
 from aioarangodb import ArangoClient
 
+from jira_reporter.app.startup import StartupGraph
+
 from ..errors import DatabaseError
+from .http_client import ArangoHTTPClient
+import asyncio
 import logging
 
 ########################################
@@ -56,8 +60,9 @@ class ArangoDBBaseInitializer:
         await batch_db.commit()
 
     def get_init_tasks(self):
-        yield "Authentication", self._verify_auth()
-        yield "Check permissions", self._check_user_permissions()
+        """Yields name, function and names of tasks it depends on"""
+        yield "Authentication", self._verify_auth, []
+        yield "Check permissions", self._check_user_permissions, ["Authentication"]
 
     async def _init(self, settings: AppSettings):
 
@@ -65,7 +70,10 @@ class ArangoDBBaseInitializer:
         username = settings.database.username
         password = settings.database.password
 
-        self._client = ArangoClient(settings.database.url)
+        self._client = ArangoClient(
+            settings.database.url,
+            http_client=ArangoHTTPClient(settings.database),
+        )
         self._db = await self._client.db(db_name, username, password)
 
     @staticmethod
@@ -80,10 +88,11 @@ class ArangoDBBaseInitializer:
 
         try:
             logger.info("Initializing database...")
-            for name, task in self.get_init_tasks():
-                logger.info("Performing '%s'", name)
-                await task
+            graph = StartupGraph("db")
+            for name, func, depends_on in self.get_init_tasks():
+                graph.add(name, func, depends_on)
 
+            await graph.run()
             logger.info("Initializing database... OK")
 
         except:
@@ -124,16 +133,31 @@ class ArangoDBInitializer(ArangoDBBaseInitializer):
                 {"name": self._collections.configs},
                 {"name": self._collections.issues},
                 {"name": self._collections.unsent_messages},
+                {"name": self._collections.parked_duplicates},
             ]
         )
 
     async def _add_indexes(self):
-        pass
+
+        # Existing indexes are not created twice
+        col_issues = self._db[self._collections.issues]
+        col_messages = self._db[self._collections.unsent_messages]
+        col_parked = self._db[self._collections.parked_duplicates]
+
+        await asyncio.gather(
+            col_issues.add_persistent_index(["issue_id"], name="issue_id"),
+            col_issues.add_persistent_index(["config_id", "created_at"], name="config_id"),
+            col_issues.add_persistent_index(["created_at"], name="created_at"),
+            col_messages.add_persistent_index(["instance", "queue", "order"], name="instance_queue_order"),
+            col_parked.add_persistent_index(["parked_at"], name="parked_at"),
+        )
 
     def get_init_tasks(self):
         yield from super().get_init_tasks()
-        yield "Create collections", self._create_all_collections()
-        yield "Add collection indexes", self._add_indexes()
+
+        # Permissions are checked meanwhile
+        yield "Create collections", self._create_all_collections, ["Authentication"]
+        yield "Add collection indexes", self._add_indexes, ["Create collections"]
 
     @property
     def collections(self):
@@ -1,10 +1,11 @@
 from __future__ import annotations
-from typing import TYPE_CHECKING, Optional, Tuple
+from typing import TYPE_CHECKING, Dict, List, Optional, Tuple
 
 from jira_reporter.app.database.arangodb.interfaces.base import DBBase
 from jira_reporter.app.database.errors import DBAlreadyExistsError, DBRecordNotFoundError
 from jira_reporter.app.database.orm import ORMJiraConfig
 from jira_reporter.app.database.abstract import IConfigs
+from jira_reporter.app.database.coalescer import RequestCoalescer
 from .util import (
     maybe_already_exists,
     maybe_not_found,
@@ -20,23 +21,45 @@ if TYPE_CHECKING:
 class DBConfigs(DBBase, IConfigs):
 
     _col_configs: StandardCollection
+    _coalescer: Optional[RequestCoalescer[str, ORMJiraConfig]]
 
     def __init__(
         self,
         db: ArangoDB,
         collections: CollectionSettings,
+        coalesce_reads: bool = False,
     ):
         self._col_configs = db._db[collections.configs]
+        self._coalescer = RequestCoalescer(self.get_many) if coalesce_reads else None
         super().__init__(db, collections)
 
     @maybe_unknown_error
     async def get(self, config_id: str) -> Optional[ORMJiraConfig]:
+        if self._coalescer is not None:
+            return await self._coalescer.get(config_id)
+
         doc_dict = await self._col_configs.get(config_id)
         if doc_dict is None:
             return None
         doc_dict["id"] = doc_dict["_key"]
         return ORMJiraConfig(**doc_dict)
 
+    @maybe_unknown_error
+    async def get_many(self, config_ids: List[str]) -> Dict[str, ORMJiraConfig]:
+        configs = {}
+        for doc_dict in await self._col_configs.get_many(config_ids):
+            doc_dict["id"] = doc_dict["_key"]
+            configs[doc_dict["id"]] = ORMJiraConfig(**doc_dict)
+        return configs
+
+    @maybe_unknown_error
+    async def list_all(self) -> List[ORMJiraConfig]:
+        configs = []
+        async for doc_dict in await self._col_configs.all():
+            doc_dict["id"] = doc_dict["_key"]
+            configs.append(ORMJiraConfig(**doc_dict))
+        return configs
+
     @maybe_unknown_error
     @maybe_already_exists(DBAlreadyExistsError)
     async def insert(self, config: ORMJiraConfig) -> None:
@@ -1,17 +1,24 @@
 from __future__ import annotations
-from typing import TYPE_CHECKING, Optional
+from typing import TYPE_CHECKING, AsyncIterator, Dict, List, Optional
+
+from aioarangodb.errno import UNIQUE_CONSTRAINT_VIOLATED
+from aioarangodb.exceptions import ArangoError, DocumentRevisionError
 
 from jira_reporter.app.database.arangodb.interfaces.base import DBBase
-from jira_reporter.app.database.errors import DBAlreadyExistsError, DBRecordNotFoundError
+from jira_reporter.app.database.errors import DatabaseError, DBAlreadyExistsError, DBRecordNotFoundError
+from jira_reporter.app.database.orm import ORMIssue
 from jira_reporter.app.database.abstract import IIssues
+from jira_reporter.app.database.coalescer import RequestCoalescer
 from .util import (
     maybe_already_exists,
     maybe_not_found,
     maybe_unknown_error,
+    maybe_unknown_error_gen,
 )
 
 if TYPE_CHECKING:
     from aioarangodb.collection import StandardCollection
+    from aioarangodb.cursor import Cursor
     from jira_reporter.app.settings import CollectionSettings
     from jira_reporter.app.database.arangodb.database import ArangoDB
 
@@ -19,29 +26,237 @@ if TYPE_CHECKING:
 class DBIssues(DBBase, IIssues):
 
     _col_issues: StandardCollection
+    _coalescer: Optional[RequestCoalescer[str, ORMIssue]]
 
     def __init__(
         self,
         db: ArangoDB,
         collections: CollectionSettings,
+        coalesce_reads: bool = False,
     ):
         self._col_issues = db._db[collections.issues]
+        self._coalescer = RequestCoalescer(self._get_many) if coalesce_reads else None
         super().__init__(db, collections)
 
+    @staticmethod
+    def _to_orm(doc_dict: dict) -> ORMIssue:
+        doc_dict["crash_id"] = doc_dict["_key"]
+        doc_dict["rev"] = doc_dict["_rev"]
+        return ORMIssue(**doc_dict)
+
+    async def _get_many(self, crash_ids: List[str]) -> Dict[str, ORMIssue]:
+        docs = await self._col_issues.get_many(crash_ids)
+        return {doc_dict["_key"]: self._to_orm(doc_dict) for doc_dict in docs}
+
     @maybe_unknown_error
     async def get_issue(self, crash_id: str) -> Optional[int]:
+        # Only the issue id is projected, not the whole document
+        issues = await self.get_issues([crash_id])
+        return issues.get(crash_id)
+
+    @maybe_unknown_error
+    async def get_issues(self, crash_ids: List[str]) -> Dict[str, int]:
+
+        # fmt: off
+        query, variables = """
+            FOR issue IN DOCUMENT(@@collection, @keys)
+                FILTER !issue.pending
+                RETURN [issue._key, issue.issue_id]
+        """, {
+            "@collection": self._col_issues.name,
+            "keys": crash_ids,
+        }
+        # fmt: on
+
+        cursor: Cursor = await self._db._db.aql.execute(query, bind_vars=variables)
+        return {crash_id: int(issue_id) async for crash_id, issue_id in cursor}
+
+    @maybe_unknown_error
+    async def get(self, crash_id: str) -> Optional[ORMIssue]:
+        if self._coalescer is not None:
+            return await self._coalescer.get(crash_id)
+
         doc_dict = await self._col_issues.get(crash_id)
         if doc_dict is None:
             return None
-        return int(doc_dict['issue_id'])
+        return self._to_orm(doc_dict)
+
+    @maybe_unknown_error_gen
+    async def list_crash_ids(self) -> AsyncIterator[str]:
+
+        # fmt: off
+        query, variables = """
+            FOR issue in @@collection
+                RETURN issue._key
+        """, {
+            "@collection": self._col_issues.name,
+        }
+        # fmt: on
+
+        cursor: Cursor = await self._db._db.aql.execute(
+            query, bind_vars=variables, batch_size=10000, stream=True
+        )
+
+        async with cursor:
+            async for crash_id in cursor:
+                yield crash_id
+
+    async def _find(self, query: str, variables: dict) -> List[ORMIssue]:
+        variables["@collection"] = self._col_issues.name
+        cursor: Cursor = await self._db._db.aql.execute(query, bind_vars=variables)
+        return [self._to_orm(doc_dict) async for doc_dict in cursor]
 
     @maybe_unknown_error
-    @maybe_already_exists(DBAlreadyExistsError)
-    async def insert(self, crash_id: str, issue_id: int) -> None:
-        doc_dict = {
-            "_key": crash_id,
-            "issue_id": issue_id
+    async def find_by_issue_id(self, issue_id: int, config_id: Optional[str] = None) -> List[ORMIssue]:
+
+        # fmt: off
+        query, variables = """
+            FOR issue IN @@collection
+                FILTER issue.issue_id == @issue_id
+                FILTER @config_id == null OR issue.config_id == @config_id
+                FILTER !issue.pending
+                RETURN UNSET(issue, "description_head", "description_tail")
+        """, {
+            "issue_id": issue_id,
+            "config_id": config_id,
+        }
+        # fmt: on
+
+        return await self._find(query, variables)
+
+    @maybe_unknown_error
+    async def list_by_config(self, config_id: str, offset: int = 0, limit: int = 100) -> List[ORMIssue]:
+
+        # fmt: off
+        query, variables = """
+            FOR issue IN @@collection
+                FILTER issue.config_id == @config_id
+                FILTER issue.created_at != null
+                FILTER !issue.pending
+                SORT issue.config_id, issue.created_at
+                LIMIT @offset, @limit
+                RETURN UNSET(issue, "description_head", "description_tail")
+        """, {
+            "config_id": config_id,
+            "offset": offset,
+            "limit": limit,
+        }
+        # fmt: on
+
+        return await self._find(query, variables)
+
+    @maybe_unknown_error
+    async def count_by_config(self, config_id: str) -> int:
+
+        # fmt: off
+        query, variables = """
+            FOR issue IN @@collection
+                FILTER issue.config_id == @config_id
+                FILTER issue.created_at != null
+                FILTER !issue.pending
+                COLLECT WITH COUNT INTO length
+                RETURN length
+        """, {
+            "@collection": self._col_issues.name,
+            "config_id": config_id,
+        }
+        # fmt: on
+
+        cursor: Cursor = await self._db._db.aql.execute(query, bind_vars=variables)
+        return await cursor.next()
+
+    @maybe_unknown_error
+    async def list_created_before(self, created_before: str, limit: int = 100) -> List[ORMIssue]:
+
+        # fmt: off
+        query, variables = """
+            FOR issue IN @@collection
+                // Null is less than any string in AQL
+                FILTER issue.created_at != null
+                FILTER issue.created_at < @created_before
+                FILTER !issue.pending
+                SORT issue.created_at
+                LIMIT @limit
+                RETURN UNSET(issue, "description_head", "description_tail")
+        """, {
+            "created_before": created_before,
+            "limit": limit,
         }
-        await self._col_issues.insert(doc_dict)
+        # fmt: on
+
+        return await self._find(query, variables)
+
+    @maybe_unknown_error
+    @maybe_already_exists(DBAlreadyExistsError)
+    async def insert(self, issue: ORMIssue) -> None:
+        doc_dict = issue.dict(exclude={"crash_id", "rev"})
+        doc_dict["_key"] = issue.crash_id
+        res = await self._col_issues.insert(doc_dict)
+        issue.rev = res["_rev"]
+
+    @maybe_unknown_error
+    @maybe_not_found(DBRecordNotFoundError)
+    async def update(self, issue: ORMIssue) -> bool:
+        doc_dict = issue.dict(exclude={"crash_id", "rev"})
+        doc_dict["_key"] = issue.crash_id
+        doc_dict["_rev"] = issue.rev
+
+        try:
+            res = await self._col_issues.update(doc_dict, check_rev=True)
+        except DocumentRevisionError:
+            return False
+
+        issue.rev = res["_rev"]
+        return True
+
+    @maybe_unknown_error
+    async def delete(self, issue: ORMIssue) -> bool:
+        doc_dict = {"_key": issue.crash_id, "_rev": issue.rev}
+
+        try:
+            res = await self._col_issues.delete(doc_dict, check_rev=True, ignore_missing=True)
+        except DocumentRevisionError:
+            return False
+
+        return bool(res)
+
+    @maybe_unknown_error
+    async def insert_many(self, issues: List[ORMIssue]) -> List[Optional[DatabaseError]]:
+
+        docs = []
+        for issue in issues:
+            doc_dict = issue.dict(exclude={"crash_id", "rev"})
+            doc_dict["_key"] = issue.crash_id
+            docs.append(doc_dict)
+
+        errors: List[Optional[DatabaseError]] = []
+        results = await self._col_issues.insert_many(docs)
+
+        for issue, res in zip(issues, results):
+            if isinstance(res, ArangoError):
+                if res.error_code == UNIQUE_CONSTRAINT_VIOLATED:
+                    errors.append(DBAlreadyExistsError())
+                else:
+                    errors.append(DatabaseError(res))
+            else:
+                issue.rev = res["_rev"]
+                errors.append(None)
+
+        return errors
+
+    @maybe_unknown_error
+    @maybe_not_found(DBRecordNotFoundError)
+    async def update_duplicate_count(self, issue: ORMIssue) -> bool:
+        doc_dict = issue.dict(
+            include={"duplicate_count", "synced_count", "description_head", "description_tail"}
+        )
+        doc_dict["_key"] = issue.crash_id
+        doc_dict["_rev"] = issue.rev
 
+        try:
+            res = await self._col_issues.update(doc_dict, check_rev=True)
+        except DocumentRevisionError:
+            return False
 
+        issue.rev = res["_rev"]
+        return True
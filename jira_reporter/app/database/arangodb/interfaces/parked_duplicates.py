@@ -0,0 +1,110 @@
+from __future__ import annotations
+from typing import TYPE_CHECKING, AsyncIterator, List, Optional
+
+from jira_reporter.app.database.arangodb.interfaces.base import DBBase
+from jira_reporter.app.database.orm import ORMParkedDuplicate
+from jira_reporter.app.database.abstract import IParkedDuplicates
+from .util import maybe_unknown_error
+
+if TYPE_CHECKING:
+    from aioarangodb.collection import StandardCollection
+    from aioarangodb.cursor import Cursor
+    from jira_reporter.app.settings import CollectionSettings
+    from jira_reporter.app.database.arangodb.database import ArangoDB
+
+
+class DBParkedDuplicates(DBBase, IParkedDuplicates):
+
+    _col_parked: StandardCollection
+
+    def __init__(self, db: ArangoDB, collections: CollectionSettings):
+        self._col_parked = db._db[collections.parked_duplicates]
+        super().__init__(db, collections)
+
+    @staticmethod
+    def _to_orm(doc_dict: dict) -> ORMParkedDuplicate:
+        doc_dict["crash_id"] = doc_dict["_key"]
+        return ORMParkedDuplicate(**doc_dict)
+
+    async def _pop(self, query: str, variables: dict) -> List[ORMParkedDuplicate]:
+        variables["@collection"] = self._col_parked.name
+        cursor: Cursor = await self._db._db.aql.execute(query, bind_vars=variables)
+        return [self._to_orm(doc_dict) async for doc_dict in cursor]
+
+    @maybe_unknown_error
+    async def save_many(self, parked: List[ORMParkedDuplicate]) -> None:
+
+        docs = []
+        for item in parked:
+            doc_dict = item.dict(exclude={"crash_id"})
+            doc_dict["_key"] = item.crash_id
+            docs.append(doc_dict)
+
+        # fmt: off
+        query, variables = """
+            FOR doc IN @docs
+                UPSERT { _key: doc._key }
+                INSERT doc
+                UPDATE { duplicate_count: MAX([OLD.duplicate_count, doc.duplicate_count]) }
+                IN @@collection
+        """, {
+            "@collection": self._col_parked.name,
+            "docs": docs,
+        }
+        # fmt: on
+
+        await self._db._db.aql.execute(query, bind_vars=variables)
+
+    @maybe_unknown_error
+    async def pop(self, crash_id: str) -> Optional[ORMParkedDuplicate]:
+
+        # fmt: off
+        query, variables = """
+            FOR doc IN DOCUMENT(@@collection, [@key])
+                REMOVE doc IN @@collection
+                RETURN OLD
+        """, {
+            "key": crash_id,
+        }
+        # fmt: on
+
+        parked = await self._pop(query, variables)
+        return parked[0] if parked else None
+
+    @maybe_unknown_error
+    async def pop_expired(self, parked_before: str, limit: int = 100) -> List[ORMParkedDuplicate]:
+
+        # fmt: off
+        query, variables = """
+            FOR doc IN @@collection
+                FILTER doc.parked_at < @parked_before
+                SORT doc.parked_at
+                LIMIT @limit
+                REMOVE doc IN @@collection
+                RETURN OLD
+        """, {
+            "parked_before": parked_before,
+            "limit": limit,
+        }
+        # fmt: on
+
+        return await self._pop(query, variables)
+
+    async def list_crash_ids(self) -> AsyncIterator[str]:
+
+        # fmt: off
+        query, variables = """
+            FOR doc IN @@collection
+                RETURN doc._key
+        """, {
+            "@collection": self._col_parked.name,
+        }
+        # fmt: on
+
+        cursor: Cursor = await self._db._db.aql.execute(
+            query, bind_vars=variables, batch_size=10000, stream=True
+        )
+
+        async with cursor:
+            async for crash_id in cursor:
+                yield crash_id
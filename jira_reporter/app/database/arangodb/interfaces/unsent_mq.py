@@ -1,12 +1,17 @@
 from __future__ import annotations
-from typing import TYPE_CHECKING, Dict
+from typing import TYPE_CHECKING, AsyncIterator, Dict, Set
+
+import hashlib
+import json
+import time
 
 from ...abstract import IUnsentMessages
 
 from .base import DBBase
-from .util import maybe_unknown_error
+from .util import maybe_unknown_error, maybe_unknown_error_gen
 
 if TYPE_CHECKING:
+    from typing import Iterator, List, Tuple
     from jira_reporter.app.settings import CollectionSettings
     from aioarangodb.collection import StandardCollection
     from aioarangodb.cursor import Cursor
@@ -15,54 +20,126 @@ if TYPE_CHECKING:
 
 class DBUnsentMessages(DBBase, IUnsentMessages):
 
-    _col_messages: StandardCollection
+    """Saves only messages changed since the previous save, per replica"""
 
-    def __init__(self, db: ArangoDB, collections: CollectionSettings):
+    _col_messages: StandardCollection
+    _instance_id: str
+    _batch_size: int
+    _saved: Set[str]
+
+    def __init__(
+        self,
+        db: ArangoDB,
+        collections: CollectionSettings,
+        instance_id: str,
+        batch_size: int = 500,
+    ):
         self._col_messages = db._db[collections.unsent_messages]
+        self._instance_id = instance_id
+        self._batch_size = batch_size
+        self._saved = set()
         super().__init__(db, collections)
 
+    def _keyed_messages(self, queue_name: str, messages: list) -> Iterator[Tuple[str, dict]]:
+
+        occurrences: Dict[str, int] = {}
+        for message in messages:
+            assert "name" in message
+            assert "body" in message
+
+            content = json.dumps(
+                [self._instance_id, queue_name, message["name"], message["body"]],
+                sort_keys=True,
+            ).encode()
+
+            digest = hashlib.blake2b(content, digest_size=16).hexdigest()
+            occurrence = occurrences.get(digest, 0)
+            occurrences[digest] = occurrence + 1
+
+            yield f"{digest}-{occurrence}", message
+
+    async def _remove(self, keys: List[str]):
+
+        # fmt: off
+        query, variables = """
+            FOR key IN @keys
+                REMOVE key IN @@collection OPTIONS { ignoreErrors: true }
+        """, {
+            "@collection": self._col_messages.name,
+            "keys": keys,
+        }
+        # fmt: on
+
+        await self._db._db.aql.execute(query, bind_vars=variables)
+
     @maybe_unknown_error
     async def save_unsent_messages(self, unsent_messages: Dict[str, list]):
 
-        await self._col_messages.truncate()
+        # New messages are placed after all saved ones
+        order = time.time_ns()
+        present: Set[str] = set()
+        docs = []
+
         for queue_name, messages in unsent_messages.items():
+            for key, message in self._keyed_messages(queue_name, messages):
+                present.add(key)
+                if key in self._saved:
+                    continue
 
-            docs = []
-            for i, message in enumerate(messages):
-                assert "name" in message
-                assert "body" in message
+                order += 1
                 docs.append(
                     {
+                        "_key": key,
                         "name": message["name"],
                         "body": message["body"],
+                        "instance": self._instance_id,
                         "queue": queue_name,
-                        "order": i,
+                        "order": order,
                     }
                 )
 
-            if docs:
-                await self._col_messages.insert_many(docs)
+                if len(docs) >= self._batch_size:
+                    await self._col_messages.insert_many(docs, overwrite=True, silent=True)
+                    self._saved.update(doc["_key"] for doc in docs)
+                    docs = []
 
-    @maybe_unknown_error
-    async def load_unsent_messages(self) -> Dict[str, list]:
+        if docs:
+            await self._col_messages.insert_many(docs, overwrite=True, silent=True)
+            self._saved.update(doc["_key"] for doc in docs)
+
+        removed = list(self._saved - present)
+        for i in range(0, len(removed), self._batch_size):
+            chunk = removed[i : i + self._batch_size]
+            await self._remove(chunk)
+            self._saved.difference_update(chunk)
+
+    @maybe_unknown_error_gen
+    async def load_unsent_messages(self) -> AsyncIterator[Dict[str, list]]:
 
         # fmt: off
         query, variables = """
             FOR msg in @@collection
-                SORT msg.order
-                COLLECT queue = msg.queue INTO groupedByQueue
-                RETURN groupedByQueue[*].msg
+                FILTER msg.instance == @instance
+                SORT msg.queue, msg.order
+                RETURN KEEP(msg, "_key", "queue", "name", "body")
         """, {
             "@collection": self._col_messages.name,
+            "instance": self._instance_id,
         }
         # fmt: on
 
-        unsent_messages: Dict[str, list] = {}
-        cursor: Cursor = await self._db._db.aql.execute(query, bind_vars=variables)
-        grouped_by_queue = [doc async for doc in cursor]
+        cursor: Cursor = await self._db._db.aql.execute(
+            query,
+            bind_vars=variables,
+            batch_size=self._batch_size,
+            stream=True,
+        )
 
-        for grouped_messages in grouped_by_queue:
-            for message in grouped_messages:
+        async with cursor:
+            unsent_messages: Dict[str, list] = {}
+            count = 0
+
+            async for message in cursor:
 
                 mq_message = {
                     "name": message["name"],
@@ -70,14 +147,14 @@ class DBUnsentMessages(DBBase, IUnsentMessages):
                 }
 
                 queue = message["queue"]
+                unsent_messages.setdefault(queue, []).append(mq_message)
+                self._saved.add(message["_key"])
+                count += 1
 
-                try:
-                    messages = unsent_messages[queue]
-                    messages.append(mq_message)
-
-                except KeyError:
-                    messages = list()
-                    messages.append(mq_message)
-                    unsent_messages[queue] = messages
+                if count >= self._batch_size:
+                    yield unsent_messages
+                    unsent_messages = {}
+                    count = 0
 
-        return unsent_messages
+            if unsent_messages:
+                yield unsent_messages
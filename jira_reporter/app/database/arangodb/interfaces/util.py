@@ -29,6 +29,18 @@ def maybe_unknown_error(func):
     return wrapper
 
 
+def maybe_unknown_error_gen(func):
+    @functools.wraps(func)
+    async def wrapper(*args, **kwargs):
+        try:
+            async for item in func(*args, **kwargs):
+                yield item
+        except (ArangoError, ClientConnectionError) as e:
+            raise DatabaseError(e) from e
+
+    return wrapper
+
+
 def maybe_not_found(ExceptionRaised: Type[DatabaseError]):
     def wrapper(func):
         @functools.wraps(func)
@@ -0,0 +1,474 @@
+from __future__ import annotations
+from typing import TYPE_CHECKING, Generic, Hashable, Optional, Tuple, TypeVar
+from collections import OrderedDict
+from array import array
+import hashlib
+import logging
+import math
+import time
+
+from ..metrics import CACHE_HITS, CACHE_MISSES, CACHE_FILTER_SKIPS
+from .abstract import IConfigs, IIssues
+from .errors import DBAlreadyExistsError
+
+if TYPE_CHECKING:
+    from typing import AsyncIterator, Dict, List
+    from ..settings import CacheSettings
+    from .errors import DatabaseError
+    from .orm import ORMIssue, ORMJiraConfig
+
+K = TypeVar("K", bound=Hashable)
+V = TypeVar("V")
+
+
+class LRUCache(Generic[K, V]):
+
+    """Bounded LRU cache with optional expiration of entries"""
+
+    _name: str
+    _max_size: int
+    _ttl: Optional[float]
+    _entries: OrderedDict
+
+    def __init__(self, name: str, max_size: int, ttl: Optional[float] = None):
+        self._name = name
+        self._max_size = max_size
+        self._ttl = ttl
+        self._entries = OrderedDict()
+        self._hits = CACHE_HITS.labels(name)
+        self._misses = CACHE_MISSES.labels(name)
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, key: K) -> Optional[V]:
+
+        entry: Optional[Tuple[V, float]] = self._entries.get(key)
+
+        if entry is not None:
+            value, expires_at = entry
+            if expires_at >= time.monotonic():
+                self._entries.move_to_end(key)
+                self._hits.inc()
+                return value
+
+            del self._entries[key]
+
+        self._misses.inc()
+        return None
+
+    def put(self, key: K, value: V):
+
+        if self._max_size <= 0:
+            return
+
+        expires_at = float("inf")
+        if self._ttl is not None:
+            expires_at = time.monotonic() + self._ttl
+
+        self._entries[key] = (value, expires_at)
+        self._entries.move_to_end(key)
+
+        while len(self._entries) > self._max_size:
+            self._entries.popitem(last=False)
+
+    def pop(self, key: K):
+        self._entries.pop(key, None)
+
+    def clear(self):
+        self._entries.clear()
+
+
+class CachedConfigs(IConfigs):
+
+    """
+    Read-through cache of integration configs.
+    Cached configs must not be modified by callers.
+    """
+
+    _configs: IConfigs
+    _cache: LRUCache[str, ORMJiraConfig]
+
+    def __init__(self, configs: IConfigs, settings: CacheSettings):
+        self._configs = configs
+        self._logger = logging.getLogger("db.cache")
+        self._cache = LRUCache(
+            "configs",
+            settings.configs_max_size,
+            settings.configs_ttl,
+        )
+
+    async def warm_up(self):
+
+        for config in await self._configs.list_all():
+            self._cache.put(config.id, config)
+
+        self._logger.info("Loaded %d configs into cache", len(self._cache))
+
+    def invalidate(self, config_id: Optional[str] = None):
+        if config_id is None:
+            self._cache.clear()
+        else:
+            self._cache.pop(config_id)
+
+    async def get(self, config_id: str) -> Optional[ORMJiraConfig]:
+
+        config = self._cache.get(config_id)
+        if config is not None:
+            return config
+
+        config = await self._configs.get(config_id)
+        if config is not None:
+            self._cache.put(config_id, config)
+
+        return config
+
+    async def get_many(self, config_ids: List[str]) -> Dict[str, ORMJiraConfig]:
+
+        configs = {}
+        missing = []
+
+        for config_id in config_ids:
+            config = self._cache.get(config_id)
+            if config is not None:
+                configs[config_id] = config
+            else:
+                missing.append(config_id)
+
+        if missing:
+            loaded = await self._configs.get_many(missing)
+            for config_id, config in loaded.items():
+                self._cache.put(config_id, config)
+            configs.update(loaded)
+
+        return configs
+
+    async def list_all(self) -> List[ORMJiraConfig]:
+        return await self._configs.list_all()
+
+    async def insert(self, config: ORMJiraConfig) -> None:
+        await self._configs.insert(config)
+        self._cache.pop(config.id)
+
+    async def update(self, config: ORMJiraConfig) -> Tuple[ORMJiraConfig, ORMJiraConfig]:
+        try:
+            return await self._configs.update(config)
+        finally:
+            self._cache.pop(config.id)
+
+    async def delete(self, config_id: str) -> None:
+        try:
+            await self._configs.delete(config_id)
+        finally:
+            self._cache.pop(config_id)
+
+
+def _hash128(key: str) -> Tuple[int, int]:
+    digest = hashlib.blake2b(key.encode(), digest_size=16).digest()
+    return (
+        int.from_bytes(digest[:8], "little"),
+        int.from_bytes(digest[8:], "little"),
+    )
+
+
+class BloomFilter:
+
+    """
+    Probabilistic set of strings. Answers either
+    'definitely not present' or 'maybe present'.
+    """
+
+    _bits: bytearray
+    _num_bits: int
+    _num_hashes: int
+    _capacity: int
+    _count: int
+
+    def __init__(self, capacity: int, error_rate: float):
+        num_bits = -capacity * math.log(error_rate) / math.log(2) ** 2
+        self._num_bits = max(int(num_bits), 8)
+        self._num_hashes = max(round(self._num_bits / capacity * math.log(2)), 1)
+        self._bits = bytearray((self._num_bits + 7) // 8)
+        self._capacity = capacity
+        self._count = 0
+
+    def __len__(self):
+        return self._count
+
+    @property
+    def is_full(self):
+        return self._count > self._capacity
+
+    def _positions(self, key: str):
+        h1, h2 = _hash128(key)
+        for i in range(self._num_hashes):
+            yield (h1 + i * h2) % self._num_bits
+
+    def add(self, key: str):
+        for pos in self._positions(key):
+            self._bits[pos >> 3] |= 1 << (pos & 7)
+        self._count += 1
+
+    def __contains__(self, key: str):
+        return all(
+            self._bits[pos >> 3] & (1 << (pos & 7))
+            for pos in self._positions(key)
+        )
+
+
+class IssueLookupCache:
+
+    """Compact set-associative cache of crash_id -> (issue_id, duplicate_count)"""
+
+    WAYS = 4
+
+    _num_sets: int
+    _keys: array
+    _issue_ids: array
+    _counts: array
+    _stamps: array
+    _clock: int
+
+    def __init__(self, max_size: int):
+        self._num_sets = max_size // self.WAYS
+        size = self._num_sets * self.WAYS
+        self._keys = array("Q", bytes(8 * size))
+        self._issue_ids = array("q", bytes(8 * size))
+        self._counts = array("q", bytes(8 * size))
+        self._stamps = array("Q", bytes(8 * size))
+        self._clock = 0
+        self._hits = CACHE_HITS.labels("issues")
+        self._misses = CACHE_MISSES.labels("issues")
+
+    @staticmethod
+    def _fingerprint(crash_id: str) -> int:
+        # Zero marks empty slot
+        return _hash128(crash_id)[0] or 1
+
+    def _find(self, crash_id: str):
+
+        if self._num_sets == 0:
+            return 0, range(0)
+
+        key = self._fingerprint(crash_id)
+        start = (key % self._num_sets) * self.WAYS
+        return key, range(start, start + self.WAYS)
+
+    def get(self, crash_id: str) -> Optional[Tuple[int, int]]:
+
+        key, slots = self._find(crash_id)
+        for i in slots:
+            if self._keys[i] == key:
+                self._clock += 1
+                self._stamps[i] = self._clock
+                self._hits.inc()
+                return self._issue_ids[i], self._counts[i]
+
+        self._misses.inc()
+        return None
+
+    def put(self, crash_id: str, issue_id: int, duplicate_count: int):
+
+        key, slots = self._find(crash_id)
+        victim = None
+
+        for i in slots:
+            if self._keys[i] == key:
+                victim = i
+                duplicate_count = max(duplicate_count, self._counts[i])
+                break
+            if victim is None or self._stamps[i] < self._stamps[victim]:
+                victim = i
+
+        if victim is None:
+            return
+
+        self._clock += 1
+        self._keys[victim] = key
+        self._issue_ids[victim] = issue_id
+        self._counts[victim] = duplicate_count
+        self._stamps[victim] = self._clock
+
+
+class CachedIssues(IIssues):
+
+    """Caches issue mappings, duplicate counts and short-lived issue records"""
+
+    _issues: IIssues
+    _cache: IssueLookupCache
+    _records: LRUCache[str, ORMIssue]
+    _filter: Optional[BloomFilter]
+
+    def __init__(self, issues: IIssues, settings: CacheSettings):
+        self._issues = issues
+        self._settings = settings
+        self._logger = logging.getLogger("db.cache")
+        self._cache = IssueLookupCache(settings.issues_max_size)
+        self._records = LRUCache(
+            "issue_records",
+            settings.issue_records_max_size,
+            settings.issue_records_ttl,
+        )
+        self._filter_skips = CACHE_FILTER_SKIPS.labels("issues")
+        self._filter = None
+
+    async def warm_up(self):
+
+        if not self._settings.issues_filter_enabled:
+            return
+
+        bloom = BloomFilter(
+            self._settings.issues_filter_capacity,
+            self._settings.issues_filter_error_rate,
+        )
+
+        async for crash_id in self._issues.list_crash_ids():
+            bloom.add(crash_id)
+
+        if bloom.is_full:
+            self._logger.warning(
+                "Too many issues (%d) for negative filter. Please, increase its capacity",
+                len(bloom),
+            )
+
+        self._filter = bloom
+        self._logger.info("Loaded %d issues into negative filter", len(bloom))
+
+    def _definitely_missing(self, crash_id: str):
+        if self._filter is not None and crash_id not in self._filter:
+            self._filter_skips.inc()
+            return True
+
+        return False
+
+    def _remember(self, issue: ORMIssue):
+        if not issue.pending:
+            # Count not written to Jira yet must not be skipped by duplicates
+            synced_count = issue.duplicate_count if issue.is_synced else issue.synced_count
+            self._cache.put(issue.crash_id, issue.issue_id, synced_count)
+            self._records.put(issue.crash_id, issue.copy())
+        else:
+            self._records.pop(issue.crash_id)
+
+        if self._filter is not None:
+            self._filter.add(issue.crash_id)
+
+    def cached_duplicate_count(self, crash_id: str) -> Optional[int]:
+        entry = self._cache.get(crash_id)
+        return entry[1] if entry else None
+
+    async def get_issue(self, crash_id: str) -> Optional[int]:
+
+        if self._definitely_missing(crash_id):
+            return None
+
+        entry = self._cache.get(crash_id)
+        if entry is not None:
+            return entry[0]
+
+        issue = await self._issues.get(crash_id)
+        if issue is None:
+            return None
+
+        self._remember(issue)
+        if issue.pending:
+            return None
+
+        return issue.issue_id
+
+    async def get_issues(self, crash_ids: List[str]) -> Dict[str, int]:
+
+        issues = {}
+        missing = []
+
+        for crash_id in crash_ids:
+            if self._definitely_missing(crash_id):
+                continue
+
+            entry = self._cache.get(crash_id)
+            if entry is not None:
+                issues[crash_id] = entry[0]
+            else:
+                missing.append(crash_id)
+
+        if missing:
+            loaded = await self._issues.get_issues(missing)
+            for crash_id, issue_id in loaded.items():
+                self._cache.put(crash_id, issue_id, 0)
+            issues.update(loaded)
+
+        return issues
+
+    async def get(self, crash_id: str) -> Optional[ORMIssue]:
+
+        if self._definitely_missing(crash_id):
+            return None
+
+        # Callers modify returned record
+        issue = self._records.get(crash_id)
+        if issue is not None:
+            return issue.copy()
+
+        issue = await self._issues.get(crash_id)
+        if issue is not None:
+            self._remember(issue)
+
+        return issue
+
+    def list_crash_ids(self) -> AsyncIterator[str]:
+        return self._issues.list_crash_ids()
+
+    async def find_by_issue_id(self, issue_id: int, config_id: Optional[str] = None) -> List[ORMIssue]:
+        return await self._issues.find_by_issue_id(issue_id, config_id)
+
+    async def list_by_config(self, config_id: str, offset: int = 0, limit: int = 100) -> List[ORMIssue]:
+        return await self._issues.list_by_config(config_id, offset, limit)
+
+    async def count_by_config(self, config_id: str) -> int:
+        return await self._issues.count_by_config(config_id)
+
+    async def list_created_before(self, created_before: str, limit: int = 100) -> List[ORMIssue]:
+        return await self._issues.list_created_before(created_before, limit)
+
+    async def insert(self, issue: ORMIssue) -> None:
+
+        try:
+            await self._issues.insert(issue)
+        except DBAlreadyExistsError:
+            # Inserted by another instance, so filter must not hide it
+            if self._filter is not None:
+                self._filter.add(issue.crash_id)
+            raise
+
+        self._remember(issue)
+
+    async def update(self, issue: ORMIssue) -> bool:
+        self._records.pop(issue.crash_id)
+        updated = await self._issues.update(issue)
+        if updated:
+            self._remember(issue)
+
+        return updated
+
+    async def delete(self, issue: ORMIssue) -> bool:
+        self._records.pop(issue.crash_id)
+        return await self._issues.delete(issue)
+
+    async def insert_many(self, issues: List[ORMIssue]) -> List[Optional[DatabaseError]]:
+        errors = await self._issues.insert_many(issues)
+        for issue, error in zip(issues, errors):
+            if error is None:
+                self._remember(issue)
+
+        return errors
+
+    async def flush(self) -> None:
+        await self._issues.flush()
+
+    async def update_duplicate_count(self, issue: ORMIssue) -> bool:
+        self._records.pop(issue.crash_id)
+        updated = await self._issues.update_duplicate_count(issue)
+        if updated:
+            self._remember(issue)
+
+        return updated
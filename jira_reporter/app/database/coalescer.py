@@ -0,0 +1,62 @@
+from __future__ import annotations
+from typing import TYPE_CHECKING, Awaitable, Callable, Dict, Generic, Hashable, List, Optional, Set, TypeVar
+
+import asyncio
+
+K = TypeVar("K", bound=Hashable)
+V = TypeVar("V")
+
+if TYPE_CHECKING:
+    BatchFunc = Callable[[List[K]], Awaitable[Dict[K, V]]]
+
+
+class RequestCoalescer(Generic[K, V]):
+
+    """Merges concurrent single-key reads into one batched read"""
+
+    _batch_func: BatchFunc
+    _pending: Dict[K, asyncio.Future]
+    _tasks: Set[asyncio.Task]
+
+    def __init__(self, batch_func: BatchFunc):
+        self._batch_func = batch_func
+        self._pending = dict()
+        self._tasks = set()
+
+    async def get(self, key: K) -> Optional[V]:
+
+        future = self._pending.get(key)
+
+        if future is None:
+            loop = asyncio.get_running_loop()
+            if not self._pending:
+                loop.call_soon(self._dispatch)
+
+            future = loop.create_future()
+            self._pending[key] = future
+
+        result = await asyncio.shield(future)
+
+        # Callers may modify the result
+        if result is not None:
+            result = result.copy()
+
+        return result
+
+    def _dispatch(self):
+        pending, self._pending = self._pending, dict()
+        task = asyncio.create_task(self._load(pending))
+        task.add_done_callback(self._tasks.discard)
+        self._tasks.add(task)
+
+    async def _load(self, pending: Dict[K, asyncio.Future]):
+
+        try:
+            results = await self._batch_func(list(pending))
+        except Exception as e:
+            for future in pending.values():
+                future.set_exception(e)
+            return
+
+        for key, future in pending.items():
+            future.set_result(results.get(key))
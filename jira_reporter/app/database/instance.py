@@ -1,8 +1,6 @@
 from __future__ import annotations
 from typing import TYPE_CHECKING
 
-from .arangodb.database import ArangoDB
-from .mongodb.database import MongoDB
 import logging
 
 if TYPE_CHECKING:
@@ -15,10 +13,21 @@ async def db_init(settings: AppSettings) -> IDatabase:
     logger = logging.getLogger("db")
     db_engine = settings.database.engine.lower()
 
+    # Only the selected engine is imported
     if db_engine == "arangodb":
+        from .arangodb.database import ArangoDB
         logger.info("Using ArangoDB driver")
         db = await ArangoDB.create(settings)
+    elif db_engine == "sqlite":
+        from .sqlite.database import SQLiteDB
+        logger.info("Using SQLite driver")
+        db = await SQLiteDB.create(settings)
+    elif db_engine == "memory":
+        from .memory.database import MemoryDB
+        logger.warning("Using in-memory database. Data will be lost on exit")
+        db = await MemoryDB.create(settings)
     # elif db_engine == "mongodb":
+    #     from .mongodb.database import MongoDB
     #     logger.info("Using MongoDB driver")
     #     db = await MongoDB.create(settings)
     else:
@@ -0,0 +1,110 @@
+from __future__ import annotations
+from typing import TYPE_CHECKING, Optional
+import logging
+
+from jira_reporter.app.util import testing_only
+
+from .interfaces.configs import DBConfigs
+from .interfaces.issues import DBIssues
+from .interfaces.unsent_mq import DBUnsentMessages
+from .interfaces.parked_duplicates import DBParkedDuplicates
+from ..abstract import IDatabase
+from ..cache import CachedConfigs, CachedIssues
+from ..write_behind import WriteBehindIssues
+
+if TYPE_CHECKING:
+    from jira_reporter.app.settings import AppSettings
+    from ..abstract import IConfigs, IIssues, IParkedDuplicates, IUnsentMessages
+
+
+class MemoryDB(IDatabase):
+
+    """Keeps all records in process memory. Intended for tests"""
+
+    _db_configs: IConfigs
+    _db_issues: IIssues
+    _db_unsent_mq: IUnsentMessages
+    _db_parked_duplicates: IParkedDuplicates
+    _write_behind: Optional[WriteBehindIssues]
+
+    _logger: logging.Logger
+    _settings: AppSettings
+    _tables: tuple
+    _is_closed: bool
+
+    @property
+    def unsent_mq(self):
+        return self._db_unsent_mq
+
+    @property
+    def configs(self):
+        return self._db_configs
+
+    @property
+    def issues(self) -> IIssues:
+        return self._db_issues
+
+    @property
+    def parked_duplicates(self) -> IParkedDuplicates:
+        return self._db_parked_duplicates
+
+    async def _init(self, settings: AppSettings):
+
+        self._logger = logging.getLogger("db")
+        self._settings = settings
+        latency = settings.database.memory_latency
+        coalesce_reads = settings.database.coalesce_reads
+
+        configs = DBConfigs(self, latency, coalesce_reads)
+        issues = DBIssues(self, latency, coalesce_reads)
+        unsent_mq = DBUnsentMessages(
+            self,
+            settings.message_queue.instance_id,
+            latency,
+            settings.database.unsent_messages_batch_size,
+        )
+
+        parked_duplicates = DBParkedDuplicates(self, latency)
+
+        self._tables = (configs, issues, unsent_mq, parked_duplicates)
+        self._db_configs = CachedConfigs(configs, settings.cache)
+        self._db_unsent_mq = unsent_mq
+        self._db_parked_duplicates = parked_duplicates
+
+        db_issues: IIssues = issues
+        self._write_behind = None
+
+        if settings.database.write_behind:
+            db_issues = WriteBehindIssues(db_issues, settings.database)
+            self._write_behind = db_issues
+
+        self._db_issues = CachedIssues(db_issues, settings.cache)
+        self._is_closed = False
+
+        await self._db_issues.warm_up()
+
+    @staticmethod
+    async def create(settings):
+        _self = MemoryDB()
+        await _self._init(settings)
+        return _self
+
+    @testing_only
+    async def truncate_all_collections(self):
+        self._logger.warning("Clearing all collections...")
+        self._db_configs.invalidate()
+        for table in self._tables:
+            table.clear()
+
+        # Cached issues are never invalidated, so cache is replaced
+        self._db_issues = CachedIssues(self._db_issues._issues, self._settings.cache)
+        await self._db_issues.warm_up()
+
+    async def close(self):
+
+        assert not self._is_closed, "Database connection has been already closed"
+
+        if self._write_behind:
+            await self._write_behind.close()
+
+        self._is_closed = True
@@ -0,0 +1,22 @@
+from __future__ import annotations
+from typing import TYPE_CHECKING
+
+import asyncio
+
+if TYPE_CHECKING:
+    from jira_reporter.app.database.memory.database import MemoryDB
+
+
+class DBBase:
+
+    _db: MemoryDB
+    _latency: float
+
+    def __init__(self, db: MemoryDB, latency: float = 0):
+        self._db = db
+        self._latency = latency
+
+    async def _round_trip(self):
+        """Simulates network round trip to database server"""
+        if self._latency > 0:
+            await asyncio.sleep(self._latency)
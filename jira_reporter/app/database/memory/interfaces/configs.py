@@ -0,0 +1,72 @@
+from __future__ import annotations
+from typing import TYPE_CHECKING, Dict, List, Optional, Tuple
+
+from uuid import uuid4
+
+from jira_reporter.app.database.memory.interfaces.base import DBBase
+from jira_reporter.app.database.errors import DBAlreadyExistsError, DBRecordNotFoundError
+from jira_reporter.app.database.abstract import IConfigs
+from jira_reporter.app.database.coalescer import RequestCoalescer
+
+if TYPE_CHECKING:
+    from jira_reporter.app.database.orm import ORMJiraConfig
+    from jira_reporter.app.database.memory.database import MemoryDB
+
+
+class DBConfigs(DBBase, IConfigs):
+
+    _configs: Dict[str, ORMJiraConfig]
+    _coalescer: Optional[RequestCoalescer[str, ORMJiraConfig]]
+
+    def __init__(self, db: MemoryDB, latency: float = 0, coalesce_reads: bool = False):
+        self._configs = dict()
+        self._coalescer = RequestCoalescer(self.get_many) if coalesce_reads else None
+        super().__init__(db, latency)
+
+    async def get(self, config_id: str) -> Optional[ORMJiraConfig]:
+        if self._coalescer is not None:
+            return await self._coalescer.get(config_id)
+
+        await self._round_trip()
+        config = self._configs.get(config_id)
+        if config is None:
+            return None
+        return config.copy()
+
+    async def get_many(self, config_ids: List[str]) -> Dict[str, ORMJiraConfig]:
+        await self._round_trip()
+        configs = {}
+        for config_id in config_ids:
+            config = self._configs.get(config_id)
+            if config is not None:
+                configs[config_id] = config.copy()
+        return configs
+
+    async def list_all(self) -> List[ORMJiraConfig]:
+        await self._round_trip()
+        return [config.copy() for config in self._configs.values()]
+
+    async def insert(self, config: ORMJiraConfig) -> None:
+        await self._round_trip()
+        if config.id is None:
+            config.id = uuid4().hex
+        elif config.id in self._configs:
+            raise DBAlreadyExistsError()
+        self._configs[config.id] = config.copy()
+
+    async def update(self, config: ORMJiraConfig) -> Tuple[ORMJiraConfig, ORMJiraConfig]:
+        await self._round_trip()
+        old = self._configs.get(config.id)
+        if old is None:
+            raise DBRecordNotFoundError()
+        new = config.copy()
+        self._configs[config.id] = new
+        return old.copy(), new.copy()
+
+    async def delete(self, config_id: str) -> None:
+        await self._round_trip()
+        if self._configs.pop(config_id, None) is None:
+            raise DBRecordNotFoundError()
+
+    def clear(self):
+        self._configs.clear()
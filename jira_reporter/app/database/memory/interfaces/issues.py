@@ -0,0 +1,177 @@
+from __future__ import annotations
+from typing import TYPE_CHECKING, AsyncIterator, Dict, List, Optional
+
+from jira_reporter.app.database.memory.interfaces.base import DBBase
+from jira_reporter.app.database.errors import DatabaseError, DBAlreadyExistsError, DBRecordNotFoundError
+from jira_reporter.app.database.abstract import IIssues
+from jira_reporter.app.database.coalescer import RequestCoalescer
+
+if TYPE_CHECKING:
+    from typing import Callable
+    from jira_reporter.app.database.orm import ORMIssue
+    from jira_reporter.app.database.memory.database import MemoryDB
+
+
+class DBIssues(DBBase, IIssues):
+
+    """Issues are kept in insertion order, like documents in a collection"""
+
+    _issues: Dict[str, ORMIssue]
+    _coalescer: Optional[RequestCoalescer[str, ORMIssue]]
+    _last_rev: int
+
+    def __init__(self, db: MemoryDB, latency: float = 0, coalesce_reads: bool = False):
+        self._issues = dict()
+        self._coalescer = RequestCoalescer(self._get_many) if coalesce_reads else None
+        self._last_rev = 0
+        super().__init__(db, latency)
+
+    def _next_rev(self) -> str:
+        self._last_rev += 1
+        return str(self._last_rev)
+
+    @staticmethod
+    def _without_description(issue: ORMIssue) -> ORMIssue:
+        return issue.copy(update={"description_head": None, "description_tail": None})
+
+    async def _get_many(self, crash_ids: List[str]) -> Dict[str, ORMIssue]:
+        await self._round_trip()
+        issues = {}
+        for crash_id in crash_ids:
+            issue = self._issues.get(crash_id)
+            if issue is not None:
+                issues[crash_id] = issue.copy()
+        return issues
+
+    async def get_issue(self, crash_id: str) -> Optional[int]:
+        issue = await self.get(crash_id)
+        if issue is None or issue.pending:
+            return None
+        return issue.issue_id
+
+    async def get_issues(self, crash_ids: List[str]) -> Dict[str, int]:
+        issues = await self._get_many(crash_ids)
+        return {
+            crash_id: issue.issue_id
+            for crash_id, issue in issues.items()
+            if not issue.pending
+        }
+
+    async def get(self, crash_id: str) -> Optional[ORMIssue]:
+        if self._coalescer is not None:
+            return await self._coalescer.get(crash_id)
+
+        await self._round_trip()
+        issue = self._issues.get(crash_id)
+        if issue is None:
+            return None
+        return issue.copy()
+
+    async def list_crash_ids(self) -> AsyncIterator[str]:
+        await self._round_trip()
+        for crash_id in list(self._issues):
+            yield crash_id
+
+    async def _find(self, predicate: Callable[[ORMIssue], bool]) -> List[ORMIssue]:
+        await self._round_trip()
+        return [
+            self._without_description(issue)
+            for issue in self._issues.values()
+            if not issue.pending and predicate(issue)
+        ]
+
+    @staticmethod
+    def _is_listed(issue: ORMIssue, config_id: str) -> bool:
+        return issue.config_id == config_id and issue.created_at is not None
+
+    async def find_by_issue_id(self, issue_id: int, config_id: Optional[str] = None) -> List[ORMIssue]:
+        return await self._find(
+            lambda issue: issue.issue_id == issue_id
+            and (config_id is None or issue.config_id == config_id)
+        )
+
+    async def list_by_config(self, config_id: str, offset: int = 0, limit: int = 100) -> List[ORMIssue]:
+        issues = await self._find(lambda issue: self._is_listed(issue, config_id))
+        issues.sort(key=lambda issue: issue.created_at)
+        return issues[offset : offset + limit]
+
+    async def count_by_config(self, config_id: str) -> int:
+        return len(await self._find(lambda issue: self._is_listed(issue, config_id)))
+
+    async def list_created_before(self, created_before: str, limit: int = 100) -> List[ORMIssue]:
+        issues = await self._find(
+            lambda issue: issue.created_at is not None and issue.created_at < created_before
+        )
+        issues.sort(key=lambda issue: issue.created_at)
+        return issues[:limit]
+
+    def _insert(self, issue: ORMIssue):
+        if issue.crash_id in self._issues:
+            raise DBAlreadyExistsError()
+        issue.rev = self._next_rev()
+        self._issues[issue.crash_id] = issue.copy()
+
+    async def insert(self, issue: ORMIssue) -> None:
+        await self._round_trip()
+        self._insert(issue)
+
+    async def insert_many(self, issues: List[ORMIssue]) -> List[Optional[DatabaseError]]:
+
+        await self._round_trip()
+        errors: List[Optional[DatabaseError]] = []
+
+        for issue in issues:
+            try:
+                self._insert(issue)
+                errors.append(None)
+            except DBAlreadyExistsError as e:
+                errors.append(e)
+
+        return errors
+
+    async def update(self, issue: ORMIssue) -> bool:
+
+        await self._round_trip()
+        stored = self._issues.get(issue.crash_id)
+
+        if stored is None:
+            raise DBRecordNotFoundError()
+
+        if stored.rev != issue.rev:
+            return False
+
+        issue.rev = self._next_rev()
+        self._issues[issue.crash_id] = issue.copy()
+        return True
+
+    async def delete(self, issue: ORMIssue) -> bool:
+
+        await self._round_trip()
+        stored = self._issues.get(issue.crash_id)
+
+        if stored is None or stored.rev != issue.rev:
+            return False
+
+        del self._issues[issue.crash_id]
+        return True
+
+    async def update_duplicate_count(self, issue: ORMIssue) -> bool:
+
+        await self._round_trip()
+        stored = self._issues.get(issue.crash_id)
+
+        if stored is None:
+            raise DBRecordNotFoundError()
+
+        if stored.rev != issue.rev:
+            return False
+
+        stored.duplicate_count = issue.duplicate_count
+        stored.synced_count = issue.synced_count
+        stored.description_head = issue.description_head
+        stored.description_tail = issue.description_tail
+        stored.rev = issue.rev = self._next_rev()
+        return True
+
+    def clear(self):
+        self._issues.clear()
@@ -0,0 +1,54 @@
+from __future__ import annotations
+from typing import TYPE_CHECKING, AsyncIterator, Dict, List, Optional
+
+from jira_reporter.app.database.memory.interfaces.base import DBBase
+from jira_reporter.app.database.abstract import IParkedDuplicates
+
+if TYPE_CHECKING:
+    from jira_reporter.app.database.orm import ORMParkedDuplicate
+    from jira_reporter.app.database.memory.database import MemoryDB
+
+
+class DBParkedDuplicates(DBBase, IParkedDuplicates):
+
+    _parked: Dict[str, ORMParkedDuplicate]
+
+    def __init__(self, db: MemoryDB, latency: float = 0):
+        self._parked = dict()
+        super().__init__(db, latency)
+
+    async def save_many(self, parked: List[ORMParkedDuplicate]) -> None:
+
+        await self._round_trip()
+
+        for item in parked:
+            stored = self._parked.get(item.crash_id)
+            if stored is None:
+                self._parked[item.crash_id] = item.copy()
+            else:
+                stored.duplicate_count = max(stored.duplicate_count, item.duplicate_count)
+
+    async def pop(self, crash_id: str) -> Optional[ORMParkedDuplicate]:
+        await self._round_trip()
+        return self._parked.pop(crash_id, None)
+
+    async def pop_expired(self, parked_before: str, limit: int = 100) -> List[ORMParkedDuplicate]:
+
+        await self._round_trip()
+        expired = sorted(
+            (item for item in self._parked.values() if item.parked_at < parked_before),
+            key=lambda item: item.parked_at,
+        )[:limit]
+
+        for item in expired:
+            del self._parked[item.crash_id]
+
+        return expired
+
+    async def list_crash_ids(self) -> AsyncIterator[str]:
+        await self._round_trip()
+        for crash_id in list(self._parked):
+            yield crash_id
+
+    def clear(self):
+        self._parked.clear()
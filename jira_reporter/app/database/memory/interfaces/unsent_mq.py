@@ -0,0 +1,41 @@
+from __future__ import annotations
+from typing import TYPE_CHECKING, AsyncIterator, Dict
+
+from jira_reporter.app.database.memory.interfaces.base import DBBase
+from jira_reporter.app.database.abstract import IUnsentMessages
+
+if TYPE_CHECKING:
+    from jira_reporter.app.database.memory.database import MemoryDB
+
+
+class DBUnsentMessages(DBBase, IUnsentMessages):
+
+    """Messages of each replica are kept separately"""
+
+    _messages: Dict[str, Dict[str, list]]
+    _instance_id: str
+    _batch_size: int
+
+    def __init__(self, db: MemoryDB, instance_id: str, latency: float = 0, batch_size: int = 500):
+        self._messages = dict()
+        self._instance_id = instance_id
+        self._batch_size = batch_size
+        super().__init__(db, latency)
+
+    async def save_unsent_messages(self, unsent_messages: Dict[str, list]):
+        await self._round_trip()
+        self._messages[self._instance_id] = {
+            queue_name: list(messages)
+            for queue_name, messages in unsent_messages.items()
+        }
+
+    async def load_unsent_messages(self) -> AsyncIterator[Dict[str, list]]:
+
+        saved = self._messages.get(self._instance_id, {})
+        for queue_name, messages in list(saved.items()):
+            for i in range(0, len(messages), self._batch_size):
+                await self._round_trip()
+                yield {queue_name: messages[i : i + self._batch_size]}
+
+    def clear(self):
+        self._messages.clear()
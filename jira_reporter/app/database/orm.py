@@ -18,4 +18,57 @@ class ORMJiraConfig(BaseModel):
     priority: Optional[str]
     #assignee_id: Optional[int]
 
+
+class ORMIssue(BaseModel):
+    crash_id: str
+    issue_id: int
+
+    config_id: Optional[str]
+    """ Integration issue was created with """
+
+    created_at: Optional[str]
+    """ Issue creation time (RFC 3339) """
+
+    duplicate_count: int = 0
+    """ Duplicate count written to issue description """
+
+    synced_count: Optional[int]
+    """ Duplicate count confirmed to be written to Jira. Unknown for old issues """
+
+    description_head: Optional[str]
+    """ Issue description before duplicate count """
+
+    description_tail: Optional[str]
+    """ Issue description after duplicate count """
+
+    rev: Optional[str]
+    """ Revision used to update issue without conflicts """
+
+    pending: bool = False
+    """ Issue is being created. Mapping is a claim, issue id is not known yet """
+
+    claimed_at: Optional[str]
+    """ Time issue creation was claimed (RFC 3339) """
+
+    @property
+    def is_synced(self) -> bool:
+        return self.synced_count is None or self.synced_count >= self.duplicate_count
+
+    def render_description(self) -> Optional[str]:
+        if self.description_head is None or self.description_tail is None:
+            return None
+
+        return f"{self.description_head}{self.duplicate_count}{self.description_tail}"
+
+
+class ORMParkedDuplicate(BaseModel):
+    crash_id: str
+    config_id: str
+
+    duplicate_count: int
+    """ The highest duplicate count received before issue was created """
+
+    parked_at: str
+    """ Time the first duplicate was parked (RFC 3339) """
+
     
@@ -0,0 +1,127 @@
+from __future__ import annotations
+from typing import TYPE_CHECKING, Optional
+import logging
+
+from jira_reporter.app.util import testing_only
+
+from .worker import SQLiteWorker
+from .interfaces.configs import DBConfigs
+from .interfaces.issues import DBIssues
+from .interfaces.unsent_mq import DBUnsentMessages
+from .interfaces.parked_duplicates import DBParkedDuplicates
+from ..abstract import IDatabase
+from ..cache import CachedConfigs, CachedIssues
+from ..write_behind import WriteBehindIssues
+
+if TYPE_CHECKING:
+    from sqlite3 import Connection
+    from jira_reporter.app.settings import AppSettings
+    from ..abstract import IConfigs, IIssues, IParkedDuplicates, IUnsentMessages
+
+
+class SQLiteDB(IDatabase):
+
+    """
+    Embedded database stored in a single file.
+    Suitable only for single replica deployments.
+    """
+
+    _db_configs: IConfigs
+    _db_issues: IIssues
+    _db_unsent_mq: IUnsentMessages
+    _db_parked_duplicates: IParkedDuplicates
+    _write_behind: Optional[WriteBehindIssues]
+
+    _logger: logging.Logger
+    _worker: SQLiteWorker
+    _is_closed: bool
+
+    @property
+    def unsent_mq(self):
+        return self._db_unsent_mq
+
+    @property
+    def configs(self):
+        return self._db_configs
+
+    @property
+    def issues(self) -> IIssues:
+        return self._db_issues
+
+    @property
+    def parked_duplicates(self) -> IParkedDuplicates:
+        return self._db_parked_duplicates
+
+    @staticmethod
+    def _create_schema(conn: Connection):
+        DBConfigs.create_schema(conn)
+        DBIssues.create_schema(conn)
+        DBUnsentMessages.create_schema(conn)
+        DBParkedDuplicates.create_schema(conn)
+
+    async def _init(self, settings: AppSettings):
+
+        self._is_closed = True
+        self._logger = logging.getLogger("db")
+        self._worker = SQLiteWorker(
+            settings.database.sqlite_path,
+            settings.database.sqlite_batch_size,
+        )
+
+        self._worker.start()
+        self._is_closed = False
+
+        await self._worker.execute(self._create_schema)
+        self._logger.info("Opened database '%s'", settings.database.sqlite_path)
+
+        self._db_configs = CachedConfigs(
+            DBConfigs(self, self._worker), settings.cache
+        )
+        db_issues: IIssues = DBIssues(self, self._worker)
+        self._write_behind = None
+
+        if settings.database.write_behind:
+            db_issues = WriteBehindIssues(db_issues, settings.database)
+            self._write_behind = db_issues
+
+        self._db_issues = CachedIssues(db_issues, settings.cache)
+        self._db_unsent_mq = DBUnsentMessages(
+            self,
+            self._worker,
+            settings.message_queue.instance_id,
+            settings.database.unsent_messages_batch_size,
+        )
+        self._db_parked_duplicates = DBParkedDuplicates(self, self._worker)
+
+        await self._db_configs.warm_up()
+        await self._db_issues.warm_up()
+
+    @staticmethod
+    async def create(settings):
+        _self = SQLiteDB()
+        await _self._init(settings)
+        return _self
+
+    @testing_only
+    async def truncate_all_collections(self):
+
+        def truncate(conn: Connection):
+            for table in ("configs", "issues", "unsent_messages", "parked_duplicates"):
+                conn.execute(f"DELETE FROM {table}")
+
+        self._logger.warning("Clearing all collections...")
+        await self._worker.execute(truncate)
+
+    async def close(self):
+
+        assert not self._is_closed, "Database connection has been already closed"
+
+        if self._write_behind:
+            await self._write_behind.close()
+
+        await self._worker.stop()
+        self._is_closed = True
+
+    def __del__(self):
+        if not self._is_closed:
+            self._logger.error("Database connection has not been closed")
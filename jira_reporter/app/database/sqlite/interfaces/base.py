@@ -0,0 +1,16 @@
+from __future__ import annotations
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from jira_reporter.app.database.sqlite.database import SQLiteDB
+    from jira_reporter.app.database.sqlite.worker import SQLiteWorker
+
+
+class DBBase:
+
+    _db: SQLiteDB
+    _worker: SQLiteWorker
+
+    def __init__(self, db: SQLiteDB, worker: SQLiteWorker):
+        self._worker = worker
+        self._db = db
@@ -0,0 +1,111 @@
+from __future__ import annotations
+from typing import TYPE_CHECKING, Dict, List, Optional, Tuple
+
+from uuid import uuid4
+
+from jira_reporter.app.database.sqlite.interfaces.base import DBBase
+from jira_reporter.app.database.errors import DBAlreadyExistsError, DBRecordNotFoundError
+from jira_reporter.app.database.orm import ORMJiraConfig
+from jira_reporter.app.database.abstract import IConfigs
+from .util import maybe_already_exists, maybe_unknown_error
+
+if TYPE_CHECKING:
+    from sqlite3 import Connection
+
+
+FIELDS = ("id", "update_rev", "url", "username", "password", "project", "issue_type", "priority")
+
+SELECT = f"SELECT {', '.join(FIELDS)} FROM configs"
+SELECT_ONE = f"{SELECT} WHERE id = ?"
+INSERT = f"INSERT INTO configs ({', '.join(FIELDS)}) VALUES ({', '.join('?' * len(FIELDS))})"
+UPDATE = f"UPDATE configs SET {', '.join(f'{f} = ?' for f in FIELDS[1:])} WHERE id = ?"
+DELETE = "DELETE FROM configs WHERE id = ?"
+
+
+class DBConfigs(DBBase, IConfigs):
+
+    @staticmethod
+    def create_schema(conn: Connection):
+        conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS configs (
+                id TEXT PRIMARY KEY,
+                update_rev TEXT NOT NULL,
+                url TEXT NOT NULL,
+                username TEXT NOT NULL,
+                password TEXT NOT NULL,
+                project TEXT NOT NULL,
+                issue_type TEXT NOT NULL,
+                priority TEXT
+            )
+            """
+        )
+
+    @staticmethod
+    def _to_orm(row: tuple) -> ORMJiraConfig:
+        return ORMJiraConfig(**dict(zip(FIELDS, row)))
+
+    @staticmethod
+    def _to_row(config: ORMJiraConfig) -> tuple:
+        return tuple(getattr(config, f) for f in FIELDS)
+
+    @maybe_unknown_error
+    async def get(self, config_id: str) -> Optional[ORMJiraConfig]:
+        row = await self._worker.execute(
+            lambda conn: conn.execute(SELECT_ONE, (config_id,)).fetchone()
+        )
+        if row is None:
+            return None
+        return self._to_orm(row)
+
+    @maybe_unknown_error
+    async def get_many(self, config_ids: List[str]) -> Dict[str, ORMJiraConfig]:
+
+        def get_many(conn: Connection):
+            rows = []
+            for config_id in config_ids:
+                row = conn.execute(SELECT_ONE, (config_id,)).fetchone()
+                if row is not None:
+                    rows.append(row)
+            return rows
+
+        configs = map(self._to_orm, await self._worker.execute(get_many))
+        return {config.id: config for config in configs}
+
+    @maybe_unknown_error
+    async def list_all(self) -> List[ORMJiraConfig]:
+        rows = await self._worker.execute(lambda conn: conn.execute(SELECT).fetchall())
+        return [self._to_orm(row) for row in rows]
+
+    @maybe_unknown_error
+    @maybe_already_exists(DBAlreadyExistsError)
+    async def insert(self, config: ORMJiraConfig) -> None:
+        config_id = config.id or uuid4().hex
+        row = self._to_row(config.copy(update={"id": config_id}))
+        await self._worker.execute(lambda conn: conn.execute(INSERT, row))
+        config.id = config_id
+
+    @maybe_unknown_error
+    async def update(self, config: ORMJiraConfig) -> Tuple[ORMJiraConfig, ORMJiraConfig]:
+
+        row = self._to_row(config)
+
+        def update(conn: Connection):
+            old = conn.execute(SELECT_ONE, (config.id,)).fetchone()
+            if old is not None:
+                conn.execute(UPDATE, row[1:] + (config.id,))
+            return old
+
+        old = await self._worker.execute(update)
+        if old is None:
+            raise DBRecordNotFoundError()
+
+        return self._to_orm(old), self._to_orm(row)
+
+    @maybe_unknown_error
+    async def delete(self, config_id: str) -> None:
+        cursor = await self._worker.execute(
+            lambda conn: conn.execute(DELETE, (config_id,))
+        )
+        if cursor.rowcount == 0:
+            raise DBRecordNotFoundError()
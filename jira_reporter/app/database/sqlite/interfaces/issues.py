@@ -0,0 +1,263 @@
+from __future__ import annotations
+from typing import TYPE_CHECKING, AsyncIterator, Dict, List, Optional
+
+import sqlite3
+
+from jira_reporter.app.database.sqlite.interfaces.base import DBBase
+from jira_reporter.app.database.errors import DatabaseError, DBAlreadyExistsError, DBRecordNotFoundError
+from jira_reporter.app.database.orm import ORMIssue
+from jira_reporter.app.database.abstract import IIssues
+from .util import maybe_already_exists, maybe_unknown_error, maybe_unknown_error_gen
+
+if TYPE_CHECKING:
+    from sqlite3 import Connection
+
+
+FIELDS = (
+    "crash_id",
+    "issue_id",
+    "config_id",
+    "created_at",
+    "duplicate_count",
+    "synced_count",
+    "description_head",
+    "description_tail",
+    "pending",
+    "claimed_at",
+    "rev",
+)
+
+# Secondary queries do not load descriptions
+SHORT_FIELDS = (
+    "crash_id, issue_id, config_id, created_at, duplicate_count, synced_count, NULL, NULL, pending, claimed_at, rev"
+)
+
+SELECT_ONE = f"SELECT {', '.join(FIELDS)} FROM issues WHERE crash_id = ?"
+SELECT_ISSUE_ID = "SELECT issue_id FROM issues WHERE crash_id = ? AND NOT pending"
+SELECT_EXISTS = "SELECT 1 FROM issues WHERE crash_id = ?"
+SELECT_CRASH_IDS = "SELECT crash_id FROM issues WHERE crash_id > ? ORDER BY crash_id LIMIT ?"
+INSERT = f"INSERT INTO issues ({', '.join(FIELDS)}) VALUES ({', '.join('?' * len(FIELDS))})"
+
+FIND_BY_ISSUE_ID = f"""
+    SELECT {SHORT_FIELDS} FROM issues
+    WHERE issue_id = ?1 AND (?2 IS NULL OR config_id = ?2) AND NOT pending
+"""
+
+LIST_BY_CONFIG = f"""
+    SELECT {SHORT_FIELDS} FROM issues
+    WHERE config_id = ? AND created_at IS NOT NULL AND NOT pending
+    ORDER BY created_at LIMIT ? OFFSET ?
+"""
+
+COUNT_BY_CONFIG = """
+    SELECT COUNT(*) FROM issues
+    WHERE config_id = ? AND created_at IS NOT NULL AND NOT pending
+"""
+
+LIST_CREATED_BEFORE = f"""
+    SELECT {SHORT_FIELDS} FROM issues
+    WHERE created_at < ? AND NOT pending ORDER BY created_at LIMIT ?
+"""
+
+UPDATE_DUPLICATE_COUNT = """
+    UPDATE issues
+    SET duplicate_count = ?, synced_count = ?, description_head = ?, description_tail = ?, rev = rev + 1
+    WHERE crash_id = ? AND rev = ?
+"""
+
+UPDATE = f"""
+    UPDATE issues
+    SET {', '.join(f'{f} = ?' for f in FIELDS[1:-1])}, rev = rev + 1
+    WHERE crash_id = ? AND rev = ?
+"""
+
+DELETE = "DELETE FROM issues WHERE crash_id = ? AND rev = ?"
+
+
+class DBIssues(DBBase, IIssues):
+
+    @staticmethod
+    def create_schema(conn: Connection):
+
+        conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS issues (
+                crash_id TEXT PRIMARY KEY,
+                issue_id INTEGER NOT NULL,
+                config_id TEXT,
+                created_at TEXT,
+                duplicate_count INTEGER NOT NULL DEFAULT 0,
+                synced_count INTEGER,
+                description_head TEXT,
+                description_tail TEXT,
+                pending INTEGER NOT NULL DEFAULT 0,
+                claimed_at TEXT,
+                rev INTEGER NOT NULL DEFAULT 1
+            ) WITHOUT ROWID
+            """
+        )
+
+        conn.execute("CREATE INDEX IF NOT EXISTS issues_issue_id ON issues (issue_id)")
+        conn.execute("CREATE INDEX IF NOT EXISTS issues_config ON issues (config_id, created_at)")
+        conn.execute("CREATE INDEX IF NOT EXISTS issues_created_at ON issues (created_at)")
+
+    @staticmethod
+    def _to_orm(row: tuple) -> ORMIssue:
+        issue = dict(zip(FIELDS, row))
+        issue["rev"] = str(issue["rev"])
+        return ORMIssue(**issue)
+
+    @staticmethod
+    def _to_row(issue: ORMIssue) -> tuple:
+        row = issue.dict(include=set(FIELDS[:-1]))
+        return tuple(row[f] for f in FIELDS[:-1]) + (1,)
+
+    async def _find(self, query: str, params: tuple) -> List[ORMIssue]:
+        rows = await self._worker.execute(lambda conn: conn.execute(query, params).fetchall())
+        return [self._to_orm(row) for row in rows]
+
+    @maybe_unknown_error
+    async def get_issue(self, crash_id: str) -> Optional[int]:
+        row = await self._worker.execute(
+            lambda conn: conn.execute(SELECT_ISSUE_ID, (crash_id,)).fetchone()
+        )
+        if row is None:
+            return None
+        return row[0]
+
+    @maybe_unknown_error
+    async def get_issues(self, crash_ids: List[str]) -> Dict[str, int]:
+
+        def get_issues(conn: Connection):
+            issues = {}
+            for crash_id in crash_ids:
+                row = conn.execute(SELECT_ISSUE_ID, (crash_id,)).fetchone()
+                if row is not None:
+                    issues[crash_id] = row[0]
+            return issues
+
+        return await self._worker.execute(get_issues)
+
+    @maybe_unknown_error
+    async def get(self, crash_id: str) -> Optional[ORMIssue]:
+        row = await self._worker.execute(
+            lambda conn: conn.execute(SELECT_ONE, (crash_id,)).fetchone()
+        )
+        if row is None:
+            return None
+        return self._to_orm(row)
+
+    @maybe_unknown_error_gen
+    async def list_crash_ids(self) -> AsyncIterator[str]:
+
+        # Read by pages, so worker is not held by a single long query
+        last_crash_id = ""
+        while True:
+            rows = await self._worker.execute(
+                lambda conn: conn.execute(SELECT_CRASH_IDS, (last_crash_id, 10000)).fetchall()
+            )
+            if not rows:
+                break
+
+            for (crash_id,) in rows:
+                yield crash_id
+
+            last_crash_id = rows[-1][0]
+
+    @maybe_unknown_error
+    async def find_by_issue_id(self, issue_id: int, config_id: Optional[str] = None) -> List[ORMIssue]:
+        return await self._find(FIND_BY_ISSUE_ID, (issue_id, config_id))
+
+    @maybe_unknown_error
+    async def list_by_config(self, config_id: str, offset: int = 0, limit: int = 100) -> List[ORMIssue]:
+        return await self._find(LIST_BY_CONFIG, (config_id, limit, offset))
+
+    @maybe_unknown_error
+    async def count_by_config(self, config_id: str) -> int:
+        row = await self._worker.execute(
+            lambda conn: conn.execute(COUNT_BY_CONFIG, (config_id,)).fetchone()
+        )
+        return row[0]
+
+    @maybe_unknown_error
+    async def list_created_before(self, created_before: str, limit: int = 100) -> List[ORMIssue]:
+        return await self._find(LIST_CREATED_BEFORE, (created_before, limit))
+
+    @maybe_unknown_error
+    @maybe_already_exists(DBAlreadyExistsError)
+    async def insert(self, issue: ORMIssue) -> None:
+        row = self._to_row(issue)
+        await self._worker.execute(lambda conn: conn.execute(INSERT, row))
+        issue.rev = "1"
+
+    @maybe_unknown_error
+    async def insert_many(self, issues: List[ORMIssue]) -> List[Optional[DatabaseError]]:
+
+        rows = [self._to_row(issue) for issue in issues]
+
+        def insert_many(conn: Connection):
+            errors: List[Optional[DatabaseError]] = []
+            for row in rows:
+                try:
+                    conn.execute(INSERT, row)
+                    errors.append(None)
+                except sqlite3.IntegrityError:
+                    errors.append(DBAlreadyExistsError())
+            return errors
+
+        errors = await self._worker.execute(insert_many)
+        for issue, error in zip(issues, errors):
+            if error is None:
+                issue.rev = "1"
+
+        return errors
+
+    @maybe_unknown_error
+    async def update(self, issue: ORMIssue) -> bool:
+
+        row = self._to_row(issue)
+        params = row[1:-1] + (issue.crash_id, int(issue.rev or 0))
+
+        def update(conn: Connection):
+            if conn.execute(UPDATE, params).rowcount > 0:
+                return True
+            if conn.execute(SELECT_EXISTS, (issue.crash_id,)).fetchone() is None:
+                raise DBRecordNotFoundError()
+            return False
+
+        updated = await self._worker.execute(update)
+        if updated:
+            issue.rev = str(params[-1] + 1)
+
+        return updated
+
+    @maybe_unknown_error
+    async def delete(self, issue: ORMIssue) -> bool:
+        params = (issue.crash_id, int(issue.rev or 0))
+        deleted = await self._worker.execute(lambda conn: conn.execute(DELETE, params).rowcount)
+        return deleted > 0
+
+    @maybe_unknown_error
+    async def update_duplicate_count(self, issue: ORMIssue) -> bool:
+
+        params = (
+            issue.duplicate_count,
+            issue.synced_count,
+            issue.description_head,
+            issue.description_tail,
+            issue.crash_id,
+            int(issue.rev or 0),
+        )
+
+        def update(conn: Connection):
+            if conn.execute(UPDATE_DUPLICATE_COUNT, params).rowcount > 0:
+                return True
+            if conn.execute(SELECT_EXISTS, (issue.crash_id,)).fetchone() is None:
+                raise DBRecordNotFoundError()
+            return False
+
+        updated = await self._worker.execute(update)
+        if updated:
+            issue.rev = str(params[-1] + 1)
+
+        return updated
@@ -0,0 +1,97 @@
+from __future__ import annotations
+from typing import TYPE_CHECKING, AsyncIterator, List, Optional
+
+from jira_reporter.app.database.sqlite.interfaces.base import DBBase
+from jira_reporter.app.database.orm import ORMParkedDuplicate
+from jira_reporter.app.database.abstract import IParkedDuplicates
+from .util import maybe_unknown_error
+
+if TYPE_CHECKING:
+    from sqlite3 import Connection
+
+
+FIELDS = ("crash_id", "config_id", "duplicate_count", "parked_at")
+
+UPSERT = f"""
+    INSERT INTO parked_duplicates ({', '.join(FIELDS)}) VALUES (?, ?, ?, ?)
+    ON CONFLICT (crash_id) DO UPDATE
+    SET duplicate_count = MAX(duplicate_count, excluded.duplicate_count)
+"""
+
+SELECT_ONE = f"SELECT {', '.join(FIELDS)} FROM parked_duplicates WHERE crash_id = ?"
+SELECT_EXPIRED = f"""
+    SELECT {', '.join(FIELDS)} FROM parked_duplicates
+    WHERE parked_at < ? ORDER BY parked_at LIMIT ?
+"""
+SELECT_CRASH_IDS = "SELECT crash_id FROM parked_duplicates WHERE crash_id > ? ORDER BY crash_id LIMIT ?"
+DELETE = "DELETE FROM parked_duplicates WHERE crash_id = ?"
+
+
+class DBParkedDuplicates(DBBase, IParkedDuplicates):
+
+    @staticmethod
+    def create_schema(conn: Connection):
+
+        conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS parked_duplicates (
+                crash_id TEXT PRIMARY KEY,
+                config_id TEXT NOT NULL,
+                duplicate_count INTEGER NOT NULL,
+                parked_at TEXT NOT NULL
+            ) WITHOUT ROWID
+            """
+        )
+
+        conn.execute(
+            "CREATE INDEX IF NOT EXISTS parked_duplicates_parked_at ON parked_duplicates (parked_at)"
+        )
+
+    @staticmethod
+    def _to_orm(row: tuple) -> ORMParkedDuplicate:
+        return ORMParkedDuplicate(**dict(zip(FIELDS, row)))
+
+    @maybe_unknown_error
+    async def save_many(self, parked: List[ORMParkedDuplicate]) -> None:
+        rows = [tuple(getattr(item, f) for f in FIELDS) for item in parked]
+        await self._worker.execute(lambda conn: conn.executemany(UPSERT, rows))
+
+    @maybe_unknown_error
+    async def pop(self, crash_id: str) -> Optional[ORMParkedDuplicate]:
+
+        def pop(conn: Connection):
+            row = conn.execute(SELECT_ONE, (crash_id,)).fetchone()
+            if row is not None:
+                conn.execute(DELETE, (crash_id,))
+            return row
+
+        row = await self._worker.execute(pop)
+        if row is None:
+            return None
+        return self._to_orm(row)
+
+    @maybe_unknown_error
+    async def pop_expired(self, parked_before: str, limit: int = 100) -> List[ORMParkedDuplicate]:
+
+        def pop_expired(conn: Connection):
+            rows = conn.execute(SELECT_EXPIRED, (parked_before, limit)).fetchall()
+            conn.executemany(DELETE, [(row[0],) for row in rows])
+            return rows
+
+        rows = await self._worker.execute(pop_expired)
+        return [self._to_orm(row) for row in rows]
+
+    async def list_crash_ids(self) -> AsyncIterator[str]:
+
+        last_crash_id = ""
+        while True:
+            rows = await self._worker.execute(
+                lambda conn: conn.execute(SELECT_CRASH_IDS, (last_crash_id, 10000)).fetchall()
+            )
+            if not rows:
+                break
+
+            for (crash_id,) in rows:
+                yield crash_id
+
+            last_crash_id = rows[-1][0]
@@ -0,0 +1,139 @@
+from __future__ import annotations
+from typing import TYPE_CHECKING, AsyncIterator, Dict, Set
+
+import hashlib
+import json
+import time
+
+from jira_reporter.app.database.sqlite.interfaces.base import DBBase
+from jira_reporter.app.database.abstract import IUnsentMessages
+from .util import maybe_unknown_error, maybe_unknown_error_gen
+
+if TYPE_CHECKING:
+    from typing import Iterator, Tuple
+    from sqlite3 import Connection
+    from jira_reporter.app.database.sqlite.database import SQLiteDB
+    from jira_reporter.app.database.sqlite.worker import SQLiteWorker
+
+
+INSERT = """
+    INSERT OR REPLACE INTO unsent_messages (instance, key, queue, seq, name, body)
+    VALUES (?, ?, ?, ?, ?, ?)
+"""
+DELETE = "DELETE FROM unsent_messages WHERE instance = ? AND key = ?"
+SELECT_PAGE = """
+    SELECT key, queue, seq, name, body FROM unsent_messages
+    WHERE instance = ? AND (queue, seq) > (?, ?) ORDER BY queue, seq LIMIT ?
+"""
+
+
+class DBUnsentMessages(DBBase, IUnsentMessages):
+
+    """Saves only messages changed since the previous save, per replica"""
+
+    _instance_id: str
+    _batch_size: int
+    _saved: Set[str]
+
+    def __init__(self, db: SQLiteDB, worker: SQLiteWorker, instance_id: str, batch_size: int = 500):
+        self._instance_id = instance_id
+        self._batch_size = batch_size
+        self._saved = set()
+        super().__init__(db, worker)
+
+    @staticmethod
+    def create_schema(conn: Connection):
+
+        conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS unsent_messages (
+                instance TEXT NOT NULL,
+                key TEXT NOT NULL,
+                queue TEXT NOT NULL,
+                seq INTEGER NOT NULL,
+                name TEXT NOT NULL,
+                body TEXT NOT NULL,
+                PRIMARY KEY (instance, key)
+            ) WITHOUT ROWID
+            """
+        )
+
+        conn.execute(
+            "CREATE INDEX IF NOT EXISTS unsent_messages_order ON unsent_messages (instance, queue, seq)"
+        )
+
+    @staticmethod
+    def _keyed_messages(queue_name: str, messages: list) -> Iterator[Tuple[str, dict]]:
+
+        occurrences: Dict[str, int] = {}
+        for message in messages:
+            assert "name" in message
+            assert "body" in message
+
+            content = json.dumps(
+                [queue_name, message["name"], message["body"]],
+                sort_keys=True,
+            ).encode()
+
+            digest = hashlib.blake2b(content, digest_size=16).hexdigest()
+            occurrence = occurrences.get(digest, 0)
+            occurrences[digest] = occurrence + 1
+
+            yield f"{digest}-{occurrence}", message
+
+    @maybe_unknown_error
+    async def save_unsent_messages(self, unsent_messages: Dict[str, list]):
+
+        # New messages are placed after all saved ones
+        seq = time.time_ns()
+        present: Set[str] = set()
+        rows = []
+
+        for queue_name, messages in unsent_messages.items():
+            for key, message in self._keyed_messages(queue_name, messages):
+                present.add(key)
+                if key in self._saved:
+                    continue
+
+                seq += 1
+                rows.append(
+                    (
+                        self._instance_id,
+                        key,
+                        queue_name,
+                        seq,
+                        message["name"],
+                        json.dumps(message["body"]),
+                    )
+                )
+
+        removed = [(self._instance_id, key) for key in self._saved - present]
+
+        def save(conn: Connection):
+            conn.executemany(INSERT, rows)
+            conn.executemany(DELETE, removed)
+
+        await self._worker.execute(save)
+        self._saved.update(row[1] for row in rows)
+        self._saved.difference_update(key for _, key in removed)
+
+    @maybe_unknown_error_gen
+    async def load_unsent_messages(self) -> AsyncIterator[Dict[str, list]]:
+
+        last = ("", -1)
+        while True:
+            params = (self._instance_id,) + last + (self._batch_size,)
+            rows = await self._worker.execute(
+                lambda conn: conn.execute(SELECT_PAGE, params).fetchall()
+            )
+            if not rows:
+                break
+
+            unsent_messages: Dict[str, list] = {}
+            for key, queue_name, _, name, body in rows:
+                mq_message = {"name": name, "body": json.loads(body)}
+                unsent_messages.setdefault(queue_name, []).append(mq_message)
+                self._saved.add(key)
+
+            yield unsent_messages
+            last = rows[-1][1:3]
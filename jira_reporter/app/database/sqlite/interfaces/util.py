@@ -0,0 +1,45 @@
+from jira_reporter.app.database.errors import DatabaseError
+
+from typing import Type
+import functools
+import sqlite3
+
+
+def maybe_unknown_error(func):
+    @functools.wraps(func)
+    async def wrapper(*args, **kwargs):
+        try:
+            res = await func(*args, **kwargs)
+        except sqlite3.Error as e:
+            raise DatabaseError(e) from e
+
+        return res
+
+    return wrapper
+
+
+def maybe_unknown_error_gen(func):
+    @functools.wraps(func)
+    async def wrapper(*args, **kwargs):
+        try:
+            async for item in func(*args, **kwargs):
+                yield item
+        except sqlite3.Error as e:
+            raise DatabaseError(e) from e
+
+    return wrapper
+
+
+def maybe_already_exists(ExceptionRaised: Type[DatabaseError]):
+    def wrapper(func):
+        @functools.wraps(func)
+        async def wrapped(*args, **kwargs):
+            try:
+                res = await func(*args, **kwargs)
+            except sqlite3.IntegrityError as e:
+                raise ExceptionRaised() from e
+            return res
+
+        return wrapped
+
+    return wrapper
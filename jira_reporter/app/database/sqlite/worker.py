@@ -0,0 +1,160 @@
+from __future__ import annotations
+from typing import TYPE_CHECKING, Any, Callable, List, Optional, Tuple, TypeVar
+
+import asyncio
+import logging
+import queue
+import sqlite3
+import threading
+
+if TYPE_CHECKING:
+    Job = Tuple[Callable[[sqlite3.Connection], Any], asyncio.AbstractEventLoop, asyncio.Future]
+
+T = TypeVar("T")
+
+
+class SQLiteWorker:
+
+    """Runs all statements on the only connection in a dedicated thread"""
+
+    _path: str
+    _batch_size: int
+    _jobs: queue.SimpleQueue
+    _thread: threading.Thread
+
+    def __init__(self, path: str, batch_size: int = 500):
+        self._path = path
+        self._batch_size = batch_size
+        self._jobs = queue.SimpleQueue()
+        self._logger = logging.getLogger("db.sqlite")
+        self._thread = threading.Thread(target=self._run, name="sqlite", daemon=True)
+
+    def start(self):
+        self._thread.start()
+
+    async def execute(self, func: Callable[[sqlite3.Connection], T]) -> T:
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._jobs.put((func, loop, future))
+        return await future
+
+    async def stop(self):
+        self._jobs.put(None)
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(None, self._thread.join)
+
+    def _connect(self) -> sqlite3.Connection:
+
+        # Transactions are managed manually. Statement
+        # cache keeps compiled (prepared) statements
+        conn = sqlite3.connect(
+            self._path,
+            isolation_level=None,
+            cached_statements=256,
+        )
+
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        return conn
+
+    def _next_batch(self) -> Tuple[List[Job], bool]:
+
+        jobs = []
+        job: Optional[Job] = self._jobs.get()
+
+        while job is not None:
+            jobs.append(job)
+            if len(jobs) >= self._batch_size:
+                return jobs, False
+            try:
+                job = self._jobs.get_nowait()
+            except queue.Empty:
+                return jobs, False
+
+        return jobs, True
+
+    def _run(self):
+
+        conn = self._connect()
+        stopped = False
+
+        try:
+            while not stopped:
+                jobs, stopped = self._next_batch()
+                if not jobs:
+                    continue
+
+                try:
+                    self._run_batch(conn, jobs)
+                except Exception as e:
+                    self._logger.exception("Failed to run transaction")
+                    self._rollback(conn)
+                    self._resolve(jobs, [(None, e)] * len(jobs))
+        finally:
+            conn.close()
+
+    def _run_batch(self, conn: sqlite3.Connection, jobs: List[Job]):
+
+        results = []
+
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+        except sqlite3.Error as e:
+            self._logger.error("Failed to begin transaction: %s", e)
+            self._resolve(jobs, [(None, e)] * len(jobs))
+            return
+
+        for func, _, _ in jobs:
+            try:
+                conn.execute("SAVEPOINT job")
+                try:
+                    result = (func(conn), None)
+                except Exception as e:
+                    conn.execute("ROLLBACK TO job")
+                    result = (None, e)
+                conn.execute("RELEASE job")
+
+            except sqlite3.Error as e:
+                # Transaction may have been rolled back by SQLite itself
+                self._logger.error("Failed to run job in transaction: %s", e)
+                self._rollback(conn)
+                self._resolve(jobs, [(None, e)] * len(jobs))
+                return
+
+            results.append(result)
+
+        try:
+            conn.execute("COMMIT")
+        except sqlite3.Error as e:
+            self._logger.error("Failed to commit transaction: %s", e)
+            self._rollback(conn)
+            results = [(None, e)] * len(jobs)
+
+        self._resolve(jobs, results)
+
+    def _rollback(self, conn: sqlite3.Connection):
+
+        if not conn.in_transaction:
+            return
+
+        try:
+            conn.execute("ROLLBACK")
+        except sqlite3.Error as e:
+            # The next transaction fails to begin, so its jobs fail as well
+            self._logger.error("Failed to roll back transaction: %s", e)
+
+    @staticmethod
+    def _resolve(jobs: List[Job], results: list):
+        for (_, loop, future), (result, error) in zip(jobs, results):
+            loop.call_soon_threadsafe(_set_result, future, result, error)
+
+
+def _set_result(future: asyncio.Future, result: Any, error: Optional[Exception]):
+
+    if future.done():
+        return
+
+    if error is not None:
+        future.set_exception(error)
+    else:
+        future.set_result(result)
@@ -0,0 +1,269 @@
+from __future__ import annotations
+from typing import TYPE_CHECKING, Dict, List, Optional, Set
+
+from collections import OrderedDict
+import asyncio
+import logging
+
+from .abstract import IIssues
+from .errors import DatabaseError, DBAlreadyExistsError, DBRecordNotFoundError
+
+if TYPE_CHECKING:
+    from typing import AsyncIterator
+    from ..settings import DatabaseSettings
+    from .orm import ORMIssue
+
+
+class WriteBehindIssues(IIssues):
+
+    """Buffers issue mappings and writes them to database in batches"""
+
+    _issues: IIssues
+    _buffer: OrderedDict
+    _writing: Dict[str, ORMIssue]
+    _max_size: int
+    _interval: float
+    _flusher: Optional[asyncio.Task]
+    _tasks: Set[asyncio.Task]
+    _lock: Optional[asyncio.Lock]
+
+    def __init__(self, issues: IIssues, settings: DatabaseSettings):
+        self._issues = issues
+        self._buffer = OrderedDict()
+        self._writing = dict()
+        self._max_size = settings.write_behind_max_size
+        self._interval = settings.write_behind_interval
+        self._logger = logging.getLogger("db.buffer")
+        self._flusher = None
+        self._tasks = set()
+        self._lock = None
+
+    def _start_flusher(self):
+        if self._flusher is None:
+            self._lock = asyncio.Lock()
+            self._flusher = asyncio.create_task(self._flush_periodically())
+
+    async def _flush_periodically(self):
+        while True:
+            await asyncio.sleep(self._interval)
+            await self._try_flush()
+
+    async def _try_flush(self):
+        try:
+            await self.flush()
+        except Exception:
+            self._logger.exception("Failed to flush issues")
+
+    def _flush_soon(self):
+
+        if len(self._buffer) < self._max_size or self._lock.locked():
+            return
+
+        task = asyncio.create_task(self._try_flush())
+        task.add_done_callback(self._tasks.discard)
+        self._tasks.add(task)
+
+    async def flush(self):
+
+        if self._lock is None:
+            return
+
+        # Batches are written one by one, so writes of a crash keep their order
+        async with self._lock:
+            while self._buffer:
+                await self._flush_batch()
+
+    async def _flush_batch(self):
+
+        while self._buffer and len(self._writing) < self._max_size:
+            crash_id, issue = self._buffer.popitem(last=False)
+            self._writing[crash_id] = issue
+
+        batch = list(self._writing.values())
+        inserted = [issue for issue in batch if issue.rev is None]
+        completed = [issue for issue in batch if issue.rev is not None]
+        failed = batch
+
+        try:
+            errors = []
+            if inserted:
+                errors.extend(await self._issues.insert_many(inserted))
+            if completed:
+                errors.extend(await asyncio.gather(*map(self._write_completed, completed)))
+
+            failed = []
+            failure = None
+
+            for issue, error in zip(inserted + completed, errors):
+                if isinstance(error, DBAlreadyExistsError):
+                    self._logger.error("Issue of crash '%s' already exists", issue.crash_id)
+                elif error is not None:
+                    failed.append(issue)
+                    failure = error
+
+            if failure is not None:
+                raise failure
+
+        finally:
+            # Keep failed ones for the next flush, unless changed meanwhile
+            for issue in reversed(failed):
+                if issue.crash_id not in self._buffer:
+                    self._buffer[issue.crash_id] = issue
+                    self._buffer.move_to_end(issue.crash_id, last=False)
+
+            self._writing = dict()
+
+        self._logger.debug("Flushed %d issues", len(batch))
+
+    async def _write_completed(self, issue: ORMIssue) -> Optional[DatabaseError]:
+
+        try:
+            if await self._issues.update(issue):
+                return None
+        except DBRecordNotFoundError:
+            pass
+        except DatabaseError as e:
+            return e
+
+        # New owner of the claim finds the issue by label
+        self._logger.warning("Claim of crash '%s' was taken over before completion", issue.crash_id)
+        return None
+
+    async def close(self):
+
+        if self._flusher is not None:
+            self._flusher.cancel()
+            await asyncio.gather(self._flusher, return_exceptions=True)
+
+        if self._tasks:
+            await asyncio.gather(*self._tasks)
+
+        await self.flush()
+
+    def _buffered(self, crash_id: str) -> Optional[ORMIssue]:
+        issue = self._buffer.get(crash_id)
+        if issue is None:
+            issue = self._writing.get(crash_id)
+        return issue
+
+    # Queries by secondary fields see only written mappings
+
+    async def find_by_issue_id(self, issue_id: int, config_id: Optional[str] = None) -> List[ORMIssue]:
+        await self.flush()
+        return await self._issues.find_by_issue_id(issue_id, config_id)
+
+    async def list_by_config(self, config_id: str, offset: int = 0, limit: int = 100) -> List[ORMIssue]:
+        await self.flush()
+        return await self._issues.list_by_config(config_id, offset, limit)
+
+    async def count_by_config(self, config_id: str) -> int:
+        await self.flush()
+        return await self._issues.count_by_config(config_id)
+
+    async def list_created_before(self, created_before: str, limit: int = 100) -> List[ORMIssue]:
+        await self.flush()
+        return await self._issues.list_created_before(created_before, limit)
+
+    async def insert(self, issue: ORMIssue) -> None:
+
+        if issue.pending:
+            if self._buffered(issue.crash_id) is not None:
+                raise DBAlreadyExistsError()
+            return await self._issues.insert(issue)
+
+        self._start_flusher()
+
+        if self._buffered(issue.crash_id) is not None:
+            raise DBAlreadyExistsError()
+
+        self._buffer[issue.crash_id] = issue
+        self._flush_soon()
+
+    async def insert_many(self, issues: List[ORMIssue]) -> List[Optional[DatabaseError]]:
+        errors = []
+        for issue in issues:
+            try:
+                await self.insert(issue)
+                errors.append(None)
+            except DBAlreadyExistsError as e:
+                errors.append(e)
+
+        return errors
+
+    async def update(self, issue: ORMIssue) -> bool:
+
+        # Changes of pending claims are never buffered
+        if issue.pending or issue.rev is None:
+            return await self._issues.update(issue)
+
+        self._start_flusher()
+
+        # Takeover of the claim is detected on flush
+        self._buffer[issue.crash_id] = issue
+        self._flush_soon()
+
+        return True
+
+    async def delete(self, issue: ORMIssue) -> bool:
+        return await self._issues.delete(issue)
+
+    async def get_issue(self, crash_id: str) -> Optional[int]:
+        issue = self._buffered(crash_id)
+        if issue is not None:
+            return issue.issue_id
+
+        return await self._issues.get_issue(crash_id)
+
+    async def get_issues(self, crash_ids: List[str]) -> Dict[str, int]:
+
+        issues = {}
+        missing = []
+
+        for crash_id in crash_ids:
+            issue = self._buffered(crash_id)
+            if issue is not None:
+                issues[crash_id] = issue.issue_id
+            else:
+                missing.append(crash_id)
+
+        if missing:
+            issues.update(await self._issues.get_issues(missing))
+
+        return issues
+
+    async def get(self, crash_id: str) -> Optional[ORMIssue]:
+        issue = self._buffered(crash_id)
+        if issue is not None:
+            return issue.copy()
+
+        return await self._issues.get(crash_id)
+
+    async def list_crash_ids(self) -> AsyncIterator[str]:
+        buffered = list(self._buffer) + list(self._writing)
+        for crash_id in buffered:
+            yield crash_id
+
+        async for crash_id in self._issues.list_crash_ids():
+            if crash_id not in buffered:
+                yield crash_id
+
+    async def update_duplicate_count(self, issue: ORMIssue) -> bool:
+
+        buffered = self._buffer.get(issue.crash_id)
+        if buffered is not None:
+            buffered.duplicate_count = issue.duplicate_count
+            buffered.synced_count = issue.synced_count
+            buffered.description_head = issue.description_head
+            buffered.description_tail = issue.description_tail
+            return True
+
+        # Issue being written must not be changed, so its write is waited for
+        if issue.crash_id in self._writing:
+            async with self._lock:
+                pass
+
+        # Issue was read from buffer, but has been written since then
+        if issue.rev is None:
+            return False
+
+        return await self._issues.update_duplicate_count(issue)
@@ -0,0 +1,121 @@
+from __future__ import annotations
+from typing import TYPE_CHECKING, Awaitable, Callable, Dict, List, Set
+
+import asyncio
+import time
+
+if TYPE_CHECKING:
+    from .settings import JiraSettings
+
+    WriteFunc = Callable[[int], Awaitable[None]]
+
+
+class _PendingUpdate:
+
+    count: int
+    write: WriteFunc
+    futures: List[asyncio.Future]
+    started: float
+    timer: asyncio.TimerHandle
+
+    def __init__(self, count: int, write: WriteFunc):
+        self.count = count
+        self.write = write
+        self.futures = []
+        self.started = time.monotonic()
+
+
+class DuplicateCoalescer:
+
+    """Debounces duplicate count updates of the same crash"""
+
+    _window: float
+    _max_delay: float
+    _pending: Dict[str, _PendingUpdate]
+    _writing: Dict[str, asyncio.Task]
+    _tasks: Set[asyncio.Task]
+
+    def __init__(self, settings: JiraSettings):
+        self._window = settings.duplicate_update_window
+        self._max_delay = settings.duplicate_update_max_delay
+        self._pending = dict()
+        self._writing = dict()
+        self._tasks = set()
+
+    async def update(self, crash_id: str, count: int, write: WriteFunc):
+        await self.schedule(crash_id, count, write)
+
+    def schedule(self, crash_id: str, count: int, write: WriteFunc) -> Awaitable[None]:
+
+        """
+        Registers update without waiting for it. Returns
+        future, which is resolved once the update is written
+        """
+
+        if self._window <= 0:
+            task = asyncio.create_task(write(count))
+            task.add_done_callback(self._tasks.discard)
+            self._tasks.add(task)
+            return task
+
+        loop = asyncio.get_running_loop()
+        update = self._pending.get(crash_id)
+
+        if update is None:
+            update = _PendingUpdate(count, write)
+            self._pending[crash_id] = update
+        else:
+            update.timer.cancel()
+            if count >= update.count:
+                update.count = count
+                update.write = write
+
+        # Window is restarted on each update, but not beyond max delay
+        deadline = update.started + self._max_delay
+        delay = min(self._window, deadline - time.monotonic())
+        update.timer = loop.call_later(max(delay, 0), self._flush, crash_id)
+
+        future = loop.create_future()
+        update.futures.append(future)
+        return future
+
+    def _flush(self, crash_id: str):
+
+        update = self._pending.pop(crash_id, None)
+        if update is None:
+            return
+
+        update.timer.cancel()
+        previous = self._writing.get(crash_id)
+        task = asyncio.create_task(self._write(crash_id, update, previous))
+        task.add_done_callback(self._tasks.discard)
+        self._writing[crash_id] = task
+        self._tasks.add(task)
+
+    async def _write(self, crash_id: str, update: _PendingUpdate, previous: asyncio.Task):
+
+        # Writes of the same crash must not overtake each other
+        if previous is not None:
+            await asyncio.gather(previous, return_exceptions=True)
+
+        try:
+            await update.write(update.count)
+        except Exception as e:
+            for future in update.futures:
+                if not future.done():
+                    future.set_exception(e)
+        else:
+            for future in update.futures:
+                if not future.done():
+                    future.set_result(None)
+        finally:
+            if self._writing.get(crash_id) is asyncio.current_task():
+                del self._writing[crash_id]
+
+    async def close(self):
+
+        for crash_id in list(self._pending):
+            self._flush(crash_id)
+
+        if self._tasks:
+            await asyncio.gather(*self._tasks, return_exceptions=True)
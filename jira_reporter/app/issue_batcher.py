@@ -0,0 +1,122 @@
+from __future__ import annotations
+from typing import TYPE_CHECKING, Dict, List, Set, Tuple
+
+import asyncio
+import logging
+
+from .jira_api import JiraError, NewIssue
+
+if TYPE_CHECKING:
+    from .database.orm import ORMJiraConfig
+    from .jira_api import JiraApi
+    from .settings import JiraSettings
+
+    BatchKey = Tuple[str, str]
+
+
+class _PendingBatch:
+
+    config: ORMJiraConfig
+    issues: List[NewIssue]
+    futures: List[asyncio.Future]
+    timer: asyncio.TimerHandle
+
+    def __init__(self, config: ORMJiraConfig):
+        self.config = config
+        self.issues = []
+        self.futures = []
+
+
+class IssueBatcher:
+
+    """Creates issues of an integration with bulk requests"""
+
+    _jira_api: JiraApi
+    _window: float
+    _max_size: int
+    _batches: Dict[BatchKey, _PendingBatch]
+    _tasks: Set[asyncio.Task]
+
+    def __init__(self, jira_api: JiraApi, settings: JiraSettings):
+        self._jira_api = jira_api
+        self._window = settings.bulk_create_window
+        self._max_size = min(settings.bulk_create_max_size, 50)
+        self._logger = logging.getLogger("batcher")
+        self._batches = dict()
+        self._tasks = set()
+
+    async def create_issue(self, config: ORMJiraConfig, summary: str, description: str, labels: List[str]) -> int:
+
+        if self._max_size <= 1:
+            return await self._jira_api.create_issue(config, summary, description, labels)
+
+        loop = asyncio.get_running_loop()
+        key = (config.id, config.update_rev)
+
+        batch = self._batches.get(key)
+        if batch is None:
+            batch = _PendingBatch(config)
+            batch.timer = loop.call_later(self._window, self._flush, key)
+            self._batches[key] = batch
+
+        future = loop.create_future()
+        batch.issues.append(NewIssue(summary, description, labels))
+        batch.futures.append(future)
+
+        if len(batch.issues) >= self._max_size:
+            self._flush(key)
+
+        return await future
+
+    def _flush(self, key: BatchKey):
+
+        batch = self._batches.pop(key, None)
+        if batch is None:
+            return
+
+        batch.timer.cancel()
+        task = asyncio.create_task(self._send(batch))
+        task.add_done_callback(self._tasks.discard)
+        self._tasks.add(task)
+
+    async def _send(self, batch: _PendingBatch):
+
+        self._logger.debug(
+            "Creating %d issues for integration '%s'",
+            len(batch.issues), batch.config.id,
+        )
+
+        try:
+            if len(batch.issues) == 1:
+                issue = batch.issues[0]
+                results = [
+                    await self._jira_api.create_issue(
+                        batch.config, issue.summary, issue.description, issue.labels
+                    )
+                ]
+            else:
+                results = await self._jira_api.create_issues(batch.config, batch.issues)
+
+        except JiraError as e:
+            results = [e] * len(batch.futures)
+
+        except Exception as e:
+            self._logger.exception("Failed to create issues")
+            results = [e] * len(batch.futures)
+
+        for future, result in zip(batch.futures, results):
+            if future.done():
+                continue
+
+            if isinstance(result, Exception):
+                future.set_exception(result)
+            else:
+                future.set_result(result)
+
+    async def close(self):
+
+        for key in list(self._batches):
+            self._flush(key)
+
+        if self._tasks:
+            await asyncio.gather(*self._tasks, return_exceptions=True)
@@ -0,0 +1,133 @@
+from __future__ import annotations
+from typing import TYPE_CHECKING
+
+from datetime import datetime
+from enum import Enum
+import asyncio
+import logging
+import re
+
+from .database.errors import DBAlreadyExistsError, DBRecordNotFoundError
+from .util import rfc3339_now
+
+if TYPE_CHECKING:
+    from .database.abstract import IIssues
+    from .database.orm import ORMIssue
+    from .settings import JiraSettings
+
+
+LABEL_INVALID_CHARS_RE = re.compile(r"[^A-Za-z0-9_.-]")
+
+
+def crash_label(crash_id: str) -> str:
+
+    """
+    Deterministic label of issue created for crash.
+    Lets find the issue in Jira, when its id was lost
+    """
+
+    return LABEL_INVALID_CHARS_RE.sub("_", f"crash-{crash_id}")[:255]
+
+
+class ClaimResult(Enum):
+
+    CLAIMED = "claimed"
+    """ Claim is inserted, issue has not been created yet """
+
+    TAKEN_OVER = "taken_over"
+    """ Claim of other attempt is taken over, issue may already exist in Jira """
+
+    CREATED = "created"
+    """ Issue is already created, nothing to do """
+
+
+class IssueClaims:
+
+    """Makes creation of issue idempotent by claiming it in database first"""
+
+    _issues: IIssues
+    _timeout: float
+    _poll_interval: float
+
+    def __init__(self, issues: IIssues, settings: JiraSettings):
+        self._issues = issues
+        self._timeout = settings.claim_timeout
+        self._poll_interval = settings.claim_poll_interval
+        self._logger = logging.getLogger("claims")
+
+    def _is_expired(self, claim: ORMIssue) -> bool:
+
+        # Abandoned by failed attempt
+        if claim.claimed_at is None:
+            return True
+
+        claimed_at = datetime.strptime(claim.claimed_at, "%Y-%m-%dT%H:%M:%SZ")
+        return (datetime.utcnow() - claimed_at).total_seconds() > self._timeout
+
+    async def claim(self, issue: ORMIssue) -> ClaimResult:
+
+        issue.pending = True
+
+        while True:
+            issue.claimed_at = rfc3339_now()
+
+            try:
+                await self._issues.insert(issue)
+                return ClaimResult.CLAIMED
+            except DBAlreadyExistsError:
+                pass
+
+            existing = await self._issues.get(issue.crash_id)
+
+            # Claim has been released meanwhile
+            if existing is None:
+                continue
+
+            if not existing.pending:
+                return ClaimResult.CREATED
+
+            if self._is_expired(existing):
+                self._logger.warning("Taking over claim of crash '%s'", issue.crash_id)
+                issue.rev = existing.rev
+                try:
+                    if await self._issues.update(issue):
+                        return ClaimResult.TAKEN_OVER
+                except DBRecordNotFoundError:
+                    pass
+
+                continue
+
+            await asyncio.sleep(self._poll_interval)
+
+    async def complete(self, issue: ORMIssue, issue_id: int) -> bool:
+
+        """Turns claim into mapping of created issue. Returns False if it was taken over"""
+
+        issue.issue_id = issue_id
+        issue.pending = False
+        issue.created_at = rfc3339_now()
+
+        try:
+            return await self._issues.update(issue)
+        except DBRecordNotFoundError:
+            return False
+
+    async def abandon(self, issue: ORMIssue):
+
+        """
+        Marks claim as abandoned, when issue might have been created
+        despite error. The next attempt looks for the issue before creating it
+        """
+
+        issue.claimed_at = None
+
+        try:
+            await self._issues.update(issue)
+        except DBRecordNotFoundError:
+            pass
+
+    async def release(self, issue: ORMIssue):
+
+        """Removes claim, when issue has not been created for sure"""
+
+        await self._issues.delete(issue)
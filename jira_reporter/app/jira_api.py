@@ -1,17 +1,28 @@
 from __future__ import annotations
 from logging import Logger
 import logging
-from typing import TYPE_CHECKING
+from typing import TYPE_CHECKING, List, NamedTuple, Optional
 
-from contextlib import suppress
+from contextlib import asynccontextmanager, suppress
+from contextvars import ContextVar
+import asyncio
+from urllib.parse import urlsplit
 import json
+import time
 import aiohttp
 
 from jira_reporter.app.database.orm import ORMJiraConfig
+from jira_reporter.app.rate_limiter import TokenBucket, parse_retry_after
+from jira_reporter.app.circuit_breaker import CircuitBreaker
+from jira_reporter.app.concurrency_limiter import AdaptiveLimiter
+from jira_reporter.app.metrics import JIRA_BREAKER_REJECTED
 
 if TYPE_CHECKING:
     from jira_reporter.app.database.abstract import IDatabase
-    from typing import List
+    from jira_reporter.app.settings import JiraSettings
+    from typing import Dict, Tuple, Union
+
+    SessionKey = Tuple[str, str, str]
 
 
 class JiraError(Exception):
@@ -23,137 +34,404 @@ class JiraConnectionError(JiraError):
 class JiraAuthError(JiraError):
     pass
 
+class JiraRateLimitError(JiraError):
+    pass
+
+class JiraServerError(JiraError):
+    pass
+
+class JiraCircuitOpenError(JiraError):
+    pass
+
+class JiraOverloadedError(JiraError):
+    pass
+
+
+class NewIssue(NamedTuple):
+    summary: str
+    description: str
+    labels: List[str]
+
+
+# Errors showing that Jira is unavailable at all
+BREAKER_ERRORS = (
+    JiraConnectionError,
+    JiraAuthError,
+    JiraRateLimitError,
+    JiraServerError,
+)
+
+# Errors which may disappear by themselves, so request is worth retrying.
+# Others (auth, validation, missing project, etc.) need user actions
+TRANSIENT_ERRORS = (
+    JiraConnectionError,
+    JiraRateLimitError,
+    JiraServerError,
+    JiraCircuitOpenError,
+)
+
+
+def is_transient(error: JiraError) -> bool:
+    return isinstance(error, TRANSIENT_ERRORS)
+
+
+# Set while integration is being verified, so
+# requests are not rejected by circuit breaker
+_verifying: ContextVar[bool] = ContextVar("verifying", default=False)
+
+
+class JiraSession:
+
+    """Keep-alive HTTP session bound to a single Jira and credentials pair"""
+
+    client: aiohttp.ClientSession
+    limiter: TokenBucket
+    last_used: float
+    active: int
+
+    def __init__(self, config: ORMJiraConfig, settings: JiraSettings):
+
+        connector = aiohttp.TCPConnector(
+            limit=settings.pool_size,
+            keepalive_timeout=settings.keepalive_timeout,
+            ttl_dns_cache=settings.dns_cache_ttl,
+        )
+
+        self.client = aiohttp.ClientSession(
+            connector=connector,
+            auth=aiohttp.BasicAuth(config.username, config.password),
+            timeout=aiohttp.ClientTimeout(total=settings.request_timeout),
+        )
+
+        self.limiter = TokenBucket(settings.rate_limit, settings.rate_burst)
+        self.last_used = time.monotonic()
+        self.active = 0
+
+    def is_idle(self, now: float, idle_timeout: float):
+        return self.active == 0 and now - self.last_used > idle_timeout
+
+    async def close(self):
+        await self.client.close()
+
 
 class JiraApi:
     _db: IDatabase
     _logger: Logger
+    _settings: JiraSettings
+    _sessions: Dict[SessionKey, JiraSession]
+    _breakers: Dict[str, CircuitBreaker]
+    _limiters: Dict[str, AdaptiveLimiter]
 
-    def __init__(self, db: IDatabase):
+    def __init__(self, db: IDatabase, settings: JiraSettings):
         self._db = db
+        self._settings = settings
+        self._sessions = dict()
+        self._breakers = dict()
+        self._limiters = dict()
         self._logger = logging.getLogger('JiraApi')
 
+    async def close(self):
+        sessions = list(self._sessions.values())
+        self._sessions.clear()
+
+        for session in sessions:
+            await session.close()
+
+    def _evict_sessions(self) -> List[JiraSession]:
+
+        """Takes out sessions to close, making room for a new one"""
+
+        now = time.monotonic()
+        idle_timeout = self._settings.session_idle_timeout
+
+        evicted = [
+            key for key, session in self._sessions.items()
+            if session.is_idle(now, idle_timeout)
+        ]
+
+        # Still too many hosts: drop the least recently used ones
+        overflow = len(self._sessions) - len(evicted) - self._settings.max_sessions + 1
+        if overflow > 0:
+            candidates = sorted(
+                (s.last_used, key) for key, s in self._sessions.items()
+                if key not in evicted and s.active == 0
+            )
+            evicted.extend(key for _, key in candidates[:overflow])
+
+        for key in evicted:
+            self._logger.debug("Closing idle session for '%s'", key[0])
+
+        return [self._sessions.pop(key) for key in evicted]
+
+    def _evict_idle(self, items: Dict[str, Union[CircuitBreaker, AdaptiveLimiter]]):
+
+        """Drops unused breakers or limiters along with their metrics"""
+
+        now = time.monotonic()
+        idle_timeout = self._settings.session_idle_timeout
+
+        evicted = [key for key, item in items.items() if item.is_idle(now, idle_timeout)]
+        for key in evicted:
+            items.pop(key).remove_metrics()
+
+    async def _get_session(self, config: ORMJiraConfig) -> JiraSession:
+
+        key = (config.url, config.username, config.password)
+        session = self._sessions.get(key)
+
+        if session is not None:
+            session.last_used = time.monotonic()
+            return session
+
+        # Registered before closing the evicted ones, so concurrent
+        # requests for the same key share it
+        evicted = self._evict_sessions()
+        session = JiraSession(config, self._settings)
+        session.last_used = time.monotonic()
+        self._sessions[key] = session
+
+        for evicted_session in evicted:
+            await evicted_session.close()
+
+        return session
+
+    def get_breaker(self, config: ORMJiraConfig) -> CircuitBreaker:
+
+        breaker = self._breakers.get(config.id)
+        if breaker is None:
+            self._evict_idle(self._breakers)
+            breaker = CircuitBreaker(config.id, self._settings)
+            self._breakers[config.id] = breaker
+
+        return breaker
+
+    def get_limiter(self, config: ORMJiraConfig) -> AdaptiveLimiter:
+
+        # Integrations using the same Jira share its capacity
+        host = urlsplit(config.url).netloc
+        limiter = self._limiters.get(host)
+
+        if limiter is None:
+            self._evict_idle(self._limiters)
+            limiter = AdaptiveLimiter(host, self._settings)
+            self._limiters[host] = limiter
+
+        return limiter
+
+    def check_capacity(self, config: ORMJiraConfig):
+
+        """
+        Applies backpressure, while too many requests to Jira are queued.
+        Message is then left for redelivery, so only that Jira is paused
+        """
+
+        if not self.get_limiter(config).check_capacity():
+            raise JiraOverloadedError('Too many requests to Jira are queued!')
+
+    @asynccontextmanager
+    async def _request(self, config: ORMJiraConfig, method: str, path: str, **kwargs):
+
+        breaker = self.get_breaker(config)
+        if not _verifying.get() and not breaker.allow_request():
+            JIRA_BREAKER_REJECTED.labels(config.id).inc()
+            raise JiraCircuitOpenError('Jira is unavailable, requests are suspended!')
+
+        try:
+            async with self._send(config, method, path, **kwargs) as resp:
+                yield resp
+
+        except BREAKER_ERRORS:
+            breaker.on_failure()
+            raise
+        except JiraError:
+            breaker.on_success()
+            raise
+        except BaseException:
+            breaker.on_cancel()
+            raise
+        else:
+            breaker.on_success()
+
+    @asynccontextmanager
+    async def _send(self, config: ORMJiraConfig, method: str, path: str, **kwargs):
+
+        session = await self._get_session(config)
+        limiter = self.get_limiter(config)
+        session.active += 1
+
+        max_wait = self._settings.rate_limit_max_wait
+        waited = 0.0
+        delay = 1.0
+
+        try:
+            while True:
+                await session.limiter.acquire()
+                async with limiter.acquire() as slot:
+                    try:
+                        async with session.client.request(
+                            method=method,
+                            url=f"{config.url}{path}",
+                            **kwargs,
+                        ) as resp:
+                            session.limiter.learn(resp.headers)
+                            slot.overloaded = resp.status == 429 or resp.status >= 500
+
+                            if resp.status != 429:
+                                yield resp
+                                return
+
+                    except (aiohttp.ClientError, asyncio.TimeoutError):
+                        slot.overloaded = True
+                        raise
+
+                retry_after = parse_retry_after(resp.headers)
+                delay = retry_after if retry_after is not None else min(delay * 2, 60)
+
+                if waited + delay > max_wait:
+                    raise JiraRateLimitError('Too many requests!')
+
+                self._logger.warning(
+                    "Rate limited by '%s', retrying in %.1f sec", config.url, delay
+                )
+                session.limiter.pause(delay)
+                waited += delay
+
+        except aiohttp.ClientConnectionError as e:
+            raise JiraConnectionError("Can't connect to jira!") from e
+        except asyncio.TimeoutError as e:
+            raise JiraConnectionError("Jira request timed out!") from e
+        except aiohttp.ClientError as e:
+            raise JiraError("Error in request: " + str(e)) from e
+
+        finally:
+            session.active -= 1
+            session.last_used = time.monotonic()
+
     async def verify_jira(self, config: ORMJiraConfig):
-        issue_id = await self.create_issue(
-            config, 
-            "Test issue, please remove", 
-            "Test issue, please remove", 
-            []
-        )
+        token = _verifying.set(True)
+        try:
+            issue_id = await self.create_issue(
+                config,
+                "Test issue, please remove",
+                "Test issue, please remove",
+                []
+            )
+
+            # Jira is alive again, resume suspended requests
+            self.get_breaker(config).close()
+
+            # ignore if can't delete test issue
+            with suppress(JiraError):
+                await self.delete_issue(config, issue_id)
+        finally:
+            _verifying.reset(token)
 
-        # ignore if can't delete test issue
-        with suppress(JiraError):
-            await self.delete_issue(config, issue_id)
-    
     async def delete_issue(self, config: ORMJiraConfig, issue_id: int):
 
-        async with aiohttp.ClientSession() as client:
-            try:
-                async with await client.delete(
-                    url=f"{config.url}/rest/api/2/issue/{issue_id}",
-                    auth=aiohttp.BasicAuth(
-                        config.username, 
-                        config.password
-                    ),
-                ) as resp:
-
-                    if resp.status == 401:
-                        raise JiraAuthError('Invalid login or token!')
-                    elif resp.status == 500:
-                        raise JiraError('Server error!')
-                    
-                    elif resp.status == 400:
-                        raise JiraError('Error occurred while deleting issue!')
-                    elif resp.status == 403:
-                        raise JiraError('User does not have permission to delete the issue!')
-                    elif resp.status == 404:
-                        raise JiraError('Issue not found!')
-                    
-                    elif resp.status != 204:
-                        raise JiraError(f'Invalid response code({resp.status})!')
-
-            except aiohttp.ClientConnectionError as e:
-                raise JiraConnectionError("Can't connect to jira!")
-            except aiohttp.ClientError as e:
-                raise JiraError("Error in request: " + str(e))
+        async with self._request(
+            config, "DELETE", f"/rest/api/2/issue/{issue_id}"
+        ) as resp:
+
+            if resp.status == 401:
+                raise JiraAuthError('Invalid login or token!')
+            elif resp.status >= 500:
+                raise JiraServerError('Server error!')
+
+            elif resp.status == 400:
+                raise JiraError('Error occurred while deleting issue!')
+            elif resp.status == 403:
+                raise JiraError('User does not have permission to delete the issue!')
+            elif resp.status == 404:
+                raise JiraError('Issue not found!')
+
+            elif resp.status != 204:
+                raise JiraError(f'Invalid response code({resp.status})!')
 
     async def get_issue_description(self, config: ORMJiraConfig, issue_id: int) -> str:
-        
-        async with aiohttp.ClientSession() as client:
-            try:
-                async with await client.get(
-                    url=f"{config.url}/rest/api/2/issue/{issue_id}",
-                    auth=aiohttp.BasicAuth(
-                        config.username, 
-                        config.password
-                    ),
-                ) as resp:
-
-                    if resp.status == 401:
-                        raise JiraAuthError('Invalid login or token!')
-                    elif resp.status == 500:
-                        raise JiraError('Server error!')
-
-                    elif resp.status == 404:
-                        raise JiraError('Issue not found!')
-                    
-                    elif resp.status != 200:
-                        raise JiraError(f'Invalid response code({resp.status})!')
-
-                    else:
-                        content = await resp.content.read()
-                        issue_info = json.loads(content)
-                        return issue_info['fields']['description']
-
-            except aiohttp.ClientConnectionError as e:
-                raise JiraConnectionError("Can't connect to jira!")
-            except aiohttp.ClientError as e:
-                raise JiraError("Error in request: " + str(e))
+
+        async with self._request(
+            config, "GET", f"/rest/api/2/issue/{issue_id}",
+            params=dict(fields="description"),
+        ) as resp:
+
+            if resp.status == 401:
+                raise JiraAuthError('Invalid login or token!')
+            elif resp.status >= 500:
+                raise JiraServerError('Server error!')
+
+            elif resp.status == 404:
+                raise JiraError('Issue not found!')
+
+            elif resp.status != 200:
+                raise JiraError(f'Invalid response code({resp.status})!')
+
+            else:
+                content = await resp.content.read()
+                issue_info = json.loads(content)
+                return issue_info['fields']['description']
+
+    async def find_issue_by_label(self, config: ORMJiraConfig, label: str) -> Optional[int]:
+
+        """
+        Searches issue with label in project of integration.
+        Returns the oldest one, if there are many
+        """
+
+        jql = f'project = "{config.project}" AND labels = "{label}" ORDER BY created ASC'
+
+        async with self._request(
+            config, "GET", "/rest/api/2/search",
+            params=dict(jql=jql, fields="id", maxResults=1),
+        ) as resp:
+
+            if resp.status == 401:
+                raise JiraAuthError('Invalid login or token!')
+            elif resp.status >= 500:
+                raise JiraServerError('Server error!')
+
+            elif resp.status != 200:
+                raise JiraError(f'Invalid response code({resp.status})!')
+
+            else:
+                content = await resp.content.read()
+                issues = json.loads(content)['issues']
+                return int(issues[0]['id']) if issues else None
 
     async def update_issue_description(self, config: ORMJiraConfig, issue_id: int, description: str):
-        
-        async with aiohttp.ClientSession() as client:
-            try:                
-                async with await client.put(
-                    url=f"{config.url}/rest/api/2/issue/{issue_id}",
-                    auth=aiohttp.BasicAuth(
-                        config.username, 
-                        config.password
-                    ),
-                    json=dict(
-                        fields=dict(
-                            description=description
-                        )
-                    )
-                ) as resp:
-
-                    if resp.status == 401:
-                        raise JiraAuthError('Invalid login or token!')
-                    elif resp.status == 500:
-                        raise JiraError('Server error!')
-
-                    elif resp.status == 404:
-                        raise JiraError('Issue not found!')
-                    elif resp.status == 400:
-                        err = (await resp.content.read()).decode()
-                        self._logger.error('Failed to update issue. Reason - %s', err)
-                        raise JiraError('Error occurred while updating issue!')
-                    
-                    elif resp.status != 204:
-                        raise JiraError(f'Invalid response code({resp.status})!')
-
-            except aiohttp.ClientConnectionError as e:
-                raise JiraConnectionError("Can't connect to jira!")
-            except aiohttp.ClientError as e:
-                raise JiraError("Error in request: " + str(e))
 
-    async def create_issue(self, config: ORMJiraConfig, summary: str, description: str, labels: List[str]) -> int:
+        async with self._request(
+            config, "PUT", f"/rest/api/2/issue/{issue_id}",
+            json=dict(
+                fields=dict(
+                    description=description
+                )
+            )
+        ) as resp:
+
+            if resp.status == 401:
+                raise JiraAuthError('Invalid login or token!')
+            elif resp.status >= 500:
+                raise JiraServerError('Server error!')
+
+            elif resp.status == 404:
+                raise JiraError('Issue not found!')
+            elif resp.status == 400:
+                err = (await resp.content.read()).decode()
+                self._logger.error('Failed to update issue. Reason - %s', err)
+                raise JiraError('Error occurred while updating issue!')
+
+            elif resp.status != 204:
+                raise JiraError(f'Invalid response code({resp.status})!')
+
+    @staticmethod
+    def _issue_fields(config: ORMJiraConfig, issue: NewIssue) -> dict:
 
         fields = dict(
             project={'key': config.project},
             issuetype={'name': config.issue_type},
-            summary=summary,
-            description=description,
-            labels=labels,
+            summary=issue.summary,
+            description=issue.description,
+            labels=issue.labels,
         )
 
         if config.priority is not None:
@@ -166,41 +444,91 @@ class JiraApi:
         #        'id': config.assignee_id
         #    }
 
-        async with aiohttp.ClientSession() as client:
-            try:
-                async with await client.post(
-                    url=f"{config.url}/rest/api/2/issue",
-                    auth=aiohttp.BasicAuth(
-                        config.username, 
-                        config.password
-                    ),
-                    json=dict(
-                        fields=fields
-                    )
-                ) as resp:
-
-                    if resp.status == 401:
-                        raise JiraAuthError('Invalid login or token!')
-                    elif resp.status == 500:
-                        raise JiraError('Server error!')
-
-                    elif resp.status == 400:
-                        content = await resp.content.read()
-                        errors: dict = json.loads(content)['errors']
-                        raise JiraError(
-                            "Wrong values in fields: " + ", ".join(errors.keys())
-                        )
-
-                    elif resp.status != 201:
-                        raise JiraError(f'Invalid response code({resp.status})!')
-                    
-                    else: # resp.status == 201
-                        content = await resp.content.read()
-                        issue_info = json.loads(content)
-                        return int(issue_info['id'])
-
-            except aiohttp.ClientConnectionError as e:
-                raise JiraConnectionError("Can't connect to jira!")
-            except aiohttp.ClientError as e:
-                raise JiraError("Error in request: " + str(e))
+        return fields
+
+    async def create_issue(self, config: ORMJiraConfig, summary: str, description: str, labels: List[str]) -> int:
+
+        fields = self._issue_fields(
+            config, NewIssue(summary, description, labels)
+        )
+
+        async with self._request(
+            config, "POST", "/rest/api/2/issue",
+            json=dict(
+                fields=fields
+            )
+        ) as resp:
+
+            if resp.status == 401:
+                raise JiraAuthError('Invalid login or token!')
+            elif resp.status >= 500:
+                raise JiraServerError('Server error!')
+
+            elif resp.status == 400:
+                content = await resp.content.read()
+                errors: dict = json.loads(content)['errors']
+                raise JiraError(
+                    "Wrong values in fields: " + ", ".join(errors.keys())
+                )
+
+            elif resp.status != 201:
+                raise JiraError(f'Invalid response code({resp.status})!')
+
+            else: # resp.status == 201
+                content = await resp.content.read()
+                issue_info = json.loads(content)
+                return int(issue_info['id'])
+
+    async def create_issues(self, config: ORMJiraConfig, issues: List[NewIssue]) -> List[Union[int, JiraError]]:
+
+        """
+        Creates issues with a single bulk request.
+        Returns issue id or error for each issue in the same order.
+        """
+
+        issue_updates = [
+            dict(fields=self._issue_fields(config, issue))
+            for issue in issues
+        ]
+
+        async with self._request(
+            config, "POST", "/rest/api/2/issue/bulk",
+            json=dict(
+                issueUpdates=issue_updates
+            )
+        ) as resp:
+
+            if resp.status == 401:
+                raise JiraAuthError('Invalid login or token!')
+            elif resp.status >= 500:
+                raise JiraServerError('Server error!')
+
+            # 400 is returned when all of issues failed
+            elif resp.status not in (201, 400):
+                raise JiraError(f'Invalid response code({resp.status})!')
+
+            content = await resp.content.read()
+            bulk_info: dict = json.loads(content)
+
+        failed: Dict[int, JiraError] = {}
+        for error in bulk_info.get('errors', []):
+            errors: dict = error.get('elementErrors', {}).get('errors', {})
+            failed[error['failedElementNumber']] = JiraError(
+                "Wrong values in fields: " + ", ".join(errors.keys())
+            )
+
+        created = iter(bulk_info.get('issues', []))
+        results: List[Union[int, JiraError]] = []
+
+        for i in range(len(issues)):
+            if i in failed:
+                results.append(failed[i])
+                continue
+
+            issue_info = next(created, None)
+            if issue_info is None:
+                results.append(JiraError('Issue was not created!'))
+            else:
+                results.append(int(issue_info['id']))
 
+        return results
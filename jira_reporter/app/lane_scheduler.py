@@ -0,0 +1,266 @@
+from __future__ import annotations
+from typing import TYPE_CHECKING, Deque, Dict, Optional, Set, Tuple
+
+from collections import deque
+from contextvars import ContextVar
+import asyncio
+import functools
+import logging
+import time
+
+from .metrics import LANE_BACKLOG, LANE_IN_FLIGHT, LANE_LATENCY, LANE_PENALIZED, LANE_REJECTED
+
+from .sharded_executor import run_job
+
+if TYPE_CHECKING:
+    from .sharded_executor import Job
+    from .settings import MessageQueueSettings
+
+
+# Weight of the latest job in average latency and error rate of lane
+LATENCY_SMOOTHING = 0.2
+
+
+class LaneFullError(Exception):
+    pass
+
+
+class _Outcome:
+    failed: bool = False
+
+
+# Outcome of the job running in lane
+_job_outcome: ContextVar[Optional[_Outcome]] = ContextVar("job_outcome", default=None)
+
+
+def report_job_failure():
+
+    """
+    Counts error, which job has handled by itself, against
+    its lane. Does nothing, if job is not run in a lane
+    """
+
+    outcome = _job_outcome.get()
+    if outcome is not None:
+        outcome.failed = True
+
+
+class _Lane:
+
+    name: str
+    jobs: Deque[Tuple[str, Job, asyncio.Future]]
+    running_keys: Set[str]
+    latency: float
+    error_rate: float
+    penalized: bool
+    vtime: float
+    last_used: float
+
+    def __init__(self, name: str):
+        self.name = name
+        self.jobs = deque()
+        self.running_keys = set()
+        self.latency = 0.0
+        self.error_rate = 0.0
+        self.penalized = False
+        self.vtime = 0.0
+        self.last_used = time.monotonic()
+        self.backlog = LANE_BACKLOG.labels(name)
+        self.in_flight = LANE_IN_FLIGHT.labels(name)
+        self.latencies = LANE_LATENCY.labels(name)
+        self.penalty = LANE_PENALIZED.labels(name)
+        self.rejected = LANE_REJECTED.labels(name)
+
+    def is_idle(self, now: float, idle_timeout: float):
+        if self.jobs or self.running_keys:
+            return False
+        return now - self.last_used > idle_timeout
+
+    def remove_metrics(self):
+        for metric in (LANE_BACKLOG, LANE_IN_FLIGHT, LANE_LATENCY, LANE_PENALIZED, LANE_REJECTED):
+            metric.remove(self.name)
+
+
+class LaneScheduler:
+
+    """Runs jobs in lanes, one per integration, by weighted fair queuing"""
+
+    _concurrency: int
+    _lanes: Dict[str, _Lane]
+    _running: Set[asyncio.Task]
+    _vtime: float
+    _idle: Optional[asyncio.Event]
+
+    def __init__(self, name: str, settings: MessageQueueSettings):
+        self._concurrency = max(settings.consume_concurrency, 1)
+        self._lane_concurrency = settings.lane_concurrency
+        self._queue_size = settings.lane_queue_size
+        self._penalty_latency = settings.lane_penalty_latency
+        self._penalty_error_rate = settings.lane_penalty_error_rate
+        self._penalty_concurrency = settings.lane_penalty_concurrency
+        self._penalty_weight = settings.lane_penalty_weight
+        self._idle_timeout = settings.lane_idle_timeout
+        self._logger = logging.getLogger(f"executor.{name}")
+        self._lanes = dict()
+        self._running = set()
+        self._vtime = 0.0
+        self._idle = None
+
+    def start(self):
+        self._idle = asyncio.Event()
+        self._idle.set()
+
+    def _lane(self, name: str) -> _Lane:
+        lane = self._lanes.get(name)
+        if lane is None:
+            self._evict_lanes()
+            lane = self._lanes[name] = _Lane(name)
+
+        lane.last_used = time.monotonic()
+        return lane
+
+    def _evict_lanes(self):
+
+        now = time.monotonic()
+        evicted = [
+            name for name, lane in self._lanes.items()
+            if lane.is_idle(now, self._idle_timeout)
+        ]
+
+        for name in evicted:
+            self._logger.debug("Dropping idle lane '%s'", name)
+            self._lanes.pop(name).remove_metrics()
+
+    async def submit(self, key: str, job: Job, lane: Optional[str] = None):
+
+        lane = self._lane(lane or "default")
+
+        if len(lane.jobs) >= self._queue_size:
+            lane.rejected.inc()
+            raise LaneFullError(f"Lane '{lane.name}' is full")
+
+        # Idle lane does not get credit for the time it was idle
+        if not lane.jobs and not lane.running_keys:
+            lane.vtime = max(lane.vtime, self._vtime)
+
+        done = asyncio.get_running_loop().create_future()
+        lane.jobs.append((key, job, done))
+        lane.backlog.set(len(lane.jobs))
+        self._idle.clear()
+        self._dispatch()
+
+        await done
+
+    def _budget(self, lane: _Lane) -> int:
+        if lane.penalized:
+            return self._penalty_concurrency
+        return self._lane_concurrency
+
+    def _next_job(self, lane: _Lane) -> Optional[Tuple[str, Job, asyncio.Future]]:
+
+        if len(lane.running_keys) >= self._budget(lane):
+            return None
+
+        # Jobs of the same key must not overtake each other
+        for i, (key, job, done) in enumerate(lane.jobs):
+            if key not in lane.running_keys:
+                del lane.jobs[i]
+                return key, job, done
+
+        return None
+
+    def _dispatch(self):
+
+        while len(self._running) < self._concurrency:
+
+            # Lane with the least service received (scaled by weight) goes first
+            lanes = sorted(self._lanes.values(), key=lambda lane: lane.vtime)
+            for lane in lanes:
+                next_job = self._next_job(lane)
+                if next_job is not None:
+                    break
+            else:
+                return
+
+            key, job, done = next_job
+            weight = self._penalty_weight if lane.penalized else 1.0
+            self._vtime = lane.vtime
+            lane.vtime += 1 / weight
+
+            lane.running_keys.add(key)
+            lane.backlog.set(len(lane.jobs))
+            lane.in_flight.set(len(lane.running_keys))
+
+            task = asyncio.create_task(self._run(lane, key, job, done))
+            self._running.add(task)
+            task.add_done_callback(self._running.discard)
+            task.add_done_callback(self._job_done)
+
+    async def _run(self, lane: _Lane, key: str, job: Job, done: asyncio.Future):
+
+        # Task has its own copy of context, so it is not reset
+        outcome = _Outcome()
+        _job_outcome.set(outcome)
+
+        started = time.monotonic()
+        try:
+            await run_job(job, done)
+        finally:
+            lane.last_used = time.monotonic()
+            lane.running_keys.discard(key)
+            lane.in_flight.set(len(lane.running_keys))
+
+        # Pending work of the job counts too
+        done.add_done_callback(functools.partial(self._job_finished, lane, started, outcome))
+
+    def _job_done(self, task: asyncio.Task):
+        self._dispatch()
+        if not self._running and not any(lane.jobs for lane in self._lanes.values()):
+            self._idle.set()
+
+    def _job_finished(self, lane: _Lane, started: float, outcome: _Outcome, done: asyncio.Future):
+
+        duration = time.monotonic() - started
+        lane.latencies.observe(duration)
+
+        failed = outcome.failed or (not done.cancelled() and done.exception() is not None)
+        self._update_penalty(lane, duration, failed)
+
+    def _update_penalty(self, lane: _Lane, duration: float, failed: bool):
+
+        lane.latency += LATENCY_SMOOTHING * (duration - lane.latency)
+        lane.error_rate += LATENCY_SMOOTHING * (float(failed) - lane.error_rate)
+
+        if not lane.penalized and lane.latency > self._penalty_latency:
+            self._logger.warning("Lane '%s' is slow (%.1f s). Moving to penalty", lane.name, lane.latency)
+            lane.penalized = True
+
+        elif not lane.penalized and lane.error_rate > self._penalty_error_rate:
+            self._logger.warning("Lane '%s' is failing (%.0f%%). Moving to penalty", lane.name, lane.error_rate * 100)
+            lane.penalized = True
+
+        elif (
+            lane.penalized
+            and lane.latency < self._penalty_latency / 2
+            and lane.error_rate < self._penalty_error_rate / 2
+        ):
+            self._logger.info(
+                "Lane '%s' has recovered (%.1f s, %.0f%%)",
+                lane.name, lane.latency, lane.error_rate * 100,
+            )
+            lane.penalized = False
+
+        lane.penalty.set(int(lane.penalized))
+
+    async def drain(self):
+
+        """Waits until queued jobs are done, so their messages are acknowledged"""
+
+        await self.close()
+
+    async def close(self):
+
+        """Waits until all submitted jobs are done"""
+
+        if self._idle is not None:
+            await self._idle.wait()
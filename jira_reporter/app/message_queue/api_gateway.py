@@ -1,5 +1,7 @@
+import functools
 import re
-from typing import TYPE_CHECKING, Optional
+import time
+from typing import TYPE_CHECKING, Optional, Tuple
 
 from mqtransport.participants import Consumer, Producer
 from mqtransport import MQApp
@@ -7,9 +9,13 @@ from pydantic import BaseModel, AnyHttpUrl, ConstrainedStr
 
 from mqtransport.errors import ConsumeMessageError
 
-from jira_reporter.app.jira_api import JiraError
+from jira_reporter.app.database.orm import ORMIssue, ORMParkedDuplicate
+from jira_reporter.app.issue_claims import ClaimResult, crash_label
+from jira_reporter.app.jira_api import JiraError, is_transient
+from jira_reporter.app.lane_scheduler import report_job_failure
 
 if TYPE_CHECKING:
+    from jira_reporter.app.database.orm import ORMJiraConfig
     from .state import MQAppState
 
 class LabelStr(ConstrainedStr):
@@ -26,6 +32,25 @@ class CrashInfoStr(ConstrainedStr):
     min_length = 1
     curtail_length = 1000
 
+
+DUPLICATES_RE = re.compile(r"\*Duplicates\*: [0-9]+")
+
+
+def split_description(description: str) -> Tuple[str, str]:
+
+    """Splits issue description into parts before and after duplicate count"""
+
+    match = DUPLICATES_RE.search(description)
+    if match is None:
+        # No counter in description (e.g. edited by user), so append it
+        return f"{description}\n*Duplicates*: ", ""
+
+    return (
+        description[:match.start()] + "*Duplicates*: ",
+        description[match.end():],
+    )
+
+
 class MC_DuplicateCrashFound(Consumer):
 
     """Send notification to jira that duplicate of crash is found"""
@@ -50,32 +75,93 @@ class MC_DuplicateCrashFound(Consumer):
         if config is None:
             self.logger.error(f"Can't find jira with id: {msg.config_id}")
             raise ConsumeMessageError()
-        
-        issue_id = await state.db.issues.get_issue(msg.crash_id)
-
-        if issue_id is None:
-            await state.producers.jira_report_undelivered.produce(
-                config_id=config.id,
-                update_rev=config.update_rev,
-                error="Can't update duplicate count on non created issue!"
-            )
+
+        # Not taken while Jira is overloaded
+        state.jira_api.check_capacity(config)
+
+        # Ordered after creation of the issue
+        await state.crash_executor.submit(
+            msg.crash_id,
+            functools.partial(self._process, state, config, msg),
+            lane=config.id,
+        )
+
+    async def _process(self, state: "MQAppState", config: "ORMJiraConfig", msg: Model):
+
+        # Count is already written, nothing to update
+        known_count = state.db.issues.cached_duplicate_count(msg.crash_id)
+        if known_count is not None and msg.duplicate_count <= known_count:
             return
-        
+
+        # Only the highest count of a burst is written to jira. Shard is not
+        # held during coalescing window, but message is acknowledged after the write
+        return state.duplicate_coalescer.schedule(
+            msg.crash_id,
+            msg.duplicate_count,
+            functools.partial(self._update_count, state, config, msg.crash_id),
+        )
+
+    @staticmethod
+    async def _update_count(state: "MQAppState", config: "ORMJiraConfig", crash_id: str, duplicate_count: int):
+
+        # Writes to Jira may be reordered, so the write is confirmed
+        # by compare-and-set. If other instance has changed the count
+        # meanwhile, its write may have been overwritten, so it is repeated
+        written = False
+
         try:
-            description = await state.jira_api.get_issue_description(config, issue_id)
-            print(description)
-            description = re.sub(
-                r"\*Duplicates\*: [0-9]+", 
-                f"*Duplicates*: {msg.duplicate_count}",
-                description
-            )
-            await state.jira_api.update_issue_description(config, issue_id, description)
+            while True:
+                issue = await state.db.issues.get(crash_id)
+
+                # Folded into description, when issue is created
+                if issue is None or issue.pending:
+                    await state.parked_duplicates.park(config.id, crash_id, duplicate_count)
+                    return
+
+                # Counter never goes backwards
+                raised = duplicate_count > issue.duplicate_count
+                if not raised and issue.is_synced and not written:
+                    return
+
+                if issue.render_description() is None:
+                    # Issue was created without stored description
+                    description = await state.jira_api.get_issue_description(config, issue.issue_id)
+                    issue.description_head, issue.description_tail = split_description(description)
+
+                if raised:
+                    issue.duplicate_count = duplicate_count
+                    if not await state.db.issues.update_duplicate_count(issue):
+                        continue
+
+                # Only the holder of the latest revision writes to Jira
+                await state.jira_api.update_issue_description(
+                    config, issue.issue_id, issue.render_description()
+                )
+
+                written = True
+                issue.synced_count = issue.duplicate_count
+                if await state.db.issues.update_duplicate_count(issue):
+                    return
+
         except JiraError as e:
-            await state.producers.jira_report_undelivered.produce(
-                config_id=msg.config_id,
-                error=e.args[0]
-            )
-        
+            # Count stays unsynced, so it is written on redelivery
+            await state.undelivered_reports.report(config.id, e.args[0])
+            raise
+
+
+async def resume_parked_duplicate(state: "MQAppState", parked: ORMParkedDuplicate):
+
+    """Updates duplicate count parked until issue is created"""
+
+    config = await state.db.configs.get(parked.config_id)
+    if config is None:
+        return
+
+    await state.duplicate_coalescer.schedule(
+        parked.crash_id,
+        parked.duplicate_count,
+        functools.partial(MC_DuplicateCrashFound._update_count, state, config, parked.crash_id),
+    )
 
 
 class MC_UniqueCrashFound(Consumer):
@@ -121,6 +207,23 @@ class MC_UniqueCrashFound(Consumer):
             self.logger.error(f"Can't find jira with id: {msg.config_id}")
             raise ConsumeMessageError()
 
+        # Not taken while Jira is overloaded
+        state.jira_api.check_capacity(config)
+        await state.crash_executor.submit(
+            msg.crash_id,
+            functools.partial(self._process, state, config, msg),
+            lane=config.id,
+        )
+
+    async def _process(
+        self,
+        state: "MQAppState",
+        config: "ORMJiraConfig",
+        msg: Model,
+        attempt: int = 1,
+        first_failed_at: Optional[float] = None,
+    ):
+
         self._logger.debug(("Consumed message:\ncrash_id: %s\n"
                            "crash url: %s\ncrash info: %s\n"
                            "crash type: %s\ncrash output: %s\n"
@@ -131,33 +234,108 @@ class MC_UniqueCrashFound(Consumer):
                           msg.project_name, msg.fuzzer_name,
                           msg.revision_name)
 
-        description = f'''
+        issue = ORMIssue(
+            crash_id=msg.crash_id,
+            issue_id=0,
+            config_id=config.id,
+            duplicate_count=0,
+            description_head=f'''
         *Crash info*: {msg.crash_info}
         *Crash link*: {msg.crash_url}
         *Project name*: {msg.project_name}
         *Fuzzer name*: {msg.fuzzer_name}
         *Revision*: {msg.revision_name}
-        *Duplicates*: 0
+        *Duplicates*: ''',
+            description_tail=f'''
         {{noformat}}{msg.crash_output}{{noformat}}
-        '''
+        ''',
+        )
+
+        # Redelivered message or another instance creates the same issue
+        claim = await state.issue_claims.claim(issue)
+        if claim == ClaimResult.CREATED:
+            self._logger.debug("Issue of crash '%s' already exists", msg.crash_id)
+            return
+
+        label = crash_label(msg.crash_id)
+        issue_id = None
 
         try:
-            issue_id = await state.jira_api.create_issue(
-                config=config,
-                summary=msg.crash_info[:255],
-                description=description,
-                labels=[
-                    msg.fuzzer_name,
-                    msg.revision_name,
-                    msg.crash_type
-                ]
-            )
+            # Duplicates found before creation are written at once
+            issue.duplicate_count = await state.parked_duplicates.take(msg.crash_id)
+
+            # Previous attempt might have created the issue, but lost its id
+            if claim == ClaimResult.TAKEN_OVER:
+                issue_id = await state.jira_api.find_issue_by_label(config, label)
+
+            if issue_id is not None:
+                # Description of the found issue is updated after it is saved
+                await self._park_duplicates(state, issue)
+                issue.duplicate_count = 0
+
+            else:
+                issue_id = await state.issue_batcher.create_issue(
+                    config=config,
+                    summary=msg.crash_info[:255],
+                    description=issue.render_description(),
+                    labels=[
+                        msg.fuzzer_name,
+                        msg.revision_name,
+                        msg.crash_type,
+                        label,
+                    ]
+                )
 
-            await state.db.issues.insert(msg.crash_id, issue_id)
         except JiraError as e:
-            await state.producers.jira_report_undelivered.produce(
-                config_id=msg.config_id,
-                error=e.args[0]
+            report_job_failure()
+            await self._park_duplicates(state, issue)
+
+            if is_transient(e):
+                # Issue might have been created, so the next attempt looks for it
+                await state.issue_claims.abandon(issue)
+
+                retry_msg = MC_UniqueCrashFound.Model(**msg.dict()).dict()
+                if state.retry_scheduler.schedule(retry_msg, attempt, first_failed_at or time.time()):
+                    # Message is acknowledged only after its retry is saved
+                    await state.checkpoint.save_now()
+                    self._logger.warning(
+                        "Failed to create issue of crash '%s' (attempt %d): %s. Will retry",
+                        msg.crash_id, attempt, e,
+                    )
+                    return
+            else:
+                # Rejected by Jira, so issue does not exist for sure
+                await state.issue_claims.release(issue)
+
+            await state.undelivered_reports.report(msg.config_id, e.args[0])
+            return
+
+        except Exception:
+            # Redelivered message must not wait for the claim to expire
+            await self._park_duplicates(state, issue)
+            await state.issue_claims.abandon(issue)
+            raise
+
+        # Description of the created issue contains the count
+        issue.synced_count = issue.duplicate_count
+        try:
+            completed = await state.issue_claims.complete(issue, issue_id)
+        except Exception:
+            # Issue exists, so the next attempt finds it by its label
+            await state.issue_claims.abandon(issue)
+            raise
+
+        if not completed:
+            self._logger.warning(
+                "Claim of crash '%s' was taken over before issue %d was saved",
+                msg.crash_id, issue_id,
+            )
+
+    @staticmethod
+    async def _park_duplicates(state: "MQAppState", issue: ORMIssue):
+        if issue.duplicate_count > 0:
+            await state.parked_duplicates.park(
+                issue.config_id, issue.crash_id, issue.duplicate_count
             )
 
 
@@ -183,3 +361,12 @@ class MP_JiraReportUndelivered(Producer):
 
         error: str
         """ Last error caused integration to fail """
+
+        count: int = 1
+        """ Number of reports undelivered due to the error """
+
+        first_reported_at: Optional[str]
+        """ Time of the first undelivered report (RFC 3339) """
+
+        last_reported_at: Optional[str]
+        """ Time of the last undelivered report (RFC 3339) """
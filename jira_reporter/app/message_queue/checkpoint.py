@@ -0,0 +1,125 @@
+from __future__ import annotations
+from typing import TYPE_CHECKING, Dict, Optional
+
+import asyncio
+import logging
+import time
+
+from jira_reporter.app.metrics import MQ_CHECKPOINT_DURATION, MQ_CHECKPOINT_INTERVAL
+
+if TYPE_CHECKING:
+    from mqtransport import MQApp
+    from jira_reporter.app.database.abstract import IUnsentMessages
+    from .retry import RetryScheduler
+
+
+EXPORT_DRAINS = (
+    "Export of unsent messages removes them from producers. "
+    "This version of mqtransport is not supported, set MQ_CHECKPOINT_INTERVAL=0"
+)
+
+
+class UnsentMessagesCheckpoint:
+
+    """Periodically saves MQ unsent messages and pending retries to database"""
+
+    _mq_app: MQApp
+    _unsent_mq: IUnsentMessages
+    _retry_scheduler: Optional[RetryScheduler]
+    _interval: float
+    _task: Optional[asyncio.Task]
+    _lock: asyncio.Lock
+    _export_drains: Optional[bool]
+
+    def __init__(
+        self,
+        mq_app: MQApp,
+        unsent_mq: IUnsentMessages,
+        interval: float,
+        retry_scheduler: Optional[RetryScheduler] = None,
+    ):
+        self._mq_app = mq_app
+        self._unsent_mq = unsent_mq
+        self._retry_scheduler = retry_scheduler
+        self._interval = interval
+        self._logger = logging.getLogger("mq.checkpoint")
+        self._task = None
+        self._lock = asyncio.Lock()
+        self._export_drains = None
+
+    def start(self):
+        MQ_CHECKPOINT_INTERVAL.set(self._interval)
+        if self._interval > 0:
+            self._task = asyncio.create_task(self._run())
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self._interval)
+            try:
+                await self.checkpoint()
+            except Exception:
+                self._logger.exception("Failed to save MQ unsent messages")
+
+    def _check_export(self, messages: Dict[str, list]):
+
+        # Nothing can be sent between two synchronous exports,
+        # so the second one returns the same messages, unless drained
+        if any(self._mq_app.export_unsent_messages().values()):
+            self._export_drains = False
+            return
+
+        self._mq_app.import_unsent_messages(messages)
+        self._export_drains = True
+        raise RuntimeError(EXPORT_DRAINS)
+
+    async def checkpoint(self):
+
+        # Each save writes the changes since the previous one
+        async with self._lock:
+            await self._checkpoint()
+
+    async def _checkpoint(self):
+
+        if self._export_drains:
+            raise RuntimeError(EXPORT_DRAINS)
+
+        started = time.monotonic()
+        messages = self._mq_app.export_unsent_messages()
+
+        if self._export_drains is None and any(messages.values()):
+            self._check_export(messages)
+
+        if self._retry_scheduler is not None:
+            for queue, retries in self._retry_scheduler.export_pending().items():
+                messages = dict(messages)
+                messages[queue] = list(messages.get(queue, [])) + retries
+
+        await self._unsent_mq.save_unsent_messages(messages)
+
+        duration = time.monotonic() - started
+        MQ_CHECKPOINT_DURATION.observe(duration)
+        self._logger.debug("Saved MQ unsent messages in %.3f sec", duration)
+
+    async def save_now(self):
+
+        """
+        Saves checkpoint at once, e.g. before message, which has produced
+        a retry, is acknowledged. Does nothing, if checkpoints are disabled
+        """
+
+        if self._interval > 0:
+            await self.checkpoint()
+
+    async def close(self):
+
+        """Stops periodic checkpoints and saves the final one"""
+
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+        # Producers are stopped, so messages may be drained
+        self._export_drains = False
+
+        await self.checkpoint()
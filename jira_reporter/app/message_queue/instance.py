@@ -1,12 +1,17 @@
 from __future__ import annotations
 from typing import TYPE_CHECKING
 
+import asyncio
+
 from mqtransport import SQSApp
 
+from jira_reporter.app.startup import StartupGraph
+
 from .api_gateway import MC_DuplicateCrashFound, MC_UniqueCrashFound
 from .api_gateway import MP_JiraReportUndelivered, MP_JiraIntegrationResult
 
 from .internal import MP_VerifyJira, MC_VerifyJira
+from .internal import MP_RetryUniqueCrash, MC_RetryUniqueCrash
 from jira_reporter.app.message_queue.state import MQAppState
 
 if TYPE_CHECKING:
@@ -19,6 +24,7 @@ class Producers:
     jira_integration_result: MP_JiraIntegrationResult
 
     verify_jira: MP_VerifyJira
+    retry_unique_crash: MP_RetryUniqueCrash
 
 
 class MQAppInitializer:
@@ -40,8 +46,16 @@ class MQAppInitializer:
         self._app.state = MQAppState()
 
         try:
-            await self._app.ping()
-            await self._configure_channels()
+            graph = StartupGraph("mq")
+            graph.add("Ping", self._app.ping)
+            graph.add("Create own channel", self._create_own_channel)
+            graph.add("Create other channels", self._create_other_channels)
+            graph.add(
+                "Configure channels",
+                self._configure_channels,
+                ["Create own channel", "Create other channels"],
+            )
+            await graph.run()
 
         except:
             await self._app.shutdown()
@@ -71,10 +85,15 @@ class MQAppInitializer:
 
     async def _create_other_channels(self):
         queues = self._settings.message_queue.queues
-        self._och_api_gateway = await self._app.create_producing_channel(queues.api_gateway)
-
-        self._ich_internal = await self._app.create_consuming_channel(queues.jira_reporter_internal)
-        self._och_internal = await self._app.create_producing_channel(queues.jira_reporter_internal)
+        (
+            self._och_api_gateway,
+            self._ich_internal,
+            self._och_internal,
+        ) = await asyncio.gather(
+            self._app.create_producing_channel(queues.api_gateway),
+            self._app.create_consuming_channel(queues.jira_reporter_internal),
+            self._app.create_producing_channel(queues.jira_reporter_internal),
+        )
 
     def _setup_internal_communication(self, producers: Producers):
 
@@ -83,10 +102,13 @@ class MQAppInitializer:
 
         # Incoming messages
         ich.add_consumer(MC_VerifyJira())
+        ich.add_consumer(MC_RetryUniqueCrash())
 
         # Outcoming messages
         producers.verify_jira = MP_VerifyJira()
         och.add_producer(producers.verify_jira)
+        producers.retry_unique_crash = MP_RetryUniqueCrash()
+        och.add_producer(producers.retry_unique_crash)
 
     def _setup_api_gateway_communication(self, producers: Producers):
 
@@ -105,9 +127,6 @@ class MQAppInitializer:
         och.add_producer(producers.jira_integration_result)
 
     async def _configure_channels(self):
-        await self._create_own_channel()
-        await self._create_other_channels()
-
         state: MQAppState = self.app.state
         state.producers = Producers()
 
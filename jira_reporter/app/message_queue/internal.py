@@ -1,8 +1,12 @@
+import functools
+import time
 from pydantic import BaseModel
 
 from mqtransport import MQApp
+from mqtransport.errors import ConsumeMessageError
 from mqtransport.participants import Consumer, Producer
 from jira_reporter.app.jira_api import JiraError
+from jira_reporter.app.message_queue.api_gateway import MC_UniqueCrashFound
 
 from jira_reporter.app.message_queue.state import MQAppState
 
@@ -21,6 +25,12 @@ class MC_VerifyJira(Consumer):
     async def consume(self, msg: Model, app: MQApp):
         state: MQAppState = app.state
         config = await state.db.configs.get(msg.config_id)
+
+        # Config may be cached before it has been updated
+        if config and config.update_rev != msg.update_rev:
+            state.db.configs.invalidate(msg.config_id)
+            config = await state.db.configs.get(msg.config_id)
+
         if config and config.update_rev == msg.update_rev:
             try:
                 await state.jira_api.verify_jira(config)
@@ -37,4 +47,61 @@ class MC_VerifyJira(Consumer):
                 )
         # TODO: any reaction?
         #else:
-        #    pass
\ No newline at end of file
+        #    pass
+
+
+class MP_RetryUniqueCrash(Producer):
+    name = "jira-reporter.internal.retry-unique-crash"
+    class Model(MC_UniqueCrashFound.Model):
+        attempt: int
+        first_failed_at: float
+        not_before: float
+
+
+class MC_RetryUniqueCrash(MC_UniqueCrashFound):
+
+    """Retry to create issue, failed due to transient Jira error"""
+
+    name = "jira-reporter.internal.retry-unique-crash"
+    class Model(MC_UniqueCrashFound.Model):
+        attempt: int
+        """ Number of this attempt """
+
+        first_failed_at: float
+        """ Time of the first failure (UNIX timestamp) """
+
+        not_before: float
+        """ Time the attempt is scheduled to (UNIX timestamp) """
+
+    async def consume(self, msg: Model, app: MQApp):
+        state: MQAppState = app.state
+
+        # Sent before its time (e.g. on shutdown)
+        if msg.not_before > time.time():
+            state.retry_scheduler.schedule_at(
+                MC_UniqueCrashFound.Model(**msg.dict()).dict(),
+                msg.attempt,
+                msg.first_failed_at,
+                msg.not_before,
+            )
+            await state.checkpoint.save_now()
+            return
+
+        config = await state.db.configs.get(msg.config_id)
+        if config is None:
+            self.logger.error(f"Can't find jira with id: {msg.config_id}")
+            raise ConsumeMessageError()
+
+        state.jira_api.check_capacity(config)
+        await state.crash_executor.submit(
+            msg.crash_id,
+            functools.partial(
+                self._process,
+                state,
+                config,
+                msg,
+                msg.attempt,
+                msg.first_failed_at,
+            ),
+            lane=config.id,
+        )
@@ -0,0 +1,111 @@
+from __future__ import annotations
+from typing import TYPE_CHECKING, Dict, Optional, Tuple
+
+import asyncio
+import logging
+
+from jira_reporter.app.util import rfc3339_now
+
+if TYPE_CHECKING:
+    from .api_gateway import MP_JiraReportUndelivered
+
+    ReportKey = Tuple[str, str]
+
+
+# Max number of messages sent at once
+SEND_BATCH_SIZE = 10
+
+
+class _PendingReport:
+
+    count: int
+    first_reported_at: str
+    last_reported_at: str
+
+    def __init__(self):
+        self.count = 0
+        self.first_reported_at = self.last_reported_at = rfc3339_now()
+
+
+class UndeliveredReports:
+
+    """Merges undelivered reports of the same integration and error"""
+
+    _producer: MP_JiraReportUndelivered
+    _window: float
+    _pending: Dict[ReportKey, _PendingReport]
+    _timer: Optional[asyncio.TimerHandle]
+    _flushing: Optional[asyncio.Task]
+
+    def __init__(self, producer: MP_JiraReportUndelivered, window: float):
+        self._producer = producer
+        self._window = window
+        self._logger = logging.getLogger("mq.reports")
+        self._pending = dict()
+        self._timer = None
+        self._flushing = None
+
+    async def report(self, config_id: str, error: str):
+
+        if self._window <= 0:
+            now = rfc3339_now()
+            await self._producer.produce(
+                config_id=config_id,
+                error=error,
+                count=1,
+                first_reported_at=now,
+                last_reported_at=now,
+            )
+            return
+
+        report = self._pending.get((config_id, error))
+        if report is None:
+            report = self._pending[(config_id, error)] = _PendingReport()
+
+        report.count += 1
+        report.last_reported_at = rfc3339_now()
+
+        if self._timer is None:
+            loop = asyncio.get_running_loop()
+            self._timer = loop.call_later(self._window, self._flush)
+
+    def _flush(self):
+        self._timer = None
+        pending, self._pending = self._pending, dict()
+        previous = self._flushing
+        self._flushing = asyncio.create_task(self._send(pending, previous))
+
+    async def _send(self, pending: Dict[ReportKey, _PendingReport], previous: Optional[asyncio.Task]):
+
+        # Windows are sent in order
+        if previous is not None:
+            await asyncio.gather(previous, return_exceptions=True)
+
+        reports = list(pending.items())
+        for i in range(0, len(reports), SEND_BATCH_SIZE):
+            results = await asyncio.gather(
+                *[
+                    self._producer.produce(
+                        config_id=config_id,
+                        error=error,
+                        count=report.count,
+                        first_reported_at=report.first_reported_at,
+                        last_reported_at=report.last_reported_at,
+                    )
+                    for (config_id, error), report in reports[i : i + SEND_BATCH_SIZE]
+                ],
+                return_exceptions=True,
+            )
+
+            for result in results:
+                if isinstance(result, Exception):
+                    self._logger.error("Failed to send undelivered report: %s", result)
+
+    async def close(self):
+
+        if self._timer is not None:
+            self._timer.cancel()
+            self._flush()
+
+        if self._flushing is not None:
+            await self._flushing
@@ -0,0 +1,113 @@
+from __future__ import annotations
+from typing import TYPE_CHECKING, Dict, Set, Tuple
+
+import asyncio
+import itertools
+import logging
+import random
+import time
+
+from jira_reporter.app.metrics import JIRA_RETRY_DEPTH, JIRA_RETRY_EXHAUSTED
+
+if TYPE_CHECKING:
+    from mqtransport.participants import Producer
+    from jira_reporter.app.settings import JiraSettings
+
+
+class RetryScheduler:
+
+    """Resends messages failed due to transient errors after a backoff"""
+
+    _producer: Producer
+    _queue: str
+    _pending: Dict[int, Tuple[dict, asyncio.TimerHandle]]
+    _tasks: Set[asyncio.Task]
+
+    def __init__(self, producer: Producer, queue: str, settings: JiraSettings):
+        self._producer = producer
+        self._queue = queue
+        self._max_attempts = settings.retry_max_attempts
+        self._base_delay = settings.retry_base_delay
+        self._max_delay = settings.retry_max_delay
+        self._max_age = settings.retry_max_age
+        self._logger = logging.getLogger("mq.retry")
+        self._ids = itertools.count()
+        self._pending = dict()
+        self._tasks = set()
+
+    def _backoff(self, attempt: int) -> float:
+        delay = min(self._base_delay * 2 ** (attempt - 1), self._max_delay)
+        return random.uniform(delay / 2, delay)
+
+    def schedule(self, msg: dict, attempt: int, first_failed_at: float) -> bool:
+
+        """
+        Schedules the next attempt after the failed one.
+        Returns False if attempts are exhausted
+        """
+
+        age = time.time() - first_failed_at
+        if attempt >= self._max_attempts or age >= self._max_age:
+            JIRA_RETRY_EXHAUSTED.inc()
+            return False
+
+        not_before = time.time() + self._backoff(attempt)
+        self.schedule_at(msg, attempt + 1, first_failed_at, not_before)
+        return True
+
+    def schedule_at(self, msg: dict, attempt: int, first_failed_at: float, not_before: float):
+
+        retry = dict(
+            msg,
+            attempt=attempt,
+            first_failed_at=first_failed_at,
+            not_before=not_before,
+        )
+
+        loop = asyncio.get_running_loop()
+        retry_id = next(self._ids)
+        delay = max(not_before - time.time(), 0)
+        timer = loop.call_later(delay, self._send, retry_id)
+
+        self._pending[retry_id] = (retry, timer)
+        JIRA_RETRY_DEPTH.labels(attempt).inc()
+
+    def export_pending(self) -> Dict[str, list]:
+
+        """Returns pending retries in format of MQ unsent messages"""
+
+        if not self._pending:
+            return {}
+
+        return {
+            self._queue: [
+                {"name": self._producer.name, "body": retry}
+                for retry, _ in self._pending.values()
+            ]
+        }
+
+    def _send(self, retry_id: int):
+
+        retry, timer = self._pending.pop(retry_id)
+        JIRA_RETRY_DEPTH.labels(retry["attempt"]).dec()
+        timer.cancel()
+
+        task = asyncio.create_task(self._produce(retry))
+        task.add_done_callback(self._tasks.discard)
+        self._tasks.add(task)
+
+    async def _produce(self, retry: dict):
+        try:
+            await self._producer.produce(**retry)
+        except Exception as e:
+            self._logger.error("Failed to send retry: %s", e)
+
+    async def close(self):
+
+        """Stops timers. Pending retries are left for the final checkpoint"""
+
+        for _, timer in self._pending.values():
+            timer.cancel()
+
+        if self._tasks:
+            await asyncio.gather(*self._tasks)
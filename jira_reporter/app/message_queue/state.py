@@ -1,16 +1,33 @@
 from __future__ import annotations
-from typing import TYPE_CHECKING
+from typing import TYPE_CHECKING, Union
 
 if TYPE_CHECKING:
     from ..jira_api import JiraApi
+    from ..issue_batcher import IssueBatcher
+    from ..duplicate_coalescer import DuplicateCoalescer
+    from ..issue_claims import IssueClaims
+    from ..parked_duplicates import ParkedDuplicates
+    from ..sharded_executor import ShardedExecutor
+    from ..lane_scheduler import LaneScheduler
     from jira_reporter.app.settings import AppSettings
     from jira_reporter.app.database.abstract import IDatabase
     from jira_reporter.app.message_queue.instance import Producers
+    from jira_reporter.app.message_queue.checkpoint import UnsentMessagesCheckpoint
+    from jira_reporter.app.message_queue.report_coalescer import UndeliveredReports
+    from jira_reporter.app.message_queue.retry import RetryScheduler
 
 
 
 class MQAppState:
     jira_api: JiraApi
+    issue_batcher: IssueBatcher
+    duplicate_coalescer: DuplicateCoalescer
+    issue_claims: IssueClaims
+    parked_duplicates: ParkedDuplicates
+    crash_executor: Union[ShardedExecutor, LaneScheduler]
     db: IDatabase
     settings: AppSettings
-    producers: Producers
\ No newline at end of file
+    producers: Producers
+    undelivered_reports: UndeliveredReports
+    retry_scheduler: RetryScheduler
+    checkpoint: UnsentMessagesCheckpoint
\ No newline at end of file
@@ -0,0 +1,185 @@
+from prometheus_client import Counter, Gauge, Histogram
+
+########################################
+# Startup
+########################################
+
+STARTUP_PHASE_DURATION = Gauge(
+    "jira_reporter_startup_phase_duration_seconds",
+    "Time spent in startup phase during the last start",
+    ["component", "phase"],
+)
+
+SERVICE_READY = Gauge(
+    "jira_reporter_ready",
+    "Whether service consumes messages (1) or not (0)",
+)
+
+########################################
+# Message processing
+########################################
+
+SHARD_IN_FLIGHT = Gauge(
+    "jira_reporter_shard_in_flight",
+    "Messages queued or being processed in shard",
+    ["executor", "shard"],
+)
+
+LANE_BACKLOG = Gauge(
+    "jira_reporter_lane_backlog",
+    "Messages waiting in lane of integration",
+    ["lane"],
+)
+
+LANE_IN_FLIGHT = Gauge(
+    "jira_reporter_lane_in_flight",
+    "Messages being processed in lane of integration",
+    ["lane"],
+)
+
+LANE_LATENCY = Histogram(
+    "jira_reporter_lane_latency_seconds",
+    "Time spent processing message in lane of integration",
+    ["lane"],
+)
+
+LANE_REJECTED = Counter(
+    "jira_reporter_lane_rejected_total",
+    "Messages left for redelivery, because lane of integration was full",
+    ["lane"],
+)
+
+LANE_PENALIZED = Gauge(
+    "jira_reporter_lane_penalized",
+    "Whether lane of integration is in penalty class (1) or not (0)",
+    ["lane"],
+)
+
+DUPLICATES_PARKED = Gauge(
+    "jira_reporter_duplicates_parked",
+    "Duplicate counts kept in memory until issue is created",
+)
+
+DUPLICATES_SPILLED = Counter(
+    "jira_reporter_duplicates_spilled_total",
+    "Parked duplicate counts moved from memory to database",
+)
+
+DUPLICATES_EXPIRED = Counter(
+    "jira_reporter_duplicates_expired_total",
+    "Parked duplicate counts dropped, because issue was not created in time",
+)
+
+########################################
+# Jira
+########################################
+
+JIRA_RETRY_DEPTH = Gauge(
+    "jira_reporter_retry_depth",
+    "Reports waiting for retry by attempt number",
+    ["attempt"],
+)
+
+JIRA_RETRY_EXHAUSTED = Counter(
+    "jira_reporter_retry_exhausted_total",
+    "Reports given up after max number of attempts or max age",
+)
+
+JIRA_CONCURRENCY_LIMIT = Gauge(
+    "jira_reporter_jira_concurrency_limit",
+    "Current adaptive limit of concurrent requests to Jira host",
+    ["host"],
+)
+
+JIRA_IN_FLIGHT = Gauge(
+    "jira_reporter_jira_in_flight",
+    "Requests to Jira host in progress",
+    ["host"],
+)
+
+JIRA_QUEUED = Gauge(
+    "jira_reporter_jira_queued",
+    "Requests to Jira host waiting for concurrency limit",
+    ["host"],
+)
+
+JIRA_QUEUE_DELAY = Histogram(
+    "jira_reporter_jira_queue_delay_seconds",
+    "Time request to Jira host waited for concurrency limit",
+    ["host"],
+)
+
+JIRA_REJECTED = Counter(
+    "jira_reporter_jira_rejected_total",
+    "Messages left for redelivery, because too many requests to Jira host were queued",
+    ["host"],
+)
+
+JIRA_BREAKER_STATE = Gauge(
+    "jira_reporter_breaker_state",
+    "Circuit breaker state of integration (0 - closed, 1 - open, 2 - half-open)",
+    ["config_id"],
+)
+
+JIRA_BREAKER_REJECTED = Counter(
+    "jira_reporter_breaker_rejected_total",
+    "Requests to Jira rejected by open circuit breaker",
+    ["config_id"],
+)
+
+########################################
+# Message queue
+########################################
+
+MQ_CHECKPOINT_INTERVAL = Gauge(
+    "jira_reporter_mq_checkpoint_interval_seconds",
+    "Interval between checkpoints of MQ unsent messages",
+)
+
+MQ_CHECKPOINT_DURATION = Histogram(
+    "jira_reporter_mq_checkpoint_duration_seconds",
+    "Time spent saving MQ unsent messages",
+)
+
+########################################
+# Database
+########################################
+
+DB_POOL_SIZE = Gauge(
+    "jira_reporter_db_pool_size",
+    "Max number of connections to database",
+)
+
+DB_POOL_IN_USE = Gauge(
+    "jira_reporter_db_pool_in_use",
+    "Requests to database in progress (including ones waiting for connection)",
+)
+
+DB_POOL_WAITS = Counter(
+    "jira_reporter_db_pool_waits_total",
+    "Requests to database started when all connections were busy",
+)
+
+DB_REQUEST_DURATION = Histogram(
+    "jira_reporter_db_request_duration_seconds",
+    "Latency of requests to database by collection (or endpoint, like '_cursor')",
+    ["collection", "method"],
+)
+
+CACHE_HITS = Counter(
+    "jira_reporter_cache_hits_total",
+    "Lookups served from in-memory cache",
+    ["cache"],
+)
+
+CACHE_MISSES = Counter(
+    "jira_reporter_cache_misses_total",
+    "Lookups not found in in-memory cache",
+    ["cache"],
+)
+
+CACHE_FILTER_SKIPS = Counter(
+    "jira_reporter_cache_filter_skips_total",
+    "Lookups of missing records answered by negative filter",
+    ["cache"],
+)
@@ -0,0 +1,234 @@
+from __future__ import annotations
+from typing import TYPE_CHECKING, Awaitable, Callable, Dict, List, Optional, Set
+
+from collections import OrderedDict
+from datetime import datetime, timedelta
+import asyncio
+import logging
+
+from .database.orm import ORMParkedDuplicate
+from .metrics import DUPLICATES_PARKED, DUPLICATES_SPILLED, DUPLICATES_EXPIRED
+from .util import rfc3339, rfc3339_now
+
+if TYPE_CHECKING:
+    from .database.abstract import IDatabase
+    from .message_queue.report_coalescer import UndeliveredReports
+    from .settings import JiraSettings
+
+    ResumeFunc = Callable[[ORMParkedDuplicate], Awaitable[None]]
+
+
+class ParkedDuplicates:
+
+    """Duplicate counts of crashes, whose issues are not created yet"""
+
+    BATCH_SIZE = 1000
+
+    _db: IDatabase
+    _reports: UndeliveredReports
+    _resume: ResumeFunc
+    _parked: OrderedDict
+    _spilling: Dict[str, asyncio.Event]
+    _spilled: Set[str]
+    _resuming: Set[asyncio.Task]
+    _sweeper: Optional[asyncio.Task]
+
+    def __init__(
+        self,
+        db: IDatabase,
+        reports: UndeliveredReports,
+        resume: ResumeFunc,
+        settings: JiraSettings,
+    ):
+        self._db = db
+        self._reports = reports
+        self._resume = resume
+        self._max_size = settings.parked_duplicates_max_size
+        self._ttl = settings.parked_duplicates_ttl
+        self._sweep_interval = settings.parked_duplicates_sweep_interval
+        self._logger = logging.getLogger("parked")
+        self._parked = OrderedDict()
+        self._spilling = dict()
+        self._spilled = set()
+        self._resuming = set()
+        self._sweeper = None
+
+    async def start(self):
+
+        # Spilled before the last shutdown
+        async for crash_id in self._db.parked_duplicates.list_crash_ids():
+            self._spilled.add(crash_id)
+
+        self._logger.info("Found %d spilled parked duplicates", len(self._spilled))
+        self._sweeper = asyncio.create_task(self._sweep_periodically())
+
+    def _resume_later(self, parked: ORMParkedDuplicate):
+
+        # Resume waits for coalescing window, so it must not block caller
+        task = asyncio.create_task(self._resume(parked))
+        task.add_done_callback(self._on_resumed)
+        self._resuming.add(task)
+
+    def _on_resumed(self, task: asyncio.Task):
+        self._resuming.discard(task)
+        if not task.cancelled() and task.exception() is not None:
+            self._logger.error("Failed to resume parked duplicates: %s", task.exception())
+
+    async def park(self, config_id: str, crash_id: str, duplicate_count: int):
+
+        parked: Optional[ORMParkedDuplicate] = self._parked.get(crash_id)
+
+        if parked is None:
+            self._parked[crash_id] = ORMParkedDuplicate(
+                crash_id=crash_id,
+                config_id=config_id,
+                duplicate_count=duplicate_count,
+                parked_at=rfc3339_now(),
+            )
+        else:
+            parked.duplicate_count = max(parked.duplicate_count, duplicate_count)
+
+        if len(self._parked) > self._max_size:
+            # Spilled in batches, so database is not written on each park
+            await self._spill(len(self._parked) - self._max_size // 2)
+
+        DUPLICATES_PARKED.set(len(self._parked))
+
+    async def take(self, crash_id: str) -> int:
+
+        """
+        Removes parked counts of crash (including spilled ones).
+        Returns the highest of them or 0 if there are none
+        """
+
+        parked = self._parked.pop(crash_id, None)
+        DUPLICATES_PARKED.set(len(self._parked))
+
+        duplicate_count = parked.duplicate_count if parked else 0
+
+        # Count being spilled is taken from database
+        spilling = self._spilling.get(crash_id)
+        if spilling is not None:
+            await spilling.wait()
+
+        if crash_id in self._spilled:
+            spilled = await self._db.parked_duplicates.pop(crash_id)
+            self._spilled.discard(crash_id)
+
+            if spilled is not None:
+                duplicate_count = max(duplicate_count, spilled.duplicate_count)
+
+        return duplicate_count
+
+    async def _spill(self, count: int):
+        while self._parked and count > 0:
+            batch_size = min(count, self.BATCH_SIZE)
+            await self._spill_batch(batch_size)
+            count -= batch_size
+
+    async def _spill_batch(self, batch_size: int):
+
+        batch: List[ORMParkedDuplicate] = []
+        done = asyncio.Event()
+
+        while self._parked and len(batch) < batch_size:
+            parked: ORMParkedDuplicate = self._parked.popitem(last=False)[1]
+            self._spilling[parked.crash_id] = done
+            batch.append(parked)
+
+        try:
+            # Nobody will take counts of issues created meanwhile
+            created = await self._db.issues.get_issues([p.crash_id for p in batch])
+            for parked in batch:
+                if parked.crash_id in created:
+                    self._resume_later(parked)
+
+            spilled = [p for p in batch if p.crash_id not in created]
+            await self._db.parked_duplicates.save_many(spilled)
+            self._spilled.update(p.crash_id for p in spilled)
+
+        except Exception:
+            # Kept in memory, still the oldest ones
+            for parked in reversed(batch):
+                if parked.crash_id not in self._parked:
+                    self._parked[parked.crash_id] = parked
+                    self._parked.move_to_end(parked.crash_id, last=False)
+            raise
+
+        finally:
+            for parked in batch:
+                self._spilling.pop(parked.crash_id, None)
+            done.set()
+
+        DUPLICATES_SPILLED.inc(len(spilled))
+        self._logger.debug("Spilled %d parked duplicates", len(spilled))
+
+    async def _sweep_periodically(self):
+        while True:
+            await asyncio.sleep(self._sweep_interval)
+            try:
+                await self._sweep()
+            except Exception:
+                self._logger.exception("Failed to sweep parked duplicates")
+
+    async def _sweep(self):
+
+        parked_before = rfc3339(datetime.utcnow() - timedelta(seconds=self._ttl))
+        expired: List[ORMParkedDuplicate] = []
+
+        # Kept in order of parking, so the oldest ones are first
+        while self._parked:
+            parked: ORMParkedDuplicate = next(iter(self._parked.values()))
+            if parked.parked_at >= parked_before:
+                break
+            expired.append(self._parked.popitem(last=False)[1])
+
+        while True:
+            spilled = await self._db.parked_duplicates.pop_expired(parked_before, self.BATCH_SIZE)
+            self._spilled.difference_update(p.crash_id for p in spilled)
+            expired.extend(spilled)
+            if len(spilled) < self.BATCH_SIZE:
+                break
+
+        for parked in expired:
+            self._logger.warning("Issue of crash '%s' was not created in time", parked.crash_id)
+            await self._reports.report(
+                parked.config_id,
+                "Can't update duplicate count on non created issue!",
+            )
+
+        DUPLICATES_EXPIRED.inc(len(expired))
+
+        # Issue may have been created by another instance
+        crash_ids = list(self._parked)
+        for i in range(0, len(crash_ids), self.BATCH_SIZE):
+            created = await self._db.issues.get_issues(crash_ids[i : i + self.BATCH_SIZE])
+            for crash_id in created:
+                parked = self._parked.pop(crash_id, None)
+                if parked is not None:
+                    self._resume_later(parked)
+
+        DUPLICATES_PARKED.set(len(self._parked))
+
+        crash_ids = list(self._spilled)
+        for i in range(0, len(crash_ids), self.BATCH_SIZE):
+            created = await self._db.issues.get_issues(crash_ids[i : i + self.BATCH_SIZE])
+            for crash_id in created:
+                parked = await self._db.parked_duplicates.pop(crash_id)
+                self._spilled.discard(crash_id)
+                if parked is not None:
+                    self._resume_later(parked)
+
+    async def close(self):
+
+        if self._sweeper is not None:
+            self._sweeper.cancel()
+            await asyncio.gather(self._sweeper, return_exceptions=True)
+
+        # Kept in database until the next start
+        if self._parked:
+            await self._spill(len(self._parked))
+            DUPLICATES_PARKED.set(0)
+
+        if self._resuming:
+            await asyncio.gather(*self._resuming, return_exceptions=True)
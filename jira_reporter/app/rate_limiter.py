@@ -0,0 +1,139 @@
+from __future__ import annotations
+from typing import TYPE_CHECKING, Optional
+
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+import asyncio
+import time
+
+if TYPE_CHECKING:
+    from typing import Mapping
+
+
+def _parse_float(value: Optional[str]) -> Optional[float]:
+
+    if value is None:
+        return None
+
+    try:
+        return float(value)
+    except ValueError:
+        return None
+
+
+def _parse_date(value: str) -> Optional[datetime]:
+
+    try:
+        date = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        try:
+            # Jira Cloud uses ISO 8601: 2021-07-22T20:02Z
+            date = datetime.fromisoformat(value.replace("Z", "+00:00"))
+        except ValueError:
+            return None
+
+    if date.tzinfo is None:
+        date = date.replace(tzinfo=timezone.utc)
+
+    return date
+
+
+def parse_retry_after(headers: Mapping[str, str]) -> Optional[float]:
+
+    """Returns seconds to wait before next request, if server told us so"""
+
+    value = headers.get("Retry-After")
+    if value is None:
+        return None
+
+    seconds = _parse_float(value)
+    if seconds is None:
+        date = _parse_date(value)
+        if date is None:
+            return None
+        seconds = (date - datetime.now(timezone.utc)).total_seconds()
+
+    return max(seconds, 0.0)
+
+
+class TokenBucket:
+
+    """Token bucket rate limiter, serving callers in FIFO order"""
+
+    _rate: float
+    _burst: float
+    _max_rate: float
+    _max_burst: float
+    _tokens: float
+    _updated: float
+    _paused_until: float
+    _lock: asyncio.Lock
+
+    def __init__(self, rate: float, burst: float):
+        self._rate = self._max_rate = rate
+        self._burst = self._max_burst = max(burst, 1)
+        self._tokens = self._burst
+        self._updated = time.monotonic()
+        self._paused_until = 0.0
+        self._lock = asyncio.Lock()
+
+    @property
+    def rate(self):
+        return self._rate
+
+    @property
+    def burst(self):
+        return self._burst
+
+    def _refill(self, now: float):
+        elapsed = now - self._updated
+        self._tokens = min(self._burst, self._tokens + elapsed * self._rate)
+        self._updated = now
+
+    async def acquire(self):
+
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self._refill(now)
+
+                delay = self._paused_until - now
+                if delay <= 0:
+                    if self._tokens >= 1:
+                        self._tokens -= 1
+                        return
+
+                    delay = (1 - self._tokens) / self._rate
+
+                await asyncio.sleep(delay)
+
+    def pause(self, seconds: float):
+        now = time.monotonic()
+        self._refill(now)
+        self._tokens = 0
+        self._paused_until = max(self._paused_until, now + seconds)
+
+    def learn(self, headers: Mapping[str, str]):
+
+        """Adjusts bucket to the limits reported by server"""
+
+        limit = _parse_float(headers.get("X-RateLimit-Limit"))
+        fill_rate = _parse_float(headers.get("X-RateLimit-FillRate"))
+        interval = _parse_float(headers.get("X-RateLimit-Interval-Seconds"))
+        remaining = _parse_float(headers.get("X-RateLimit-Remaining"))
+
+        if limit is not None and limit >= 1:
+            self._burst = min(limit, self._max_burst)
+
+        if fill_rate is not None and fill_rate > 0:
+            rate = fill_rate / interval if interval else fill_rate
+            self._rate = min(rate, self._max_rate)
+
+        if remaining is not None and remaining < 1:
+            reset = headers.get("X-RateLimit-Reset")
+            date = _parse_date(reset) if reset else None
+            if date is not None:
+                delay = (date - datetime.now(timezone.utc)).total_seconds()
+                self.pause(max(delay, 0.0))
+            else:
+                self.pause(1 / self._rate)
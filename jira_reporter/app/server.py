@@ -1,4 +1,6 @@
 from __future__ import annotations
+import asyncio
+import functools
 import logging
 
 from aiohttp import web
@@ -10,12 +12,25 @@ from jira_reporter.app.database.errors import DBRecordNotFoundError
 from jira_reporter.app.database.orm import ORMJiraConfig
 
 from .jira_api import JiraApi
-
+from .issue_batcher import IssueBatcher
+from .duplicate_coalescer import DuplicateCoalescer
+from .issue_claims import IssueClaims
+from .parked_duplicates import ParkedDuplicates
+from .sharded_executor import ShardedExecutor
+from .lane_scheduler import LaneScheduler
+
+from .metrics import SERVICE_READY
+from .startup import StartupGraph
 from .database.instance import db_init
 from .message_queue.instance import mq_init
+from .message_queue.api_gateway import resume_parked_duplicate
+from .message_queue.checkpoint import UnsentMessagesCheckpoint
+from .message_queue.report_coalescer import UndeliveredReports
+from .message_queue.retry import RetryScheduler
 
 if TYPE_CHECKING:
     from .message_queue.state import MQAppState
+    from .database.abstract import IDatabase
     from mqtransport import MQApp
     from .settings import AppSettings
 
@@ -37,6 +52,12 @@ def configure_web_server():
             charset="utf-8",
         )
 
+    @routes.get("/ready")
+    async def ready(request: web.Request):
+        if request.app["ready"]:
+            return web.Response(text="OK")
+        return web.Response(status=503, text="Not ready")
+
     @routes.get("/metrics")
     async def metrics(request: web.Request):
         return web.Response(
@@ -69,6 +90,40 @@ def configure_web_server():
             ),
         )
 
+    @routes.get(r"/api/v1/integrations/{id}/issues")
+    async def list_config_issues(request: web.Request):
+        config_id = request.match_info['id']
+        state: MQAppState = request.app['mq'].state
+
+        try:
+            offset = int(request.query.get('offset', 0))
+            limit = min(int(request.query.get('limit', 100)), 1000)
+        except ValueError:
+            offset = limit = -1
+
+        if offset >= 0 and limit >= 0:
+            issues = await state.db.issues.list_by_config(config_id, offset, limit)
+            code = 200
+            error = None
+            result = dict(
+                total=await state.db.issues.count_by_config(config_id),
+                issues=[issue.dict(exclude={'rev'}) for issue in issues],
+            )
+        else:
+            code = 422
+            error = "Invalid offset or limit"
+            result = dict()
+
+        status = "OK" if error is None else "Failed"
+        return web.json_response(
+            status=code,
+            data=dict(
+                status=status,
+                error=error,
+                result=result,
+            ),
+        )
+
     @routes.post(r"/api/v1/integrations")
     async def insert_config(request: web.Request):
         state: MQAppState = request.app['mq'].state
@@ -80,7 +135,7 @@ def configure_web_server():
 
             await state.db.configs.insert(config)
             assert config.id is not None
-            
+
             await state.producers.verify_jira.produce(
                 config_id=config.id,
                 update_rev=config.update_rev,
@@ -193,6 +248,7 @@ def configure_web_server():
                 raise
 
     app = web.Application()
+    app["ready"] = False
     app.add_routes(routes)
     app.middlewares.append(unhandled_exception_middleware)
 
@@ -206,42 +262,150 @@ def run(settings: AppSettings):
     logger = logging.getLogger("main")
 
     async def server_init(app: web.Application):
-        logger.info("Configuring message queue...")
-        mq_app: MQApp = await mq_init(settings)
-        logger.info("Configuring message queue... OK")
 
-        state: MQAppState = mq_app.state
-        state.settings = settings
+        graph = StartupGraph("server")
+
+        async def configure_mq():
+            mq_app: MQApp = await mq_init(settings)
+            mq_app.state.settings = settings
+            return mq_app
+
+        async def configure_db():
+            return await db_init(settings)
+
+        async def load_unsent_messages():
+            mq_app: MQApp = graph.result("Configure message queue")
+            db: IDatabase = graph.result("Configure database")
+            async for messages in db.unsent_mq.load_unsent_messages():
+                mq_app.import_unsent_messages(messages)
+
+        async def configure_jira():
+            db: IDatabase = graph.result("Configure database")
+            jira_api = JiraApi(db, settings.jira)
+            issue_batcher = IssueBatcher(jira_api, settings.jira)
+            duplicate_coalescer = DuplicateCoalescer(settings.jira)
+            return jira_api, issue_batcher, duplicate_coalescer
+
+        async def start_consuming():
+            mq_app: MQApp = graph.result("Configure message queue")
+            state: MQAppState = mq_app.state
+            state.db = graph.result("Configure database")
+            state.issue_claims = IssueClaims(state.db.issues, settings.jira)
+            (
+                state.jira_api,
+                state.issue_batcher,
+                state.duplicate_coalescer,
+            ) = graph.result("Configure jira")
+
+            if settings.message_queue.consume_lanes:
+                state.crash_executor = LaneScheduler("crashes", settings.message_queue)
+            else:
+                state.crash_executor = ShardedExecutor(
+                    "crashes",
+                    settings.message_queue.consume_concurrency,
+                    settings.message_queue.consume_shard_queue_size,
+                )
+
+            state.crash_executor.start()
 
-        logger.info("Configuring database...")
-        state.db = await db_init(settings)
-        logger.info("Configuring database... OK")
+            state.undelivered_reports = UndeliveredReports(
+                state.producers.jira_report_undelivered,
+                settings.message_queue.undelivered_report_window,
+            )
 
-        logger.info("Loading MQ unsent messages...")
-        messages = await state.db.unsent_mq.load_unsent_messages()
-        mq_app.import_unsent_messages(messages)
-        logger.info("Loading MQ unsent messages... OK")
+            state.retry_scheduler = RetryScheduler(
+                state.producers.retry_unique_crash,
+                settings.message_queue.queues.jira_reporter_internal,
+                settings.jira,
+            )
+
+            # Used by consumers to save retries
+            state.checkpoint = UnsentMessagesCheckpoint(
+                mq_app,
+                state.db.unsent_mq,
+                settings.message_queue.checkpoint_interval,
+                state.retry_scheduler,
+            )
+
+            state.parked_duplicates = ParkedDuplicates(
+                state.db,
+                state.undelivered_reports,
+                functools.partial(resume_parked_duplicate, state),
+                settings.jira,
+            )
+            await state.parked_duplicates.start()
+
+            await mq_app.start()
+            app['mq'] = mq_app
+            state.checkpoint.start()
+
+        graph.add("Configure message queue", configure_mq)
+        graph.add("Configure database", configure_db)
+        graph.add(
+            "Load MQ unsent messages",
+            load_unsent_messages,
+            ["Configure message queue", "Configure database"],
+        )
+        graph.add("Configure jira", configure_jira, ["Configure database"])
+        graph.add(
+            "Start consuming",
+            start_consuming,
+            ["Load MQ unsent messages", "Configure jira"],
+        )
+
+        await graph.run()
+
+        # Consumers are attached
+        app["ready"] = True
+        SERVICE_READY.set(1)
 
-        state.jira_api = JiraApi(state.db)
 
-        await mq_app.start()
-        app['mq'] = mq_app
-        
     async def server_exit(app):
 
         mq_app: MQApp = app["mq"]
         state: MQAppState = mq_app.state
 
+        app["ready"] = False
+        SERVICE_READY.set(0)
+
+        # Queued messages are processed while producers are still
+        # running, so they are acknowledged before consumers stop
+        logger.info("Draining queued messages...")
+        try:
+            await asyncio.wait_for(
+                state.crash_executor.drain(),
+                settings.environment.shutdown_timeout,
+            )
+            logger.info("Draining queued messages... OK")
+        except asyncio.TimeoutError:
+            logger.warning("Draining queued messages... Timed out")
+
         logger.info("Closing message queue...")
         timeout = settings.environment.shutdown_timeout
         await mq_app.shutdown(timeout)
         logger.info("Closing message queue... OK")
 
+        logger.info("Finishing queued messages...")
+        await state.crash_executor.close()
+        await state.issue_batcher.close()
+        await state.duplicate_coalescer.close()
+        await state.parked_duplicates.close()
+        await state.undelivered_reports.close()
+        await state.retry_scheduler.close()
+        logger.info("Finishing queued messages... OK")
+
+        logger.info("Flushing buffered issues...")
+        await state.db.issues.flush()
+        logger.info("Flushing buffered issues... OK")
+
         logger.info("Saving MQ unsent messages...")
-        messages = mq_app.export_unsent_messages()
-        await state.db.unsent_mq.save_unsent_messages(messages)
+        await state.checkpoint.close()
         logger.info("Saving MQ unsent messages... OK")
 
+        logger.info("Closing jira sessions...")
+        await state.jira_api.close()
+        logger.info("Closing jira sessions... OK")
+
         logger.info("Closing database...")
         await state.db.close()
         logger.info("Closing database... OK")
@@ -1,5 +1,4 @@
-from typing import Any, Dict
-from async_timeout import Optional
+from typing import Any, Dict, Optional
 from contextlib import suppress
 from pydantic import AnyHttpUrl, BaseSettings, BaseModel, EmailStr, Field, AnyUrl, root_validator
 
@@ -60,17 +59,120 @@ class MessageQueueSettings(BaseSettings):
     password: str
     region: str
 
+    checkpoint_interval: float = 30
+    """ Seconds between saves of unsent messages and pending retries. 0 saves them only on shutdown """
+
+    instance_id: str = Field(min_length=1)
+    """
+    Stable id of replica unsent messages are saved for, e.g. StatefulSet
+    pod name. Replica loads only its own messages, so an id, which changes
+    on restart (e.g. Deployment pod name), loses the saved ones
+    """
+
+    consume_concurrency: int = 1
+    """
+    Number of shards processing crash messages concurrently. Messages of
+    the same crash are processed in order. Message is acknowledged only
+    after it is processed
+    """
+
+    consume_shard_queue_size: int = 10
+    """ Max number of messages waiting in a single shard """
+
+    undelivered_report_window: float = 5
+    """ Seconds during which equal undelivered reports are merged. 0 disables merging """
+
+    consume_lanes: bool = False
+    """
+    Process crash messages in lanes, one per integration, instead of
+    shards. Consume concurrency is then shared by all lanes
+    """
+
+    lane_concurrency: int = 4
+    """ Max number of messages of a single integration processed at once """
+
+    lane_queue_size: int = 100
+    """ Max number of messages waiting in lane of integration. Others are redelivered later """
+
+    lane_penalty_latency: float = 10
+    """ Average seconds per message after which lane is moved to penalty class """
+
+    lane_penalty_error_rate: float = 0.5
+    """ Average share of failed messages after which lane is moved to penalty class """
+
+    lane_penalty_concurrency: int = 1
+    """ Max number of messages processed at once in penalized lane """
+
+    lane_penalty_weight: float = 0.1
+    """ Share of workers penalized lane gets compared to normal one """
+
+    lane_idle_timeout: float = 600
+    """ Seconds after which an unused lane is dropped with its metrics """
+
     class Config:
         env_prefix = "MQ_"
 
 
 class DatabaseSettings(BaseSettings):
 
-    engine: str = Field(regex=r"^arangodb$")
-    url: AnyHttpUrl
-    username: str
-    password: str
-    name: str
+    engine: str = Field(regex=r"^(arangodb|sqlite|memory)$")
+    url: Optional[AnyHttpUrl]
+    username: Optional[str]
+    password: Optional[str]
+    name: Optional[str]
+
+    pool_size: int = 100
+    """ Max number of open connections to database """
+
+    connect_timeout: float = 10
+    """ Seconds to wait for connection to database """
+
+    read_timeout: float = 60
+    """ Seconds to wait for database response data """
+
+    keepalive_timeout: float = 30
+    """ Seconds an idle connection is kept open for reuse. 0 disables keep-alive """
+
+    coalesce_reads: bool = False
+    """ Merge concurrent single record reads into batched ones """
+
+    write_behind: bool = False
+    """ Buffer new crash to issue mappings and write them in batches """
+
+    write_behind_max_size: int = 500
+    """ Max number of buffered mappings written at once """
+
+    write_behind_interval: float = 1
+    """ Seconds between writes of buffered mappings """
+
+    unsent_messages_batch_size: int = 500
+    """ Number of MQ unsent messages saved or loaded at once """
+
+    sqlite_path: str = "jira-reporter.db"
+    """ Database file used by SQLite engine """
+
+    sqlite_batch_size: int = 500
+    """ Max number of SQLite operations committed in one transaction """
+
+    memory_latency: float = 0
+    """ Seconds added to every operation of in-memory database """
+
+    @root_validator(skip_on_failure=True)
+    def check_values_for_server(cls, data: Dict[str, Any]):
+
+        # Only database server needs connection settings
+        if data["engine"] in ("sqlite", "memory"):
+            return data
+
+        vars = []
+        for name in ("url", "username", "password", "name"):
+            if data[name] is None:
+                vars.append(f"DB_{name.upper()}")
+
+        if vars:
+            raise ValueError(f"Variables must be set for {data['engine']} engine: {vars}")
+
+        return data
 
     class Config:
         env_prefix = "DB_"
@@ -80,6 +182,151 @@ class CollectionSettings(BaseSettings):
     configs: str = "Configs"
     issues: str = "Issues"
     unsent_messages: str = "UnsentMessages"
+    parked_duplicates: str = "ParkedDuplicates"
+
+
+class JiraSettings(BaseSettings):
+
+    pool_size: int = 100
+    """ Max number of open connections to a single Jira """
+
+    keepalive_timeout: float = 30
+    """ Seconds an idle connection is kept open for reuse """
+
+    dns_cache_ttl: int = 300
+    """ Seconds resolved Jira host addresses are cached """
+
+    request_timeout: float = 60
+    """ Total timeout of a single request to Jira """
+
+    max_sessions: int = 1000
+    """ Max number of Jira sessions (url and credentials pairs) kept open """
+
+    session_idle_timeout: float = 600
+    """
+    Seconds after which an unused Jira session is closed. Circuit breakers
+    and concurrency limiters unused for that long are dropped as well
+    """
+
+    rate_limit: float = 10
+    """ Max requests per second sent to a single Jira """
+
+    rate_burst: int = 20
+    """ Max requests sent to a single Jira at once after being idle """
+
+    rate_limit_max_wait: float = 300
+    """ Max seconds to wait on HTTP 429 before giving up """
+
+    breaker_failure_threshold: int = 5
+    """ Consecutive failures after which integration circuit is opened """
+
+    breaker_open_timeout: float = 60
+    """ Seconds the circuit stays open before probe requests are sent """
+
+    breaker_half_open_probes: int = 1
+    """ Successful probe requests needed to close the circuit """
+
+    concurrency_initial_limit: int = 10
+    """ Initial limit of concurrent requests to a single Jira. Adapted to its latency and errors """
+
+    concurrency_min_limit: int = 1
+    """ Min limit of concurrent requests to a single Jira """
+
+    concurrency_max_limit: int = 100
+    """ Max limit of concurrent requests to a single Jira """
+
+    concurrency_backoff_ratio: float = 0.9
+    """ Limit is multiplied by it, when Jira is overloaded """
+
+    concurrency_latency_tolerance: float = 2
+    """ Jira is considered overloaded, when latency exceeds its average this many times """
+
+    concurrency_max_queue: int = 100
+    """ Max requests waiting for the limit of a single Jira. Then its messages are redelivered later """
+
+    bulk_create_window: Optional[float]
+    """
+    Seconds new issues are collected before bulk creation. By default 0.2
+    with concurrent consumption, otherwise 0 (batches can't grow anyway)
+    """
+
+    bulk_create_max_size: int = 50
+    """ Max issues created with a single bulk request. 1 disables bulk creation """
+
+    duplicate_update_window: Optional[float]
+    """
+    Seconds duplicate count updates of a crash are merged. 0 disables merging.
+    By default 1 with concurrent consumption, otherwise 0
+    """
+
+    duplicate_update_max_delay: float = 10
+    """ Max seconds duplicate count update can be postponed by merging """
+
+    retry_max_attempts: int = 5
+    """ Max attempts to create issue on transient Jira errors. 1 disables retries """
+
+    retry_base_delay: float = 30
+    """ Seconds before the first retry. Doubled on each next one """
+
+    retry_max_delay: float = 900
+    """ Max seconds between retries """
+
+    retry_max_age: float = 3600
+    """ Max seconds since the first failure, after which retries are stopped """
+
+    claim_timeout: float = 300
+    """ Seconds after which unfinished claim of issue creation is taken over """
+
+    claim_poll_interval: float = 1
+    """ Seconds between checks of issue creation claimed by other instance """
+
+    parked_duplicates_max_size: int = 10000
+    """ Max duplicate counts of not yet created issues kept in memory. Others are spilled to database """
+
+    parked_duplicates_ttl: float = 7200
+    """ Seconds duplicate count waits for issue to be created. Then it's reported as undelivered """
+
+    parked_duplicates_sweep_interval: float = 10
+    """ Seconds between checks of parked duplicate counts """
+
+    class Config:
+        env_prefix = "JIRA_"
+
+
+class CacheSettings(BaseSettings):
+
+    configs_max_size: int = 10000
+    """ Max number of integration configs kept in memory. 0 disables cache """
+
+    configs_ttl: float = 60
+    """
+    Seconds integration config is kept in memory. Changes made through
+    another replica are seen by this one only after the config expires
+    """
+
+    issues_max_size: int = 1000000
+    """ Max number of crash to issue mappings kept in memory. 0 disables cache """
+
+    issue_records_max_size: int = 10000
+    """ Max number of full issue records kept in memory for duplicate updates. 0 disables cache """
+
+    issue_records_ttl: float = 60
+    """ Seconds issue record is kept in memory. Stale records are detected by revision """
+
+    issues_filter_enabled: bool = False
+    """
+    Answer lookups of never reported crashes without database. Filter is
+    updated only by own inserts, so enable it only for a single replica
+    """
+
+    issues_filter_capacity: int = 10000000
+    """ Expected number of crash to issue mappings """
+
+    issues_filter_error_rate: float = 0.01
+    """ Share of missing crashes still looked up in database """
+
+    class Config:
+        env_prefix = "CACHE_"
 
 
 class ServerSettings(BaseSettings):
@@ -98,7 +345,26 @@ class AppSettings(BaseModel):
     shutdown: ShutdownSettings
     collections: CollectionSettings
     server: ServerSettings
-    
+    jira: JiraSettings
+    cache: CacheSettings
+
+    @root_validator(skip_on_failure=True)
+    def resolve_batching_windows(cls, data: Dict[str, Any]):
+
+        # Messages consumed one by one never fill a batch,
+        # so waiting for more of them only adds latency
+        mq: MessageQueueSettings = data["message_queue"]
+        jira: JiraSettings = data["jira"]
+        concurrent = mq.consume_lanes or mq.consume_concurrency > 1
+
+        if jira.bulk_create_window is None:
+            jira.bulk_create_window = 0.2 if concurrent else 0
+
+        if jira.duplicate_update_window is None:
+            jira.duplicate_update_window = 1 if concurrent else 0
+
+        return data
+
 
 def load_app_settings():
     return AppSettings(
@@ -110,4 +376,6 @@ def load_app_settings():
         shutdown=ShutdownSettings(),
         collections=CollectionSettings(),
         server=ServerSettings(),
+        jira=JiraSettings(),
+        cache=CacheSettings(),
     )
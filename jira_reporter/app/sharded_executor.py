@@ -0,0 +1,137 @@
+from __future__ import annotations
+from typing import TYPE_CHECKING, List, Optional
+
+import asyncio
+import functools
+import zlib
+
+from .metrics import SHARD_IN_FLIGHT
+
+if TYPE_CHECKING:
+    from typing import Awaitable, Callable
+
+    # Job may return work it has left pending, e.g. a delayed write
+    Job = Callable[[], Awaitable[Optional[Awaitable[None]]]]
+
+
+def _pass_outcome(done: asyncio.Future, pending: asyncio.Future):
+
+    if done.done():
+        return
+
+    if pending.cancelled():
+        done.cancel()
+    elif pending.exception() is not None:
+        done.set_exception(pending.exception())
+    else:
+        done.set_result(None)
+
+
+async def run_job(job: Job, done: asyncio.Future):
+
+    """Runs job and passes its outcome, including pending work, to submitter"""
+
+    try:
+        pending = await job()
+    except Exception as e:
+        if not done.done():
+            done.set_exception(e)
+        return
+
+    if pending is None:
+        if not done.done():
+            done.set_result(None)
+    else:
+        pending = asyncio.ensure_future(pending)
+        pending.add_done_callback(functools.partial(_pass_outcome, done))
+
+
+class ShardedExecutor:
+
+    """Runs jobs in shards, jobs with the same key one after another"""
+
+    _name: str
+    _num_shards: int
+    _queue_size: int
+    _queues: List[asyncio.Queue]
+    _workers: List[asyncio.Task]
+
+    def __init__(self, name: str, num_shards: int, queue_size: int):
+        self._name = name
+        self._num_shards = max(num_shards, 1)
+        self._queue_size = queue_size
+        self._in_flight = [SHARD_IN_FLIGHT.labels(name, str(i)) for i in range(self._num_shards)]
+        self._queues = []
+        self._workers = []
+
+    @property
+    def is_concurrent(self) -> bool:
+        return self._num_shards > 1
+
+    def start(self):
+
+        if not self.is_concurrent:
+            return
+
+        for shard in range(self._num_shards):
+            self._queues.append(asyncio.Queue(self._queue_size))
+            self._workers.append(asyncio.create_task(self._work(shard)))
+
+    async def submit(self, key: str, job: Job, lane: Optional[str] = None):
+
+        """Submits job. Lane is not used, jobs are distributed by key only"""
+
+        if not self._workers:
+            self._in_flight[0].inc()
+            try:
+                pending = await job()
+            finally:
+                self._in_flight[0].dec()
+
+            if pending is not None:
+                await pending
+            return
+
+        # Shard must not depend on hash seed of process
+        shard = zlib.crc32(key.encode()) % self._num_shards
+        self._in_flight[shard].inc()
+
+        done = asyncio.get_running_loop().create_future()
+        try:
+            await self._queues[shard].put((job, done))
+        except BaseException:
+            self._in_flight[shard].dec()
+            raise
+
+        await done
+
+    async def _work(self, shard: int):
+
+        queue = self._queues[shard]
+        while True:
+            job, done = await queue.get()
+            try:
+                await run_job(job, done)
+            finally:
+                self._in_flight[shard].dec()
+                queue.task_done()
+
+    async def drain(self):
+
+        """Waits until queued jobs are done, so their messages are acknowledged"""
+
+        for queue in self._queues:
+            await queue.join()
+
+    async def close(self):
+
+        """Waits until all submitted jobs are done"""
+
+        for queue in self._queues:
+            await queue.join()
+
+        for worker in self._workers:
+            worker.cancel()
+
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
@@ -0,0 +1,103 @@
+from __future__ import annotations
+from typing import TYPE_CHECKING, Any, Dict, Iterable, List
+
+import asyncio
+import logging
+import time
+
+from .metrics import STARTUP_PHASE_DURATION
+
+if TYPE_CHECKING:
+    from typing import Awaitable, Callable
+
+
+class StartupPhase:
+
+    name: str
+    func: Callable[[], Awaitable[Any]]
+    depends_on: List[str]
+
+    def __init__(self, name: str, func: Callable[[], Awaitable[Any]], depends_on: Iterable[str]):
+        self.name = name
+        self.func = func
+        self.depends_on = list(depends_on)
+
+
+class StartupGraph:
+
+    """Runs startup phases concurrently, as soon as their dependencies are done"""
+
+    _phases: Dict[str, StartupPhase]
+    _tasks: Dict[str, asyncio.Task]
+
+    def __init__(self, name: str):
+        self._name = name
+        self._phases = dict()
+        self._tasks = dict()
+        self._logger = logging.getLogger("startup")
+
+    def add(self, name: str, func: Callable[[], Awaitable[Any]], depends_on: Iterable[str] = ()):
+        assert name not in self._phases, f"Phase '{name}' already exists"
+        self._phases[name] = StartupPhase(name, func, depends_on)
+
+    def result(self, name: str) -> Any:
+        """Returns result of finished phase"""
+        return self._tasks[name].result()
+
+    def _check(self):
+        visited: Dict[str, bool] = dict()
+
+        def visit(name: str):
+            if name not in self._phases:
+                raise ValueError(f"Unknown startup phase '{name}'")
+            if visited.get(name) is False:
+                raise ValueError(f"Dependency cycle of startup phase '{name}'")
+            if name not in visited:
+                visited[name] = False
+                for dep in self._phases[name].depends_on:
+                    visit(dep)
+                visited[name] = True
+
+        for name in self._phases:
+            visit(name)
+
+    async def _run_phase(self, phase: StartupPhase):
+
+        if phase.depends_on:
+            deps = [self._tasks[dep] for dep in phase.depends_on]
+            await asyncio.wait(deps)
+            for dep in deps:
+                dep.result()
+
+        self._logger.info("[%s] Starting '%s'...", self._name, phase.name)
+        started = time.monotonic()
+        result = await phase.func()
+        duration = time.monotonic() - started
+
+        STARTUP_PHASE_DURATION.labels(self._name, phase.name).set(duration)
+        self._logger.info("[%s] Starting '%s'... OK (%.3f s)", self._name, phase.name, duration)
+        return result
+
+    async def run(self):
+
+        self._check()
+        started = time.monotonic()
+
+        # All phases are created before any runs, so dependencies can be awaited
+        for name, phase in self._phases.items():
+            self._tasks[name] = asyncio.ensure_future(self._run_phase(phase))
+
+        pending = set(self._tasks.values())
+        try:
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_EXCEPTION)
+                for task in done:
+                    task.result()
+        finally:
+            for task in pending:
+                task.cancel()
+            await asyncio.gather(*pending, return_exceptions=True)
+
+        duration = time.monotonic() - started
+        STARTUP_PHASE_DURATION.labels(self._name, "total").set(duration)
+        self._logger.info("[%s] Startup finished in %.3f s", self._name, duration)
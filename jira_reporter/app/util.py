@@ -1,6 +1,6 @@
 import functools
 
-from .settings import load_app_settings
+from .settings import EnvironmentSettings
 from pydantic import BaseModel, root_validator, ValidationError
 from typing import Dict, Any, Optional
 from datetime import datetime
@@ -12,8 +12,12 @@ def find_end(text: str, sub: str, start: Optional[int] = None) -> int:
     return pos
 
 
+def rfc3339(time: datetime) -> str:
+    return time.replace(microsecond=0).isoformat() + "Z"
+
+
 def rfc3339_now() -> str:
-    return datetime.utcnow().replace(microsecond=0).isoformat() + "Z"
+    return rfc3339(datetime.utcnow())
 
 
 def check_empty_strings(data: Dict[str, Any]):
@@ -57,13 +61,11 @@ def testing_only(func):
     """Provides decorator, which forbids
     calling dangerous functions in production"""
 
-    settings = load_app_settings()
-    is_danger = settings.environment.name == "prod"
-
     @functools.wraps(func)
     async def wrapper(*args, **kwargs):
 
-        if is_danger:
+        # Checked on call, so settings are not loaded on import
+        if EnvironmentSettings().name == "prod":
             err = f"Function '{func.__name__}' is allowed to call only in testing mode"
             help = "Please, check 'ENVIRONMENT' variable is not set to 'prod'"
             raise RuntimeError(f"{err}. {help}")
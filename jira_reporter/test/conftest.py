@@ -0,0 +1,24 @@
+import pytest
+import pytest_asyncio
+
+from jira_reporter.app.database.memory.interfaces.issues import DBIssues
+from jira_reporter.app.database.orm import ORMIssue
+from jira_reporter.app.database.sqlite.worker import SQLiteWorker
+
+
+@pytest.fixture
+def db_issues():
+    return DBIssues(None)
+
+
+@pytest.fixture
+def issue():
+    return ORMIssue(crash_id="crash", issue_id=1, config_id="config")
+
+
+@pytest_asyncio.fixture
+async def sqlite_worker(tmp_path):
+    worker = SQLiteWorker(str(tmp_path / "test.db"))
+    worker.start()
+    yield worker
+    await worker.stop()
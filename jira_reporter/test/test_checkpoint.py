@@ -0,0 +1,124 @@
+import time
+from typing import Dict, List
+
+import pytest
+
+from jira_reporter.app.database.abstract import IUnsentMessages
+from jira_reporter.app.database.memory.interfaces.unsent_mq import DBUnsentMessages
+from jira_reporter.app.database.sqlite.interfaces.unsent_mq import DBUnsentMessages as SQLiteUnsentMessages
+from jira_reporter.app.message_queue.checkpoint import UnsentMessagesCheckpoint
+from jira_reporter.app.message_queue.retry import RetryScheduler
+from jira_reporter.app.settings import JiraSettings
+
+
+class FakeMQApp:
+
+    """Producer buffer with export semantics of mqtransport"""
+
+    def __init__(self, drains: bool):
+        self.messages: Dict[str, list] = {}
+        self.drains = drains
+
+    def send(self, queue: str, body: dict):
+        self.messages.setdefault(queue, []).append({"name": "msg", "body": body})
+
+    def export_unsent_messages(self) -> Dict[str, list]:
+        exported = {queue: list(messages) for queue, messages in self.messages.items()}
+        if self.drains:
+            self.messages = {}
+        return exported
+
+    def import_unsent_messages(self, messages: Dict[str, list]):
+        for queue, items in messages.items():
+            self.messages.setdefault(queue, []).extend(items)
+
+
+@pytest.fixture
+def unsent_mq():
+    return DBUnsentMessages(None, "replica-0")
+
+
+async def load(unsent_mq: IUnsentMessages) -> Dict[str, List[dict]]:
+    loaded: Dict[str, list] = {}
+    async for chunk in unsent_mq.load_unsent_messages():
+        for queue, messages in chunk.items():
+            loaded.setdefault(queue, []).extend(messages)
+    return loaded
+
+
+@pytest.mark.asyncio
+async def test_periodic_checkpoint_keeps_messages_in_producers(unsent_mq):
+
+    mq_app = FakeMQApp(drains=False)
+    checkpoint = UnsentMessagesCheckpoint(mq_app, unsent_mq, 0)
+
+    mq_app.send("q", {"n": 1})
+    await checkpoint.checkpoint()
+    mq_app.send("q", {"n": 2})
+    await checkpoint.checkpoint()
+
+    assert len(mq_app.messages["q"]) == 2
+    assert len((await load(unsent_mq))["q"]) == 2
+
+
+@pytest.mark.asyncio
+async def test_draining_export_fails_checkpoint(unsent_mq):
+
+    mq_app = FakeMQApp(drains=True)
+    checkpoint = UnsentMessagesCheckpoint(mq_app, unsent_mq, 0)
+
+    mq_app.send("q", {"n": 1})
+    with pytest.raises(RuntimeError):
+        await checkpoint.checkpoint()
+
+    # Messages are still sent by producers
+    assert mq_app.messages == {"q": [{"name": "msg", "body": {"n": 1}}]}
+    assert await load(unsent_mq) == {}
+
+    mq_app.send("q", {"n": 2})
+    await checkpoint.close()
+
+    assert mq_app.messages == {}
+    assert len((await load(unsent_mq))["q"]) == 2
+
+
+@pytest.mark.asyncio
+async def test_messages_are_saved_per_instance(sqlite_worker):
+
+    await sqlite_worker.execute(SQLiteUnsentMessages.create_schema)
+
+    replica_0 = SQLiteUnsentMessages(None, sqlite_worker, "replica-0")
+    replica_1 = SQLiteUnsentMessages(None, sqlite_worker, "replica-1")
+
+    await replica_0.save_unsent_messages({"q": [{"name": "msg", "body": 0}]})
+    await replica_1.save_unsent_messages({"q": [{"name": "msg", "body": 1}]})
+    await replica_1.save_unsent_messages({})
+
+    assert await load(replica_0) == {"q": [{"name": "msg", "body": 0}]}
+    assert await load(replica_1) == {}
+
+
+@pytest.mark.asyncio
+async def test_pending_retries_are_saved(unsent_mq):
+
+    class FakeProducer:
+        name = "retry"
+
+        async def produce(self, **body):
+            pass
+
+    mq_app = FakeMQApp(drains=False)
+    retry_scheduler = RetryScheduler(FakeProducer(), "internal", JiraSettings())
+    checkpoint = UnsentMessagesCheckpoint(mq_app, unsent_mq, 30, retry_scheduler)
+
+    assert retry_scheduler.schedule({"crash_id": "crash"}, 1, time.time())
+    await checkpoint.save_now()
+
+    retries = (await load(unsent_mq))["internal"]
+    assert [retry["name"] for retry in retries] == ["retry"]
+    assert retries[0]["body"]["attempt"] == 2
+
+    # Retries still pending on shutdown are kept
+    await retry_scheduler.close()
+    await checkpoint.close()
+    assert len((await load(unsent_mq))["internal"]) == 1
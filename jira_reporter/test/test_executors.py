@@ -0,0 +1,169 @@
+import asyncio
+
+import pytest
+import pytest_asyncio
+from prometheus_client import REGISTRY
+
+from jira_reporter.app.lane_scheduler import LaneFullError, LaneScheduler, report_job_failure
+from jira_reporter.app.settings import MessageQueueSettings
+from jira_reporter.app.sharded_executor import ShardedExecutor
+
+
+def lane_metric(name: str, lane: str):
+    return REGISTRY.get_sample_value(f"jira_reporter_lane_{name}", {"lane": lane})
+
+
+@pytest.fixture
+def settings():
+    # Connection settings are not needed
+    return MessageQueueSettings.construct(consume_concurrency=2)
+
+
+@pytest_asyncio.fixture(params=["sharded", "lanes"])
+async def executor(request, settings):
+    if request.param == "sharded":
+        executor = ShardedExecutor("test", 2, 10)
+    else:
+        executor = LaneScheduler("test", settings)
+
+    executor.start()
+    yield executor
+    await executor.close()
+
+
+@pytest.mark.asyncio
+async def test_submission_waits_for_job(executor):
+
+    done = []
+
+    async def job(n: int):
+        await asyncio.sleep(0.01)
+        done.append(n)
+
+    async def failed():
+        raise RuntimeError()
+
+    await asyncio.gather(
+        executor.submit("a", lambda: job(1)),
+        executor.submit("a", lambda: job(2)),
+    )
+    assert done == [1, 2]
+
+    # Error is raised to submitter, so message is not acknowledged
+    with pytest.raises(RuntimeError):
+        await executor.submit("a", failed)
+
+    await executor.submit("a", lambda: job(3))
+    await executor.drain()
+    assert done == [1, 2, 3]
+
+
+@pytest.mark.asyncio
+async def test_submission_waits_for_pending_work(executor):
+
+    written = asyncio.get_running_loop().create_future()
+
+    async def schedule_write():
+        return written
+
+    submitted = asyncio.create_task(executor.submit("a", schedule_write))
+
+    # Slot is free, while pending work is not done
+    await executor.submit("a", lambda: asyncio.sleep(0))
+    assert not submitted.done()
+
+    written.set_exception(RuntimeError())
+    with pytest.raises(RuntimeError):
+        await submitted
+
+
+@pytest.mark.asyncio
+async def test_failing_lane_is_penalized(settings):
+
+    scheduler = LaneScheduler("test", settings)
+    scheduler.start()
+
+    async def failed():
+        report_job_failure()
+
+    async def raised():
+        raise RuntimeError()
+
+    for n in range(2):
+        await scheduler.submit(str(n), failed, lane="failing")
+        with pytest.raises(RuntimeError):
+            await scheduler.submit(str(n), raised, lane="failing")
+
+    await scheduler.close()
+    assert lane_metric("penalized", "failing") == 1
+
+    for n in range(10):
+        await scheduler.submit(str(n), lambda: asyncio.sleep(0), lane="failing")
+
+    await scheduler.close()
+    assert lane_metric("penalized", "failing") == 0
+
+
+@pytest.mark.asyncio
+async def test_failed_pending_work_penalizes_lane(settings):
+
+    scheduler = LaneScheduler("test", settings)
+    scheduler.start()
+
+    async def schedule_write():
+        written = asyncio.get_running_loop().create_future()
+        written.set_exception(RuntimeError())
+        return written
+
+    for n in range(4):
+        with pytest.raises(RuntimeError):
+            await scheduler.submit(str(n), schedule_write, lane="unwritten")
+
+    # Outcome of pending work is counted right after it is passed to submitter
+    await asyncio.sleep(0)
+    assert lane_metric("penalized", "unwritten") == 1
+
+
+@pytest.mark.asyncio
+async def test_idle_lane_is_dropped(settings):
+
+    scheduler = LaneScheduler("test", settings.copy(update={"lane_idle_timeout": 0}))
+    scheduler.start()
+
+    await scheduler.submit("a", lambda: asyncio.sleep(0), lane="idle")
+    await scheduler.close()
+    assert lane_metric("backlog", "idle") == 0
+
+    await asyncio.sleep(0.01)
+    await scheduler.submit("a", lambda: asyncio.sleep(0), lane="new")
+    await scheduler.close()
+    assert lane_metric("backlog", "idle") is None
+
+
+@pytest.mark.asyncio
+async def test_full_lane_does_not_block_others(settings):
+
+    scheduler = LaneScheduler(
+        "test", settings.copy(update={"lane_concurrency": 1, "lane_queue_size": 1})
+    )
+    scheduler.start()
+    release = asyncio.Event()
+
+    async def wait_release():
+        await release.wait()
+
+    slow = [
+        asyncio.create_task(scheduler.submit(str(n), wait_release, lane="slow"))
+        for n in range(2)
+    ]
+    await asyncio.sleep(0)
+
+    with pytest.raises(LaneFullError):
+        await scheduler.submit("2", wait_release, lane="slow")
+    assert lane_metric("rejected_total", "slow") == 1
+
+    await asyncio.wait_for(scheduler.submit("a", lambda: asyncio.sleep(0), lane="fast"), 1)
+
+    release.set()
+    await asyncio.gather(*slow)
+    await scheduler.close()
@@ -0,0 +1,17 @@
+import pathlib
+import subprocess
+import sys
+
+ROOT = pathlib.Path(__file__).parents[2]
+BENCHMARK = ROOT / "benchmarks" / "import_time.py"
+
+
+def test_import_time_within_budget():
+    proc = subprocess.run(
+        [sys.executable, str(BENCHMARK), "--repeat", "3"],
+        stdout=subprocess.PIPE,
+        stderr=subprocess.STDOUT,
+        cwd=str(ROOT),
+        universal_newlines=True,
+    )
+    assert proc.returncode == 0, proc.stdout
@@ -0,0 +1,105 @@
+import asyncio
+
+import pytest
+
+from jira_reporter.app.database.write_behind import WriteBehindIssues
+from jira_reporter.app.issue_claims import ClaimResult, IssueClaims, crash_label
+from jira_reporter.app.settings import DatabaseSettings, JiraSettings
+
+
+CLAIM_SETTINGS = JiraSettings(claim_timeout=60, claim_poll_interval=0.01)
+
+
+@pytest.fixture
+def claims(db_issues):
+    return IssueClaims(db_issues, CLAIM_SETTINGS)
+
+
+def test_crash_label():
+    assert crash_label("a b/c") == "crash-a_b_c"
+    assert len(crash_label("x" * 300)) == 255
+
+
+@pytest.mark.asyncio
+async def test_second_claim_waits_for_completion(claims, issue):
+
+    first = issue.copy()
+    assert await claims.claim(first) == ClaimResult.CLAIMED
+
+    second = asyncio.create_task(claims.claim(issue.copy()))
+    await asyncio.sleep(0.05)
+    assert not second.done()
+
+    assert await claims.complete(first, 42)
+    assert await second == ClaimResult.CREATED
+
+
+@pytest.mark.asyncio
+async def test_released_claim_is_claimed_again(claims, issue):
+
+    first = issue.copy()
+    await claims.claim(first)
+    await claims.release(first)
+
+    assert await claims.claim(issue.copy()) == ClaimResult.CLAIMED
+
+
+@pytest.mark.asyncio
+async def test_abandoned_claim_is_taken_over(db_issues, claims, issue):
+
+    first = issue.copy()
+    await claims.claim(first)
+    await claims.abandon(first)
+
+    second = issue.copy()
+    assert await claims.claim(second) == ClaimResult.TAKEN_OVER
+
+    # Previous owner can't complete the claim any more
+    assert not await claims.complete(first, 1)
+    assert await claims.complete(second, 2)
+    assert await db_issues.get_issue("crash") == 2
+
+
+@pytest.mark.asyncio
+async def test_expired_claim_is_taken_over(db_issues, issue):
+
+    claims = IssueClaims(db_issues, CLAIM_SETTINGS.copy(update={"claim_timeout": 0}))
+    await claims.claim(issue.copy())
+
+    # Claim time has a granularity of one second
+    await asyncio.sleep(1.1)
+    assert await claims.claim(issue.copy()) == ClaimResult.TAKEN_OVER
+
+
+@pytest.mark.asyncio
+async def test_completion_is_buffered_by_write_behind(db_issues, issue):
+
+    issues = WriteBehindIssues(db_issues, DatabaseSettings(engine="memory"))
+    claims = IssueClaims(issues, CLAIM_SETTINGS)
+
+    await claims.claim(issue)
+    assert (await db_issues.get("crash")).pending
+
+    assert await claims.complete(issue, 42)
+    assert await issues.get_issue("crash") == 42
+    assert (await db_issues.get("crash")).pending
+
+    await issues.close()
+    assert await db_issues.get_issue("crash") == 42
+
+
+@pytest.mark.asyncio
+async def test_buffered_completion_detects_takeover(db_issues, issue):
+
+    issues = WriteBehindIssues(db_issues, DatabaseSettings(engine="memory"))
+    claims = IssueClaims(issues, CLAIM_SETTINGS)
+
+    await claims.claim(issue)
+    await claims.complete(issue, 42)
+
+    # Taken over by another instance before flush
+    claim = await db_issues.get("crash")
+    assert await db_issues.update(claim)
+
+    await issues.close()
+    assert (await db_issues.get("crash")).pending
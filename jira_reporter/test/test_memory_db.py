@@ -0,0 +1,142 @@
+import pytest
+
+from jira_reporter.app.database.cache import CachedIssues
+from jira_reporter.app.database.errors import DBAlreadyExistsError, DBRecordNotFoundError
+from jira_reporter.app.database.memory.interfaces.parked_duplicates import DBParkedDuplicates
+from jira_reporter.app.database.orm import ORMParkedDuplicate
+from jira_reporter.app.settings import CacheSettings
+
+
+@pytest.mark.asyncio
+async def test_insert_and_get(db_issues, issue):
+
+    await db_issues.insert(issue.copy(update={"issue_id": 42}))
+
+    assert await db_issues.get_issue("crash") == 42
+    assert await db_issues.get_issues(["crash", "missing"]) == {"crash": 42}
+    assert await db_issues.get_issue("missing") is None
+
+    with pytest.raises(DBAlreadyExistsError):
+        await db_issues.insert(issue)
+
+
+@pytest.mark.asyncio
+async def test_pending_claim_is_not_mapping(db_issues, issue):
+
+    await db_issues.insert(issue.copy(update={"issue_id": 0, "pending": True}))
+
+    assert await db_issues.get_issue("crash") is None
+    assert await db_issues.get_issues(["crash"]) == {}
+    assert (await db_issues.get("crash")).pending
+
+
+@pytest.mark.asyncio
+async def test_update_is_compare_and_set(db_issues, issue):
+
+    await db_issues.insert(issue)
+
+    first = await db_issues.get("crash")
+    second = await db_issues.get("crash")
+
+    first.issue_id = 2
+    assert await db_issues.update(first)
+
+    second.issue_id = 3
+    assert not await db_issues.update(second)
+    assert await db_issues.get_issue("crash") == 2
+
+    with pytest.raises(DBRecordNotFoundError):
+        await db_issues.update(issue.copy(update={"crash_id": "missing"}))
+
+
+@pytest.mark.asyncio
+async def test_delete_is_compare_and_set(db_issues, issue):
+
+    await db_issues.insert(issue)
+
+    stale = await db_issues.get("crash")
+    fresh = await db_issues.get("crash")
+    assert await db_issues.update(fresh)
+
+    assert not await db_issues.delete(stale)
+    assert await db_issues.delete(fresh)
+    assert await db_issues.get("crash") is None
+    assert not await db_issues.delete(fresh)
+
+
+@pytest.mark.asyncio
+async def test_update_duplicate_count_is_compare_and_set(db_issues, issue):
+
+    await db_issues.insert(issue)
+
+    first = await db_issues.get("crash")
+    second = await db_issues.get("crash")
+
+    first.duplicate_count = 5
+    assert await db_issues.update_duplicate_count(first)
+
+    second.duplicate_count = 3
+    assert not await db_issues.update_duplicate_count(second)
+    assert (await db_issues.get("crash")).duplicate_count == 5
+
+
+@pytest.mark.asyncio
+async def test_cached_record_is_dropped_on_conflict(db_issues, issue):
+
+    issues = CachedIssues(db_issues, CacheSettings())
+    await issues.insert(issue)
+
+    # Updated by another instance
+    other = await db_issues.get("crash")
+    other.duplicate_count = 5
+    assert await db_issues.update_duplicate_count(other)
+
+    stale = await issues.get("crash")
+    assert stale.duplicate_count == 0
+
+    stale.duplicate_count = 3
+    assert not await issues.update_duplicate_count(stale)
+
+    fresh = await issues.get("crash")
+    assert fresh.duplicate_count == 5
+    assert fresh.rev == other.rev
+
+
+@pytest.mark.asyncio
+async def test_cached_records_are_copies(db_issues, issue):
+
+    issues = CachedIssues(db_issues, CacheSettings())
+    await issues.insert(issue)
+
+    cached = await issues.get("crash")
+    cached.duplicate_count = 10
+    assert (await issues.get("crash")).duplicate_count == 0
+
+
+@pytest.mark.asyncio
+async def test_parked_duplicates_keep_highest_count():
+
+    def parked(crash_id: str, count: int, parked_at: str):
+        return ORMParkedDuplicate(
+            crash_id=crash_id,
+            config_id="config",
+            duplicate_count=count,
+            parked_at=parked_at,
+        )
+
+    parked_duplicates = DBParkedDuplicates(None)
+    await parked_duplicates.save_many(
+        [
+            parked("a", 5, "2021-01-01T00:00:02Z"),
+            parked("b", 1, "2021-01-01T00:00:01Z"),
+        ]
+    )
+    await parked_duplicates.save_many([parked("a", 3, "2021-01-01T00:00:03Z")])
+
+    assert sorted([c async for c in parked_duplicates.list_crash_ids()]) == ["a", "b"]
+
+    expired = await parked_duplicates.pop_expired("2021-01-01T00:00:03Z")
+    assert [(p.crash_id, p.duplicate_count) for p in expired] == [("b", 1), ("a", 5)]
+    assert await parked_duplicates.pop("a") is None
+
+
@@ -0,0 +1,48 @@
+import sqlite3
+
+import pytest
+
+from jira_reporter.app.database.sqlite.interfaces.unsent_mq import DBUnsentMessages
+
+
+@pytest.mark.asyncio
+async def test_worker_survives_broken_transaction(sqlite_worker):
+
+    # Ends transaction, so savepoint of the job can't be released
+    def rollback(conn: sqlite3.Connection):
+        conn.execute("ROLLBACK")
+
+    with pytest.raises(sqlite3.Error):
+        await sqlite_worker.execute(rollback)
+
+    assert await sqlite_worker.execute(lambda conn: conn.execute("SELECT 1").fetchone()) == (1,)
+
+
+@pytest.mark.asyncio
+async def test_unsent_messages_are_saved_incrementally(sqlite_worker):
+
+    def message(n: int):
+        return {"name": "msg", "body": {"n": n}}
+
+    def select_rows(conn: sqlite3.Connection):
+        return conn.execute("SELECT body, seq FROM unsent_messages ORDER BY seq").fetchall()
+
+    await sqlite_worker.execute(DBUnsentMessages.create_schema)
+    unsent_mq = DBUnsentMessages(None, sqlite_worker, "replica-0")
+
+    await unsent_mq.save_unsent_messages({"q": [message(1), message(2)]})
+    saved = await sqlite_worker.execute(select_rows)
+
+    await unsent_mq.save_unsent_messages({"q": [message(2), message(3)]})
+    rows = await sqlite_worker.execute(select_rows)
+
+    # Message kept in queue is not written again
+    assert rows[0] == saved[1]
+    assert [row[0] for row in rows] == ['{"n": 2}', '{"n": 3}']
+
+    loaded = DBUnsentMessages(None, sqlite_worker, "replica-0")
+    chunks = [chunk async for chunk in loaded.load_unsent_messages()]
+    assert chunks == [{"q": [message(2), message(3)]}]
+
+    await loaded.save_unsent_messages({})
+    assert await sqlite_worker.execute(select_rows) == []